@@ -6,8 +6,48 @@ import platform
 from pathlib import Path
 from typing import Any
 
+from loguru import logger
+
 from nanobot.agent.memory import MemoryStore
+from nanobot.agent.prompt_cache import (
+    PromptCache,
+    dir_fingerprint,
+    environment_fingerprint,
+    file_fingerprint,
+)
 from nanobot.agent.skills import SkillsLoader
+from nanobot.agent.tokens import TokenBudget, estimate_message_tokens, fit_history
+
+
+def with_tool_digests(history: list[dict[str, Any]], max_chars: int) -> list[dict[str, Any]]:
+    """
+    Fold the tool digests of history messages into their content.
+
+    Digests are added newest first until max_chars is used up; older
+    messages keep only their text. The "tools" field is never passed on.
+
+    Args:
+        history: Messages, oldest first; replies may carry a "tools" digest.
+        max_chars: Budget for all rendered digests.
+
+    Returns:
+        Messages with role and content only.
+    """
+    left = max_chars
+    rendered = []
+    for m in reversed(history):
+        content = m["content"]
+        if m.get("tools") and left > 0:
+            lines = "\n".join(f"- {t['name']}({t['args']}) → {t['result']}" for t in m["tools"])
+            note = f"\n\n[Tools used for this reply:]\n{lines}"
+            if len(note) <= left:
+                content = f"{content}{note}"
+                left -= len(note)
+            else:
+                left = 0
+        rendered.append({"role": m["role"], "content": content})
+    rendered.reverse()
+    return rendered
 
 
 class ContextBuilder:
@@ -20,11 +60,20 @@ class ContextBuilder:
     
     BOOTSTRAP_FILES = ["AGENTS.md", "SOUL.md", "USER.md", "TOOLS.md", "IDENTITY.md"]
     
-    def __init__(self, workspace: Path, timezone: str = "UTC"):
+    def __init__(
+        self,
+        workspace: Path,
+        timezone: str = "UTC",
+        budget: TokenBudget | None = None,
+        tool_digest_chars: int = 2000,
+    ):
         self.workspace = workspace
         self.timezone = timezone
+        self.budget = budget or TokenBudget()
+        self.tool_digest_chars = tool_digest_chars
         self.memory = MemoryStore(workspace)
         self.skills = SkillsLoader(workspace)
+        self.prompt_cache = PromptCache()
     
     def build_system_prompt(self, skill_names: list[str] | None = None) -> str:
         """
@@ -36,20 +85,69 @@ class ContextBuilder:
         Returns:
             Complete system prompt.
         """
+        return "\n\n---\n\n".join(b for b in self.build_system_blocks(skill_names) if b)
+    
+    def build_system_blocks(
+        self,
+        skill_names: list[str] | None = None,
+        channel: str | None = None,
+        chat_id: str | None = None,
+    ) -> list[str]:
+        """
+        Build the system prompt as blocks, most stable first.
+        
+        Keeping volatile content (current time, session) last lets provider
+        prefix caches reuse everything before it. Sections are cached and
+        rebuilt only when the files they are made from change.
+        
+        Args:
+            skill_names: Optional list of skills to include.
+            channel: Current channel, shown in the session block.
+            chat_id: Current chat ID, shown in the session block.
+        
+        Returns:
+            [static, memory, volatile]; the memory block may be empty.
+        """
         parts = []
         
         # Core identity
-        parts.append(self._get_identity())
+        parts.append(self.prompt_cache.get("identity", None, self._get_identity))
         
         # Bootstrap files
-        bootstrap = self._load_bootstrap_files()
+        bootstrap = self.prompt_cache.get(
+            "bootstrap",
+            tuple(file_fingerprint(self.workspace / f) for f in self.BOOTSTRAP_FILES),
+            self._load_bootstrap_files,
+        )
         if bootstrap:
             parts.append(bootstrap)
         
-        # Memory context
-        memory = self.memory.get_memory_context()
-        if memory:
-            parts.append(f"# Memory\n\n{memory}")
+        # Skills: requirement checks depend on installed binaries and env vars
+        skills_key = (
+            dir_fingerprint(self.skills.workspace_skills, "SKILL.md"),
+            dir_fingerprint(self.skills.builtin_skills, "SKILL.md"),
+            environment_fingerprint(),
+        )
+        skills = self.prompt_cache.get("skills", skills_key, self._build_skills_section)
+        if skills:
+            parts.append(skills)
+        
+        # Memory context (changes with daily-note appends)
+        memory = self.prompt_cache.get(
+            "memory",
+            (file_fingerprint(self.memory.memory_file), file_fingerprint(self.memory.get_today_file())),
+            self.memory.get_memory_context,
+        )
+        
+        return [
+            "\n\n---\n\n".join(parts),
+            f"# Memory\n\n{memory}" if memory else "",
+            self._get_current_context(channel, chat_id),
+        ]
+    
+    def _build_skills_section(self) -> str:
+        """Build the always-loaded skills and the skills summary."""
+        parts = []
         
         # Skills - progressive loading
         # 1. Always-loaded skills: include full content
@@ -71,16 +169,24 @@ Skills with available="false" need dependencies installed first - you can try in
         
         return "\n\n---\n\n".join(parts)
     
-    def _get_identity(self) -> str:
-        """Get the core identity section."""
-        from datetime import datetime, timezone as tz_module
+    def _get_current_context(self, channel: str | None, chat_id: str | None) -> str:
+        """Get the volatile context section: current time and session."""
+        from datetime import datetime
+        from datetime import timezone as tz_module
         try:
             from zoneinfo import ZoneInfo
             tz = ZoneInfo(self.timezone)
         except Exception:
             tz = tz_module.utc
         now = datetime.now(tz).strftime("%Y-%m-%d %H:%M (%A)")
-        tz_label = self.timezone
+        
+        context = f"# Current Context\n\n## Current Time\n{now} ({self.timezone})"
+        if channel and chat_id:
+            context += f"\n\n## Current Session\nChannel: {channel}\nChat ID: {chat_id}"
+        return context
+    
+    def _get_identity(self) -> str:
+        """Get the core identity section."""
         workspace_path = str(self.workspace.expanduser().resolve())
         system = platform.system()
         runtime = f"{'macOS' if system == 'Darwin' else system} {platform.machine()}, Python {platform.python_version()}"
@@ -95,9 +201,6 @@ You are Agentchat, a helpful AI assistant. You have access to tools that allow y
 - Spawn subagents for complex background tasks
 - Control a stealth web browser (navigate, click, type, fill forms, take screenshots)
 
-## Current Time
-{now} ({tz_label})
-
 ## Runtime
 {runtime}
 
@@ -157,35 +260,58 @@ When remembering something, write to memory/MEMORY.md"""
         media: list[str] | None = None,
         channel: str | None = None,
         chat_id: str | None = None,
+        model: str | None = None,
+        summary: str | None = None,
     ) -> list[dict[str, Any]]:
         """
         Build the complete message list for an LLM call.
 
+        History is filled newest-first until the token budget for the model
+        is used up.
+
         Args:
-            history: Previous conversation messages.
+            history: Previous conversation messages, oldest first.
             current_message: The new user message.
             skill_names: Optional skills to include.
             media: Optional list of local file paths for images/media.
             channel: Current channel (telegram, feishu, etc.).
             chat_id: Current chat/user ID.
+            model: Model the messages are for (sets the context window).
+            summary: Summary of the conversation before the history.
 
         Returns:
             List of messages including system prompt.
         """
         messages = []
 
-        # System prompt
-        system_prompt = self.build_system_prompt(skill_names)
-        if channel and chat_id:
-            system_prompt += f"\n\n## Current Session\nChannel: {channel}\nChat ID: {chat_id}"
-        messages.append({"role": "system", "content": system_prompt})
-
-        # History
-        messages.extend(history)
+        # System prompt as text blocks, stable first; providers that take
+        # cache breakpoints put them between the blocks. The summary of
+        # older messages changes only when it is refolded, so it goes ahead
+        # of the volatile time/session block.
+        *stable, volatile = self.build_system_blocks(skill_names, channel, chat_id)
+        if summary:
+            stable.append(f"# Earlier in this conversation\n\n{summary}")
+        blocks = [b for b in [*stable, volatile] if b]
+        messages.append({
+            "role": "system",
+            "content": [{"type": "text", "text": b} for b in blocks],
+        })
 
         # Current message (with optional image attachments)
         user_content = self._build_user_content(current_message, media)
-        messages.append({"role": "user", "content": user_content})
+        current = {"role": "user", "content": user_content}
+
+        # History, newest first within the budget
+        history_budget = self.budget.history_tokens(
+            model, estimate_message_tokens(messages[0]), estimate_message_tokens(current)
+        )
+        recent = with_tool_digests(history[-self.budget.max_history_messages:], self.tool_digest_chars)
+        kept = fit_history(recent, history_budget)
+        if len(kept) < len(history):
+            logger.debug(f"History trimmed to {len(kept)}/{len(history)} messages ({history_budget} token budget)")
+        messages.extend(kept)
+
+        messages.append(current)
 
         return messages
 
@@ -2,27 +2,40 @@
 
 import asyncio
 import json
-import os
 import re
+import uuid
+from collections import deque
 from pathlib import Path
-from typing import Any
+from typing import Any, Awaitable, Callable
 
 from loguru import logger
 
 from nanobot.bus.events import InboundMessage, OutboundMessage
-from nanobot.bus.queue import MessageBus
-from nanobot.providers.base import LLMProvider
+from nanobot.bus.queue import LaneSlots, MessageBus, inbound_lane
+from nanobot.bus.coalescer import InboundCoalescer
+from nanobot.providers.base import LLMProvider, LLMResponse
+from nanobot.providers.response_cache import ResponseCache
 from nanobot.agent.context import ContextBuilder
+from nanobot.agent.streaming import ThinkingFilter
+from nanobot.agent.tokens import TokenBudget
 from nanobot.agent.tools.registry import ToolRegistry
 from nanobot.agent.tools.filesystem import ReadFileTool, WriteFileTool, EditFileTool, ListDirTool
 from nanobot.agent.tools.shell import ExecTool
-from nanobot.agent.tools.web import WebSearchTool, WebFetchTool
+from nanobot.agent.tools.web import WebSearchTool, WebFetchTool, extract_urls
 from nanobot.agent.tools.browser import BrowserTool
 from nanobot.agent.tools.message import MessageTool
 from nanobot.agent.tools.spawn import SpawnTool
+from nanobot.agent.tools.results import ResultStore, ToolResultTool
 from nanobot.agent.tools.cron import CronTool
 from nanobot.agent.subagent import SubagentManager
-from nanobot.session.manager import SessionManager
+from nanobot.billing import CreditGuard, UsageReporter
+from nanobot.session.compaction import SessionCompactor
+from nanobot.session.manager import Session, SessionManager
+from nanobot.session.policy import SessionClasses, SessionPolicy
+from nanobot.utils.deadline import Deadline
+
+# Receives visible reply text deltas while a turn is generating
+StreamCallback = Callable[[str], Awaitable[None]]
 
 
 def _strip_thinking(text: str) -> str:
@@ -45,6 +58,84 @@ def _strip_thinking(text: str) -> str:
     return text
 
 
+def _tool_calls(turn_messages: list[dict[str, Any]]) -> list[tuple[str, str, str]]:
+    """
+    Tool calls of a turn with their results.
+    
+    Returns:
+        (name, raw JSON arguments, result with whitespace collapsed) per
+        call, in the order the model made them.
+    """
+    results = {m.get("tool_call_id"): m.get("content") or "" for m in turn_messages if m.get("role") == "tool"}
+    return [
+        (
+            tc.get("function", {}).get("name", ""),
+            tc.get("function", {}).get("arguments") or "",
+            " ".join(str(results.get(tc.get("id"), "(no result)")).split()),
+        )
+        for m in turn_messages
+        for tc in m.get("tool_calls") or []
+    ]
+
+
+def _interrupted_note(
+    turn_messages: list[dict[str, Any]],
+    reason: str = "a newer message",
+    max_chars: int = 300,
+) -> str:
+    """
+    Summarize the tool work of an interrupted turn for the session history.
+    
+    Args:
+        turn_messages: Assistant and tool messages the turn added.
+        reason: What interrupted the turn.
+        max_chars: Length limit of each tool call's arguments and result.
+    
+    Returns:
+        An assistant note listing each tool call with the start of its result.
+    """
+    lines = [
+        f"- {name}({arguments[:max_chars]}) → {result[:max_chars]}"
+        for name, arguments, result in _tool_calls(turn_messages)
+    ]
+    if not lines:
+        return f"[Interrupted by {reason} before doing any work.]"
+    return f"[Interrupted by {reason}. Work done so far:]\n" + "\n".join(lines)
+
+
+def _tool_digest(
+    turn_messages: list[dict[str, Any]],
+    max_arg_chars: int = 120,
+    max_result_chars: int = 200,
+) -> list[dict[str, str]]:
+    """
+    Compact record of a turn's tool calls, kept with its reply in the session.
+    
+    Args:
+        turn_messages: Assistant and tool messages the turn added.
+        max_arg_chars: Longer argument values (file contents, scripts) are
+            replaced by their length.
+        max_result_chars: Length limit of each result.
+    
+    Returns:
+        One {"name", "args", "result"} dict per tool call.
+    """
+    digest = []
+    for name, arguments, result in _tool_calls(turn_messages):
+        try:
+            args = json.loads(arguments or "{}")
+        except ValueError:
+            args = {"arguments": arguments}
+        shown = ", ".join(
+            f"{k}={v!r}" if len(str(v)) <= max_arg_chars else f"{k}=<{len(str(v))} chars>"
+            for k, v in (args.items() if isinstance(args, dict) else [])
+        )
+        if len(result) > max_result_chars:
+            result = result[:max_result_chars] + " …"
+        digest.append({"name": name, "args": shown, "result": result})
+    return digest
+
+
 class AgentLoop:
     """
     The agent loop is the core processing engine.
@@ -71,6 +162,29 @@ class AgentLoop:
         restrict_to_workspace: bool = False,
         plan: str = "free",
         timezone: str = "UTC",
+        max_concurrent_turns: int = 4,
+        max_pending_turns: int = 16,
+        stream: bool = True,
+        credit_guard: "CreditGuard | None" = None,
+        usage_reporter: "UsageReporter | None" = None,
+        token_budget: "TokenBudget | None" = None,
+        offload_threshold: int = 8000,
+        offload_scope: str = "turn",
+        coalesce_window_s: float = 0.0,
+        coalesce_max_wait_s: float = 5.0,
+        on_new_message: str = "queue",
+        prefetch_max_urls: int = 2,
+        prefetch_max_bytes: int = 2_000_000,
+        turn_timeout_s: float = 300.0,
+        response_cache_ttl_s: float = 0.0,
+        response_cache_max_entries: int = 500,
+        session_manager: SessionManager | None = None,
+        summarize_after_messages: int = 0,
+        summarize_after_tokens: int = 0,
+        summary_keep_messages: int = 20,
+        summary_model: str | None = None,
+        tool_digest_chars: int = 2000,
+        session_classes: SessionClasses | None = None,
     ):
         from nanobot.config.schema import ExecToolConfig, BrowserConfig
         from nanobot.cron.service import CronService
@@ -86,6 +200,38 @@ class AgentLoop:
         self.plan = plan
         self.timezone = timezone
         self.message_count = 0
+        self.stream = stream
+        self.prefetch_max_urls = prefetch_max_urls
+        self.prefetch_max_bytes = prefetch_max_bytes
+        self.turn_timeout_s = turn_timeout_s or None
+        
+        # Turn scheduling: one worker per session keeps per-session ordering,
+        # the slots cap how many turns run at once across sessions (freed
+        # slots go to interactive turns first). While max_pending_turns are
+        # queued, new messages stay on the bus, where its lanes prioritize
+        # and bound them.
+        self.max_concurrent_turns = max(1, max_concurrent_turns)
+        self.max_pending_turns = max(self.max_concurrent_turns, max_pending_turns)
+        self._turn_slots = LaneSlots(self.max_concurrent_turns)
+        self._pending_turns = 0
+        self._turn_finished = asyncio.Event()
+        
+        # What a user's new message does to their running turn: wait behind
+        # it ("queue"), stop it and take over ("cancel"), or join it at the
+        # next LLM call ("inject")
+        if on_new_message not in ("queue", "cancel", "inject"):
+            raise ValueError(f"Unknown on_new_message mode: {on_new_message}")
+        self.on_new_message = on_new_message
+        self._active_turns: dict[str, tuple[asyncio.Task, InboundMessage, asyncio.Future | None]] = {}
+        self._superseded: set[asyncio.Task] = set()
+        self.interrupt_stats = {"superseded": 0, "injected": 0}
+        self._session_queues: dict[str, deque[tuple[InboundMessage, asyncio.Future | None, StreamCallback | None]]] = {}
+        self._session_workers: dict[str, asyncio.Task[None]] = {}
+        
+        # Bursts of messages from one user become one turn
+        self.coalescer = InboundCoalescer(
+            self._submit, window_s=coalesce_window_s, max_wait_s=coalesce_max_wait_s
+        ) if coalesce_window_s > 0 else None
         
         # Load workspace .env (user-placed API keys like BRAVE_API_KEY)
         # override=False means platform-injected env vars take precedence
@@ -112,9 +258,45 @@ class AgentLoop:
             brave_api_key = _os.environ.get("BRAVE_API_KEY") or None
         self.brave_api_key = brave_api_key
         
-        self.context = ContextBuilder(workspace, timezone=timezone)
-        self.sessions = SessionManager(workspace)
+        # Credit checks need PLATFORM_URL / CREDIT_USER_ID, possibly from .env
+        self.credit_guard = credit_guard if credit_guard is not None else CreditGuard.from_env()
+        self.usage = usage_reporter or UsageReporter.from_env(workspace)
+        
+        # Replies keep a digest of the turn's tool calls; the newest digests
+        # (up to tool_digest_chars) are shown with the history
+        self.tool_digest_chars = tool_digest_chars
+        self.context = ContextBuilder(
+            workspace, timezone=timezone, budget=token_budget, tool_digest_chars=tool_digest_chars
+        )
+        self.sessions = session_manager or SessionManager(workspace)
         self.tools = ToolRegistry()
+        # Oversized tool results stay out of the prompt, readable by handle
+        self.results = ResultStore(threshold_chars=offload_threshold)
+        
+        # Opt-in: repeated cron/heartbeat prompts reuse earlier LLM responses
+        self.response_cache = ResponseCache(
+            workspace / ".cache" / "llm",
+            is_pure_tool=self.tools.is_pure,
+            ttl_s=response_cache_ttl_s,
+            max_entries=response_cache_max_entries,
+        ) if response_cache_ttl_s > 0 else None
+        self.offload_scope = offload_scope
+        
+        # Opt-in: older messages of long chats are folded into a summary in
+        # the background, keeping the prompt the same size
+        self.compactor = SessionCompactor(
+            provider,
+            model=summary_model or self.model,
+            after_messages=summarize_after_messages,
+            after_tokens=summarize_after_tokens,
+            keep_messages=summary_keep_messages,
+            on_usage=lambda usage, model: self.usage.record(usage, model, "summary"),
+        ) if summarize_after_messages > 0 or summarize_after_tokens > 0 else None
+        self._summarizing: dict[str, asyncio.Task[None]] = {}
+        
+        # History policy per session (cron and heartbeat keep little)
+        self.session_classes = session_classes or SessionClasses()
+        self._class_compactors: dict[int, SessionCompactor] = {}
         self.subagents = SubagentManager(
             provider=provider,
             workspace=workspace,
@@ -123,6 +305,7 @@ class AgentLoop:
             brave_api_key=brave_api_key,
             exec_config=self.exec_config,
             restrict_to_workspace=restrict_to_workspace,
+            usage_reporter=self.usage,
         )
         
         self._running = False
@@ -149,6 +332,9 @@ class AgentLoop:
         self.tools.register(WebSearchTool(api_key=self.brave_api_key))
         self.tools.register(WebFetchTool())
         
+        # Offloaded result reader
+        self.tools.register(ToolResultTool(self.results))
+        
         if self.browser_config.enabled:
             self.tools.register(BrowserTool(
                 workspace=self.workspace,
@@ -172,43 +358,174 @@ class AgentLoop:
     async def run(self) -> None:
         """Run the agent loop, processing messages from the bus."""
         self._running = True
-        logger.info("Agent loop started")
+        logger.info(f"Agent loop started (max {self.max_concurrent_turns} concurrent turns)")
         
         while self._running:
+            # Backpressure: leave messages on the bus while the agent is saturated
+            if self._pending_turns >= self.max_pending_turns:
+                self._turn_finished.clear()
+                try:
+                    await asyncio.wait_for(self._turn_finished.wait(), timeout=1.0)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            
             try:
                 # Wait for next message
                 msg = await asyncio.wait_for(
                     self.bus.consume_inbound(),
                     timeout=1.0
                 )
-                
-                # Process it
+            except asyncio.TimeoutError:
+                continue
+            
+            # Hand it to its session worker; the reply is published from there
+            if self.coalescer and msg.channel != "system" and not msg.metadata.get("internal"):
+                self.coalescer.add(msg)
+            else:
+                self._submit(msg)
+        
+        if self.coalescer:
+            self.coalescer.flush()
+    
+    @staticmethod
+    def _turn_key(msg: InboundMessage) -> str:
+        """Session a message's turn belongs to (system messages route to their origin)."""
+        if msg.channel == "system":
+            return msg.chat_id if ":" in msg.chat_id else f"cli:{msg.chat_id}"
+        return msg.session_key
+    
+    def _submit(
+        self,
+        msg: InboundMessage,
+        future: asyncio.Future | None = None,
+        on_stream: "StreamCallback | None" = None,
+    ) -> None:
+        """
+        Queue a turn behind any pending turns of the same session.
+        
+        Args:
+            msg: The inbound message to process.
+            future: Resolved with the response; if None, the response is
+                published to the bus instead.
+            on_stream: Optional callback receiving visible reply deltas.
+        """
+        key = self._turn_key(msg)
+        active = self._active_turns.get(key)
+        if (
+            active
+            and self.on_new_message == "cancel"
+            and self._interruptible(msg, future)
+            and self._interruptible(active[1], active[2])
+        ):
+            logger.info(f"New message in {key}, cancelling its running turn")
+            self._superseded.add(active[0])
+            active[0].cancel()
+            self.interrupt_stats["superseded"] += 1
+        self._pending_turns += 1
+        self._session_queues.setdefault(key, deque()).append((msg, future, on_stream))
+        if key not in self._session_workers:
+            self._session_workers[key] = asyncio.create_task(self._drain_session(key))
+    
+    async def _drain_session(self, key: str) -> None:
+        """Process one session's queued turns in order, then exit."""
+        queue = self._session_queues[key]
+        try:
+            while queue:
+                msg, future, on_stream = queue.popleft()
+                self.results.set_scope(key)
+                turn = None
                 try:
-                    response = await self._process_message(msg)
-                    if response:
-                        await self.bus.publish_outbound(response)
+                    async with self._turn_slots.slot(inbound_lane(msg)):
+                        turn = asyncio.create_task(self._process_message(
+                            msg, on_stream=on_stream, stream_to_bus=future is None
+                        ))
+                        self._active_turns[key] = (turn, msg, future)
+                        try:
+                            response = await turn
+                        finally:
+                            self._active_turns.pop(key, None)
+                except asyncio.CancelledError:
+                    if turn not in self._superseded:
+                        raise
+                    # Superseded by a newer message, which is next in the queue
+                    self._superseded.discard(turn)
+                    continue
                 except Exception as e:
                     logger.error(f"Error processing message: {e}")
-                    # Send error response
-                    await self.bus.publish_outbound(OutboundMessage(
-                        channel=msg.channel,
-                        chat_id=msg.chat_id,
-                        content=f"Sorry, I encountered an error: {str(e)}"
-                    ))
-            except asyncio.TimeoutError:
-                continue
+                    if future is not None:
+                        if not future.done():
+                            future.set_exception(e)
+                    else:
+                        # Send error response, replacing any live preview
+                        stream_id = msg.metadata.get("stream_id")
+                        await self.bus.publish_outbound(OutboundMessage(
+                            channel=msg.channel,
+                            chat_id=msg.chat_id,
+                            content=f"Sorry, I encountered an error: {str(e)}",
+                            metadata={"stream_id": stream_id} if stream_id else {},
+                        ))
+                    continue
+                finally:
+                    if self.offload_scope == "turn":
+                        self.results.drop_scope(key)
+                    self._turn_done()
+                
+                if future is not None:
+                    if not future.done():
+                        future.set_result(response)
+                elif response:
+                    await self.bus.publish_outbound(response)
+        finally:
+            # Never strand callers waiting on turns that will not run
+            for _, future, _ in queue:
+                if future is not None and not future.done():
+                    future.cancel()
+                self._turn_done()
+            self._session_queues.pop(key, None)
+            self._session_workers.pop(key, None)
+    
+    @staticmethod
+    def _interruptible(msg: InboundMessage, future: asyncio.Future | None) -> bool:
+        """Whether a turn is a user's chat message (not system, internal or direct)."""
+        return future is None and msg.channel != "system" and not msg.metadata.get("internal")
+    
+    def _take_injectable(self, key: str) -> list[InboundMessage]:
+        """Remove and return the user messages queued behind a session's running turn."""
+        queue = self._session_queues.get(key)
+        if self.on_new_message != "inject" or not queue:
+            return []
+        taken = []
+        while queue and self._interruptible(queue[0][0], queue[0][1]):
+            taken.append(queue.popleft()[0])
+            self._turn_done()
+        self.interrupt_stats["injected"] += len(taken)
+        return taken
+    
+    def _turn_done(self) -> None:
+        """Count a turn as finished, waking run() if it is holding back."""
+        self._pending_turns -= 1
+        self._turn_finished.set()
     
     def stop(self) -> None:
         """Stop the agent loop."""
         self._running = False
         logger.info("Agent loop stopping")
     
-    async def _process_message(self, msg: InboundMessage) -> OutboundMessage | None:
+    async def _process_message(
+        self,
+        msg: InboundMessage,
+        on_stream: "StreamCallback | None" = None,
+        stream_to_bus: bool = False,
+    ) -> OutboundMessage | None:
         """
         Process a single inbound message.
         
         Args:
             msg: The inbound message to process.
+            on_stream: Receives visible reply deltas as they are generated.
+            stream_to_bus: Publish partial replies to the bus so the channel
+                can show a live preview (when streaming is enabled).
         
         Returns:
             The response message, or None if no response needed.
@@ -236,39 +553,21 @@ class AgentLoop:
 
         
         # Platform credit pre-check: block messages when credits are exhausted
-        if not is_internal:
-            platform_url = os.environ.get("PLATFORM_URL")
-            credit_user_id = os.environ.get("CREDIT_USER_ID")
-            if platform_url and credit_user_id:
-                try:
-                    import urllib.request
-                    req = urllib.request.Request(
-                        f"{platform_url}/api/internal/credit-check/{credit_user_id}",
-                        headers={"Accept": "application/json"}
-                    )
-                    with urllib.request.urlopen(req, timeout=3) as resp:
-                        data = json.loads(resp.read())
-                        if not data.get("ok", True):
-                            logger.warning(f"Credits exhausted for user {credit_user_id}")
-                            return OutboundMessage(
-                                channel=msg.channel,
-                                chat_id=msg.chat_id,
-                                content="⚠️ Your credits have been used up. Please top up your account to continue chatting: https://myclaw.host/topup"
-                            )
-                except Exception as e:
-                    # Fail-closed: if the check fails, block the message to protect credits
-                    logger.warning(f"Credit check failed (blocking message): {e}")
-                    return OutboundMessage(
-                        channel=msg.channel,
-                        chat_id=msg.chat_id,
-                        content="⚠️ Unable to verify your credit balance. Please try again in a moment."
-                    )
+        if not is_internal and self.credit_guard:
+            credits = await self.credit_guard.check()
+            if not credits.ok:
+                if credits.error:
+                    content = "⚠️ Unable to verify your credit balance. Please try again in a moment."
+                else:
+                    logger.warning(f"Credits exhausted for user {self.credit_guard.user_id}")
+                    content = "⚠️ Your credits have been used up. Please top up your account to continue chatting: https://myclaw.host/topup"
+                return OutboundMessage(channel=msg.channel, chat_id=msg.chat_id, content=content)
         
         if not is_internal:
             self.message_count += 1
         
         # Get or create session
-        session = self.sessions.get_or_create(msg.session_key)
+        session = self._get_session(msg.session_key)
         
         # Update tool contexts
         message_tool = self.tools.get("message")
@@ -283,100 +582,169 @@ class AgentLoop:
         if isinstance(cron_tool, CronTool):
             cron_tool.set_context(msg.channel, msg.chat_id)
         
+        # Repeated identical tool calls of this turn are answered from memory
+        self.tools.start_turn()
+        
         # Build initial messages (use get_history for LLM-formatted messages)
         messages = self.context.build_messages(
-            history=session.get_history(),
+            history=self._history(session),
             current_message=msg.content,
             media=msg.media if msg.media else None,
             channel=msg.channel,
             chat_id=msg.chat_id,
+            model=self.model,
+            summary=session.summary,
         )
         
-        # Agent loop
+        # Live preview: channels that can edit messages render it in place
+        stream_id = None
+        if on_stream is None and stream_to_bus and self.stream and not is_internal:
+            stream_id = uuid.uuid4().hex[:12]
+            on_stream = self._bus_stream_callback(msg.channel, msg.chat_id, stream_id)
+            # Recorded on the message so an error reply can close the preview
+            msg.metadata["stream_id"] = stream_id
+        
+        # Agent loop, within the turn's time budget
         iteration = 0
         final_content = None
-        total_prompt_tokens = 0
-        total_completion_tokens = 0
+        deadline = Deadline(self.turn_timeout_s)
+        timed_out = False
+        partial = None  # Interim text of the latest tool-calling response
         total_tool_failures = 0  # Track failures across ALL iterations
+        streamed_any = False
         
-        while iteration < self.max_iterations:
-            iteration += 1
-            
-            # Call LLM
-            response = await self.provider.chat(
-                messages=messages,
-                tools=self.tools.get_definitions(),
-                model=self.model
+        # Links in the message are usually fetched first thing; start now,
+        # overlapping the first LLM call
+        web_fetch = self.tools.get("web_fetch")
+        if not isinstance(web_fetch, WebFetchTool) or not self.prefetch_max_urls:
+            web_fetch = None
+        else:
+            web_fetch.start_prefetch(
+                extract_urls(msg.content, self.prefetch_max_urls), self.prefetch_max_bytes, deadline
             )
+        
+        turn_start = len(messages)
+        injected: list[str] = []
+        try:
+            while iteration < self.max_iterations:
+                iteration += 1
+                if deadline.expired:
+                    timed_out = True
+                    break
+                
+                # Messages the user sent meanwhile join the turn
+                for extra in self._take_injectable(msg.session_key):
+                    logger.info(f"Injecting new message into running turn of {msg.session_key}")
+                    injected.append(extra.content)
+                    messages.append({"role": "user", "content": extra.content})
+                
+                # Call LLM (streamed when someone is watching)
+                if on_stream and iteration > 1 and streamed_any:
+                    # Separate interim text of earlier iterations in the preview
+                    await on_stream("\n\n")
+                response, streamed = await self._chat(
+                    messages, on_stream, deadline=deadline,
+                    cacheable=is_internal or msg.metadata.get("cacheable", False),
+                )
+                streamed_any = streamed_any or streamed
+                if deadline.expired and (response.finish_reason == "error" or response.has_tool_calls):
+                    timed_out = True
+                    break
             
-            # Accumulate token usage
-            if response.usage:
-                total_prompt_tokens += response.usage.get('prompt_tokens', 0)
-                total_completion_tokens += response.usage.get('completion_tokens', 0)
             
-            # Handle tool calls
-            if response.has_tool_calls:
-                # Add assistant message with tool calls
-                tool_call_dicts = [
-                    {
-                        "id": tc.id,
-                        "type": "function",
-                        "function": {
-                            "name": tc.name,
-                            "arguments": json.dumps(tc.arguments)  # Must be JSON string
+                # Handle tool calls
+                if response.has_tool_calls:
+                    partial = response.content or partial
+                    # Add assistant message with tool calls
+                    tool_call_dicts = [
+                        {
+                            "id": tc.id,
+                            "type": "function",
+                            "function": {
+                                "name": tc.name,
+                                "arguments": json.dumps(tc.arguments)  # Must be JSON string
+                            }
                         }
-                    }
-                    for tc in response.tool_calls
-                ]
-                messages = self.context.add_assistant_message(
-                    messages, response.content, tool_call_dicts
-                )
+                        for tc in response.tool_calls
+                    ]
+                    messages = self.context.add_assistant_message(
+                        messages, response.content, tool_call_dicts
+                    )
                 
-                # Execute tools
-                sequential_failures = 0
-                for tool_call in response.tool_calls:
-                    args_str = json.dumps(tool_call.arguments)
-                    logger.debug(f"Executing tool: {tool_call.name} with arguments: {args_str}")
+                    # Execute tools: concurrency-safe calls in a batch run in
+                    # parallel, results are still recorded in call order
+                    sequential_failures = 0
+                    max_fails = self.browser_config.max_tool_retries
+                    for batch in self.tools.plan_batches(response.tool_calls):
+                        for tool_call in batch:
+                            args_str = json.dumps(tool_call.arguments)
+                            logger.debug(f"Executing tool: {tool_call.name} with arguments: {args_str}")
                     
-                    try:
-                        result = await self.tools.execute(tool_call.name, tool_call.arguments)
+                        results = await self.tools.execute_batch(batch, deadline)
+                    
+                        for tool_call, result in zip(batch, results):
+                            # Check for error signature in result
+                            if isinstance(result, str) and result.startswith("Error:"):
+                                sequential_failures += 1
+                                total_tool_failures += 1
+                                logger.warning(f"Tool {tool_call.name} failed ({sequential_failures}/{max_fails}, total: {total_tool_failures})")
+                            else:
+                                sequential_failures = 0
                         
-                        # Check for error signature in result
-                        if isinstance(result, str) and result.startswith("Error:"):
-                            sequential_failures += 1
-                            total_tool_failures += 1
-                            logger.warning(f"Tool {tool_call.name} failed ({sequential_failures}/{self.browser_config.max_tool_retries}, total: {total_tool_failures})")
-                        else:
-                            sequential_failures = 0
-                            
-                    except Exception as e:
-                        result = f"Error: Tool execution crashed: {str(e)}"
-                        sequential_failures += 1
-                        total_tool_failures += 1
-                        logger.error(f"Tool {tool_call.name} crashed: {e}")
-
-                    messages = self.context.add_tool_result(
-                        messages, tool_call.id, tool_call.name, result
-                    )
+                            messages = self.context.add_tool_result(
+                                messages, tool_call.id, tool_call.name,
+                                self.results.offload(tool_call.name, result)
+                            )
+                        
+                            # Stop if we hit too many failures in a row within this turn
+                            if sequential_failures >= max_fails:
+                                final_content = f"I've encountered repeated errors while trying to complete your request. The last error was: {result}. Please double-check the requirements or provide more details so I can assist better."
+                                break
                     
-                    # Stop if we hit too many failures in a row within this turn
-                    max_fails = self.browser_config.max_tool_retries
-                    if sequential_failures >= max_fails:
-                        final_content = f"I've encountered repeated errors while trying to complete your request. The last error was: {result}. Please double-check the requirements or provide more details so I can assist better."
-                        break
+                        if final_content:
+                            break
                 
-                # Stop if total failures across all iterations is too high
-                # This prevents infinite retry loops across LLM turns
-                if total_tool_failures >= 10:
-                    logger.warning(f"Total tool failures reached {total_tool_failures}, aborting agent loop")
-                    final_content = f"I've encountered too many errors ({total_tool_failures} total) across multiple attempts. The last error was: {result}. Please check the requirements or try a different approach."
+                    # Stop if total failures across all iterations is too high
+                    # This prevents infinite retry loops across LLM turns
+                    if total_tool_failures >= 10:
+                        logger.warning(f"Total tool failures reached {total_tool_failures}, aborting agent loop")
+                        final_content = f"I've encountered too many errors ({total_tool_failures} total) across multiple attempts. The last error was: {result}. Please check the requirements or try a different approach."
                 
-                if final_content:
+                    if final_content:
+                        break
+                else:
+                    # No tool calls, we're done
+                    final_content = response.content
                     break
-            else:
-                # No tool calls, we're done
-                final_content = response.content
-                break
+        
+        except asyncio.CancelledError:
+            # Keep what the turn did so the follow-up turn can build on it
+            session.add_message("user", msg.content)
+            for content in injected:
+                session.add_message("user", content)
+            session.add_message("assistant", _interrupted_note(messages[turn_start:]))
+            self._save_session(session)
+            if stream_id and streamed_any:
+                await self.bus.publish_outbound(OutboundMessage(
+                    channel=msg.channel,
+                    chat_id=msg.chat_id,
+                    content="⏹️ Stopped — looking at your new message.",
+                    metadata={"stream_id": stream_id},
+                ))
+            raise
+        finally:
+            if web_fetch:
+                web_fetch.end_prefetch()
+        
+        history_content = None
+        if timed_out:
+            # Best partial answer; the history keeps the work for a follow-up
+            logger.warning(f"Turn for {msg.session_key} hit its {self.turn_timeout_s:.0f}s time limit")
+            final_content = (
+                (f"{_strip_thinking(partial)}\n\n" if partial else "")
+                + "⏱️ I ran out of time before finishing this. Ask me to continue and I'll pick up where I left off."
+            )
+            history_content = f"{final_content}\n\n{_interrupted_note(messages[turn_start:], 'the time limit')}"
         
         if final_content is None:
             final_content = "I've completed processing but have no response to give."
@@ -386,24 +754,158 @@ class AgentLoop:
         
         # Save to session
         session.add_message("user", msg.content)
-        session.add_message("assistant", final_content)
-        self.sessions.save(session)
-        
-        # Emit usage report for platform credits tracking
-        if total_prompt_tokens > 0 or total_completion_tokens > 0:
-            usage_data = json.dumps({
-                "prompt_tokens": total_prompt_tokens,
-                "completion_tokens": total_completion_tokens,
-                "model": self.model
-            })
-            print(f"[USAGE] {usage_data}", flush=True)
+        for content in injected:
+            session.add_message("user", content)
+        digest = _tool_digest(messages[turn_start:]) if self.tool_digest_chars > 0 and not timed_out else []
+        session.add_message("assistant", history_content or final_content, **({"tools": digest} if digest else {}))
+        self._save_session(session)
         
         return OutboundMessage(
             channel=msg.channel,
             chat_id=msg.chat_id,
-            content=final_content
+            content=final_content,
+            metadata={"stream_id": stream_id} if stream_id else {},
         )
     
+    def _get_session(self, key: str) -> Session:
+        """The session of a turn; ephemeral sessions start empty every time."""
+        if self.session_classes.policy_for(key).policy == "ephemeral":
+            return Session(key=key)
+        return self.sessions.get_or_create(key)
+    
+    def _history(self, session: Session) -> list[dict[str, Any]]:
+        """History for the next prompt, as far as the session's policy keeps it."""
+        policy = self.session_classes.policy_for(session.key)
+        max_messages = self.context.budget.max_history_messages
+        if policy.policy == "ring":
+            max_messages = min(max_messages, policy.max_messages)
+        return session.get_history(max_messages=max_messages)
+    
+    def _compactor_for(self, policy: SessionPolicy) -> SessionCompactor | None:
+        """Summarizer of a session class (the global one for full history)."""
+        if policy.policy == "full":
+            return self.compactor
+        if policy.policy != "summarized":
+            return None
+        if policy.max_messages not in self._class_compactors:
+            self._class_compactors[policy.max_messages] = SessionCompactor(
+                self.provider,
+                model=self.compactor.model if self.compactor else self.model,
+                after_messages=policy.max_messages,
+                keep_messages=max(1, policy.max_messages // 2),
+                on_usage=lambda usage, model: self.usage.record(usage, model, "summary"),
+            )
+        return self._class_compactors[policy.max_messages]
+    
+    def _save_session(self, session: Session) -> None:
+        """Save a session as its policy says, summarizing older messages in the background when due."""
+        policy = self.session_classes.policy_for(session.key)
+        if policy.policy == "ephemeral":
+            return
+        if policy.policy == "ring":
+            session.keep_last(policy.max_messages)
+        self.sessions.save(session)
+        
+        compactor = self._compactor_for(policy)
+        if not compactor or session.key in self._summarizing or not compactor.due(session):
+            return
+        
+        async def summarize() -> None:
+            try:
+                result = await compactor.summarize(session)
+                if result:
+                    # The session may have been evicted and reloaded during
+                    # the call; update whichever copy is current
+                    current = self.sessions.get_or_create(session.key)
+                    if compactor.apply(current, *result):
+                        self.sessions.save(current)
+            except Exception as e:
+                logger.warning(f"Summarizing session {session.key} failed: {e}")
+            finally:
+                self._summarizing.pop(session.key, None)
+        
+        self._summarizing[session.key] = asyncio.create_task(summarize())
+    
+    async def _chat(
+        self,
+        messages: list[dict[str, Any]],
+        on_stream: "StreamCallback | None" = None,
+        source: str = "agent",
+        deadline: Deadline | None = None,
+        cacheable: bool = False,
+    ) -> tuple[LLMResponse, bool]:
+        """
+        Call the LLM, streaming visible text to on_stream if given.
+        
+        Token usage of the call is queued for reporting to the platform.
+        Cacheable (internal) calls are served from the response cache when
+        it is enabled.
+        
+        Returns:
+            The complete response and whether any text was streamed.
+        """
+        if on_stream is None:
+            tools = self.tools.get_definitions()
+            cache_key = None
+            if cacheable and self.response_cache:
+                cache_key = self.response_cache.key(messages, tools, self.model)
+                cached = await asyncio.to_thread(self.response_cache.get, cache_key)
+                if cached is not None:
+                    return cached, False
+            
+            response = await self.provider.chat(
+                messages=messages,
+                tools=tools,
+                model=self.model,
+                deadline=deadline,
+            )
+            self.usage.record(response.usage, self.model, source)
+            if cache_key:
+                await asyncio.to_thread(self.response_cache.put, cache_key, response)
+            return response, False
+        
+        response: LLMResponse | None = None
+        streamed = False
+        thinking = ThinkingFilter()
+        async for event in self.provider.chat_stream(
+            messages=messages,
+            tools=self.tools.get_definitions(),
+            model=self.model,
+            deadline=deadline,
+        ):
+            if event.response is not None:
+                response = event.response
+            visible = thinking.feed(event.delta) if event.delta else ""
+            if visible and on_stream is not None:
+                try:
+                    await on_stream(visible)
+                    streamed = True
+                except Exception as e:
+                    # A gone listener must not fail the turn
+                    logger.debug(f"Stream listener failed, continuing without it: {e}")
+                    on_stream = None
+        
+        if response is None:
+            response = LLMResponse(content="Error calling LLM: stream ended without a response", finish_reason="error")
+        self.usage.record(response.usage, self.model, source)
+        return response, streamed
+    
+    def _bus_stream_callback(self, channel: str, chat_id: str, stream_id: str) -> "StreamCallback":
+        """Publish the growing reply to the bus as partial outbound messages."""
+        text = ""
+        
+        async def publish(delta: str) -> None:
+            nonlocal text
+            text += delta
+            await self.bus.publish_outbound(OutboundMessage(
+                channel=channel,
+                chat_id=chat_id,
+                content=text,
+                metadata={"stream_id": stream_id, "streaming": True},
+            ))
+        
+        return publish
+    
     async def _process_system_message(self, msg: InboundMessage) -> OutboundMessage | None:
         """
         Process a system message (e.g., subagent announce).
@@ -425,7 +927,7 @@ class AgentLoop:
         
         # Use the origin session for context
         session_key = f"{origin_channel}:{origin_chat_id}"
-        session = self.sessions.get_or_create(session_key)
+        session = self._get_session(session_key)
         
         # Update tool contexts
         message_tool = self.tools.get("message")
@@ -440,26 +942,27 @@ class AgentLoop:
         if isinstance(cron_tool, CronTool):
             cron_tool.set_context(origin_channel, origin_chat_id)
         
+        self.tools.start_turn()
+        
         # Build messages with the announce content
         messages = self.context.build_messages(
-            history=session.get_history(),
+            history=self._history(session),
             current_message=msg.content,
             channel=origin_channel,
             chat_id=origin_chat_id,
+            model=self.model,
+            summary=session.summary,
         )
         
         # Agent loop (limited for announce handling)
         iteration = 0
         final_content = None
+        deadline = Deadline(self.turn_timeout_s)
         
-        while iteration < self.max_iterations:
+        while iteration < self.max_iterations and not deadline.expired:
             iteration += 1
             
-            response = await self.provider.chat(
-                messages=messages,
-                tools=self.tools.get_definitions(),
-                model=self.model
-            )
+            response, _ = await self._chat(messages, source="system", deadline=deadline)
             
             if response.has_tool_calls:
                 tool_call_dicts = [
@@ -477,13 +980,16 @@ class AgentLoop:
                     messages, response.content, tool_call_dicts
                 )
                 
-                for tool_call in response.tool_calls:
-                    args_str = json.dumps(tool_call.arguments)
-                    logger.debug(f"Executing tool: {tool_call.name} with arguments: {args_str}")
-                    result = await self.tools.execute(tool_call.name, tool_call.arguments)
-                    messages = self.context.add_tool_result(
-                        messages, tool_call.id, tool_call.name, result
-                    )
+                for batch in self.tools.plan_batches(response.tool_calls):
+                    for tool_call in batch:
+                        args_str = json.dumps(tool_call.arguments)
+                        logger.debug(f"Executing tool: {tool_call.name} with arguments: {args_str}")
+                    results = await self.tools.execute_batch(batch, deadline)
+                    for tool_call, result in zip(batch, results):
+                        messages = self.context.add_tool_result(
+                            messages, tool_call.id, tool_call.name,
+                            self.results.offload(tool_call.name, result)
+                        )
             else:
                 final_content = response.content
                 break
@@ -497,7 +1003,7 @@ class AgentLoop:
         # Save to session (mark as system message in history)
         session.add_message("user", f"[System: {msg.sender_id}] {msg.content}")
         session.add_message("assistant", final_content)
-        self.sessions.save(session)
+        self._save_session(session)
         
         return OutboundMessage(
             channel=origin_channel,
@@ -512,16 +1018,25 @@ class AgentLoop:
         channel: str = "cli",
         chat_id: str = "direct",
         internal: bool = False,
+        on_stream: "StreamCallback | None" = None,
+        cacheable: bool = False,
     ) -> str:
         """
         Process a message directly (for CLI, cron, or heartbeat usage).
         
+        The turn is queued behind any turn already running for the same
+        session, so it never races with messages arriving from the bus.
+        
         Args:
             content: The message content.
             session_key: Session identifier.
             channel: Source channel (for context).
             chat_id: Source chat ID (for context).
             internal: If True, exempt from rate limits (for cron/heartbeat).
+            on_stream: Optional async callback receiving visible reply deltas
+                while the reply is generated (e.g. for SSE).
+            cacheable: Allow the response cache for this turn (implied by
+                internal).
         
         Returns:
             The agent's response.
@@ -531,8 +1046,10 @@ class AgentLoop:
             sender_id="cron" if internal else "user",
             chat_id=chat_id,
             content=content,
-            metadata={"internal": internal, "session_key_override": session_key},
+            metadata={"internal": internal, "session_key_override": session_key, "cacheable": cacheable},
         )
         
-        response = await self._process_message(msg)
+        future: asyncio.Future[OutboundMessage | None] = asyncio.get_running_loop().create_future()
+        self._submit(msg, future, on_stream)
+        response = await future
         return response.content if response else ""
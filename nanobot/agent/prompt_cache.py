@@ -0,0 +1,97 @@
+"""Section cache for system prompt assembly."""
+
+import os
+import time
+from pathlib import Path
+from typing import Any, Callable, Hashable
+
+from loguru import logger
+
+
+def file_fingerprint(path: Path) -> tuple[str, int | None, int | None]:
+    """(path, mtime_ns, size) of a file; mtime and size are None if it is missing."""
+    try:
+        st = path.stat()
+        return (str(path), st.st_mtime_ns, st.st_size)
+    except OSError:
+        return (str(path), None, None)
+
+
+def dir_fingerprint(path: Path, entry_file: str) -> tuple[Any, ...]:
+    """
+    Fingerprint a directory of entries such as skills/<name>/SKILL.md.
+
+    Covers the directory itself (entries added or removed) and entry_file
+    of every subdirectory (entries edited).
+    """
+    fps: list[Any] = [file_fingerprint(path)]
+    try:
+        for child in sorted(path.iterdir()):
+            if child.is_dir():
+                fps.append(file_fingerprint(child / entry_file))
+    except OSError:
+        pass
+    return tuple(fps)
+
+
+def environment_fingerprint() -> tuple[Any, ...]:
+    """
+    Fingerprint what skill requirement checks look at.
+
+    Installing a binary changes the mtime of its PATH directory; requirement
+    env vars only matter by being set or not.
+    """
+    path_dirs = tuple(
+        file_fingerprint(Path(d)) for d in os.environ.get("PATH", "").split(os.pathsep) if d
+    )
+    env_keys = frozenset(k for k, v in os.environ.items() if v)
+    return (path_dirs, env_keys)
+
+
+class PromptCache:
+    """
+    Memoizes prompt sections by the fingerprint of their inputs.
+
+    A section is rebuilt only when its key changes, e.g. when one of the
+    files it is made from has a new (path, mtime_ns, size) fingerprint.
+    """
+
+    def __init__(self):
+        self._sections: dict[str, tuple[Hashable, str]] = {}
+        self.stats = {"hits": 0, "rebuilds": 0, "rebuild_s": 0.0}
+
+    def get(self, name: str, key: Hashable, build: Callable[[], str]) -> str:
+        """
+        Get a section, rebuilding it if its key changed.
+
+        Args:
+            name: Section name.
+            key: Fingerprint of everything the section is built from.
+            build: Builds the section content.
+
+        Returns:
+            The section content.
+        """
+        cached = self._sections.get(name)
+        if cached is not None and cached[0] == key:
+            self.stats["hits"] += 1
+            return cached[1]
+
+        start = time.perf_counter()
+        content = build()
+        elapsed = time.perf_counter() - start
+        self._sections[name] = (key, content)
+        self.stats["rebuilds"] += 1
+        self.stats["rebuild_s"] += elapsed
+        logger.debug(f"Rebuilt prompt section '{name}' in {elapsed * 1000:.1f}ms")
+        return content
+
+    @property
+    def hit_rate(self) -> float:
+        """Share of section lookups served from cache."""
+        total = self.stats["hits"] + self.stats["rebuilds"]
+        return self.stats["hits"] / total if total else 0.0
+
+    def clear(self) -> None:
+        """Drop all cached sections."""
+        self._sections.clear()
@@ -0,0 +1,119 @@
+"""Incremental filtering of streamed LLM output."""
+
+import re
+
+# Block tags whose content is never shown to the user, mapped to the
+# closing tags that end them (mirrors _strip_thinking in loop.py).
+_OPEN_TAG = re.compile(r'<(think(?:ing)?|reasoning)>', re.IGNORECASE)
+_CLOSE_TAGS = {
+    "think": re.compile(r'</think(?:ing)?>', re.IGNORECASE),
+    "thinking": re.compile(r'</think(?:ing)?>', re.IGNORECASE),
+    "reasoning": re.compile(r'</reasoning>', re.IGNORECASE),
+}
+_OPEN_TAG_TEXTS = ("<think>", "<thinking>", "<reasoning>")
+_CLOSE_TAG_TEXTS = ("</think>", "</thinking>", "</reasoning>")
+
+# Lines starting with these (after strip, lowercased) are dropped
+_THOUGHT_PREFIXES = ("thought:", "**thought:", "thinking:")
+
+
+def _partial_tag_start(text: str, tags: tuple[str, ...]) -> int:
+    """Index where a possibly incomplete tag begins at the end of text, or -1."""
+    start = text.rfind("<")
+    if start == -1:
+        return -1
+    tail = text[start:].lower()
+    if any(tag.startswith(tail) and tag != tail for tag in tags):
+        return start
+    return -1
+
+
+class ThinkingFilter:
+    """
+    Streaming counterpart of _strip_thinking.
+
+    Feed raw deltas in, get the user-visible part of each delta out. Text is
+    held back only while it could still turn out to be part of a thinking
+    block or a "thought:" line, so visible tokens pass through immediately.
+    The final reply is still cleaned with _strip_thinking; this filter only
+    drives the live preview.
+    """
+
+    def __init__(self):
+        self._raw = ""            # unprocessed input (may end in a partial tag)
+        self._block: str | None = None  # open block kind while inside one
+        self._line = ""           # current output line, not yet newline-terminated
+        self._line_state: str | None = None  # None (undecided), "keep" or "drop"
+        self._started = False     # leading whitespace is dropped, like .strip()
+
+    def feed(self, delta: str) -> str:
+        """Process a raw delta and return the newly visible text."""
+        self._raw += delta
+        return self._filter_lines(self._strip_blocks())
+
+    def _strip_blocks(self) -> str:
+        """Remove complete thinking blocks; keep partial tags buffered."""
+        out: list[str] = []
+        while self._raw:
+            if self._block is None:
+                m = _OPEN_TAG.search(self._raw)
+                if m:
+                    out.append(self._raw[:m.start()])
+                    self._block = m.group(1).lower()
+                    self._raw = self._raw[m.end():]
+                    continue
+                hold = _partial_tag_start(self._raw, _OPEN_TAG_TEXTS)
+                if hold == -1:
+                    out.append(self._raw)
+                    self._raw = ""
+                else:
+                    out.append(self._raw[:hold])
+                    self._raw = self._raw[hold:]
+                break
+
+            m = _CLOSE_TAGS[self._block].search(self._raw)
+            if m:
+                self._block = None
+                self._raw = self._raw[m.end():]
+                continue
+            hold = _partial_tag_start(self._raw, _CLOSE_TAG_TEXTS)
+            self._raw = self._raw[hold:] if hold != -1 else ""
+            break
+        return "".join(out)
+
+    def _filter_lines(self, text: str) -> str:
+        """Drop "thought:" lines; emit everything else as soon as it is known."""
+        out: list[str] = []
+        for i, piece in enumerate(text.split("\n")):
+            if i > 0:
+                # The current line is complete
+                if self._line_state is None:
+                    self._line_state = self._classify(final=True)
+                    if self._line_state == "keep":
+                        out.append(self._line)
+                if self._line_state == "keep":
+                    out.append("\n")
+                self._line, self._line_state = "", None
+
+            self._line += piece
+            if self._line_state == "keep":
+                out.append(piece)
+            elif self._line_state is None:
+                self._line_state = self._classify(final=False)
+                if self._line_state == "keep":
+                    out.append(self._line)
+
+        visible = "".join(out)
+        if not self._started:
+            visible = visible.lstrip()
+            self._started = bool(visible)
+        return visible
+
+    def _classify(self, final: bool) -> str | None:
+        """Decide whether the current line is shown, or None if undecidable yet."""
+        s = self._line.strip().lower()
+        if any(s.startswith(p) for p in _THOUGHT_PREFIXES):
+            return "drop"
+        if not final and (not s or any(p.startswith(s) for p in _THOUGHT_PREFIXES)):
+            return None
+        return "keep"
@@ -8,6 +8,7 @@ from typing import Any
 
 from loguru import logger
 
+from nanobot.billing import UsageReporter
 from nanobot.bus.events import InboundMessage
 from nanobot.bus.queue import MessageBus
 from nanobot.providers.base import LLMProvider
@@ -35,6 +36,7 @@ class SubagentManager:
         brave_api_key: str | None = None,
         exec_config: "ExecToolConfig | None" = None,
         restrict_to_workspace: bool = False,
+        usage_reporter: "UsageReporter | None" = None,
     ):
         from nanobot.config.schema import ExecToolConfig
         self.provider = provider
@@ -44,6 +46,7 @@ class SubagentManager:
         self.brave_api_key = brave_api_key
         self.exec_config = exec_config or ExecToolConfig()
         self.restrict_to_workspace = restrict_to_workspace
+        self.usage = usage_reporter
         self._running_tasks: dict[str, asyncio.Task[None]] = {}
     
     async def spawn(
@@ -109,6 +112,7 @@ class SubagentManager:
             ))
             tools.register(WebSearchTool(api_key=self.brave_api_key))
             tools.register(WebFetchTool())
+            tools.start_turn()
             
             # Build messages with subagent-specific prompt
             system_prompt = self._build_subagent_prompt(task)
@@ -130,6 +134,8 @@ class SubagentManager:
                     tools=tools.get_definitions(),
                     model=self.model,
                 )
+                if self.usage:
+                    self.usage.record(response.usage, self.model, "subagent")
                 
                 if response.has_tool_calls:
                     # Add assistant message with tool calls
@@ -150,17 +156,19 @@ class SubagentManager:
                         "tool_calls": tool_call_dicts,
                     })
                     
-                    # Execute tools
-                    for tool_call in response.tool_calls:
-                        args_str = json.dumps(tool_call.arguments)
-                        logger.debug(f"Subagent [{task_id}] executing: {tool_call.name} with arguments: {args_str}")
-                        result = await tools.execute(tool_call.name, tool_call.arguments)
-                        messages.append({
-                            "role": "tool",
-                            "tool_call_id": tool_call.id,
-                            "name": tool_call.name,
-                            "content": result,
-                        })
+                    # Execute tools (independent read-only calls run in parallel)
+                    for batch in tools.plan_batches(response.tool_calls):
+                        for tool_call in batch:
+                            args_str = json.dumps(tool_call.arguments)
+                            logger.debug(f"Subagent [{task_id}] executing: {tool_call.name} with arguments: {args_str}")
+                        results = await tools.execute_batch(batch)
+                        for tool_call, result in zip(batch, results):
+                            messages.append({
+                                "role": "tool",
+                                "tool_call_id": tool_call.id,
+                                "name": tool_call.name,
+                                "content": result,
+                            })
                 else:
                     final_result = response.content
                     break
@@ -0,0 +1,112 @@
+"""Token estimation and context budgeting."""
+
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any
+
+# Fallback when the model's context window is unknown
+DEFAULT_CONTEXT_WINDOW = 128_000
+
+# Per-message framing overhead (role, separators) in chat formats
+MESSAGE_OVERHEAD_TOKENS = 4
+
+# Rough cost of an attached image
+IMAGE_TOKENS = 1_000
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the token count of text.
+
+    Uses UTF-8 length / 4: about right for English with BPE tokenizers and
+    conservative for CJK and code, without loading a tokenizer.
+    """
+    if not text:
+        return 0
+    return (len(text.encode("utf-8")) + 3) // 4
+
+
+def estimate_message_tokens(message: dict[str, Any]) -> int:
+    """Estimate the tokens a chat message occupies in the prompt."""
+    content = message.get("content")
+    tokens = MESSAGE_OVERHEAD_TOKENS
+    if isinstance(content, str):
+        tokens += estimate_tokens(content)
+    elif isinstance(content, list):
+        for part in content:
+            if part.get("type") == "text":
+                tokens += estimate_tokens(part.get("text", ""))
+            else:
+                tokens += IMAGE_TOKENS
+    for tc in message.get("tool_calls") or []:
+        fn = tc.get("function", {})
+        tokens += estimate_tokens(fn.get("name", "")) + estimate_tokens(fn.get("arguments", ""))
+    return tokens
+
+
+@lru_cache(maxsize=64)
+def context_window(model: str | None) -> int:
+    """Input context window of a model, from litellm's model table."""
+    if not model:
+        return DEFAULT_CONTEXT_WINDOW
+    try:
+        import litellm
+        info = litellm.get_model_info(model)
+        return int(info.get("max_input_tokens") or info.get("max_tokens") or DEFAULT_CONTEXT_WINDOW)
+    except Exception:
+        return DEFAULT_CONTEXT_WINDOW
+
+
+@dataclass
+class TokenBudget:
+    """
+    How the prompt's token budget is split.
+
+    The total is max_context_tokens, capped by the model's context window
+    minus the reply reserve. The system prompt and the current turn are never
+    cut; whatever part of their shares they leave unused goes to history.
+    """
+    max_context_tokens: int = 32_000
+    reply_tokens: int = 8_192
+    system_share: float = 0.25
+    history_share: float = 0.5
+    turn_share: float = 0.25
+    max_history_messages: int = 200
+
+    def total(self, model: str | None = None) -> int:
+        """Prompt tokens available for a model."""
+        window = context_window(model) - self.reply_tokens
+        return max(1_000, min(self.max_context_tokens, window))
+
+    def history_tokens(self, model: str | None, system_tokens: int, turn_tokens: int) -> int:
+        """Tokens left for history given the actual system prompt and turn sizes."""
+        total = self.total(model)
+        unused_system = max(0, int(total * self.system_share) - system_tokens)
+        unused_turn = max(0, int(total * self.turn_share) - turn_tokens)
+        budget = int(total * self.history_share) + unused_system + unused_turn
+        # Oversized system prompts or turns still leave the total intact
+        return max(0, min(budget, total - system_tokens - turn_tokens))
+
+
+def fit_history(history: list[dict[str, Any]], budget_tokens: int) -> list[dict[str, Any]]:
+    """
+    Keep the newest messages that fit in budget_tokens.
+
+    Args:
+        history: Messages, oldest first.
+        budget_tokens: Token budget for the kept messages.
+
+    Returns:
+        The longest suffix of history within the budget.
+    """
+    used = 0
+    start = len(history)
+    for i in range(len(history) - 1, -1, -1):
+        used += estimate_message_tokens(history[i])
+        if used > budget_tokens:
+            break
+        start = i
+    # Start on a user turn; some providers reject a leading assistant message
+    while start < len(history) and history[start].get("role") != "user":
+        start += 1
+    return history[start:]
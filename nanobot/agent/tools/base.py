@@ -21,6 +21,15 @@ class Tool(ABC):
         "object": dict,
     }
     
+    # Read-only, side-effect-free tools may run concurrently with each other
+    # when the model issues several calls in one response.
+    concurrency_safe: bool = False
+    
+    # Results depend only on the arguments and on state that other tool
+    # calls change, so an identical call later in the same turn is answered
+    # from memory (see memo_resource for invalidation).
+    pure: bool = False
+    
     @property
     @abstractmethod
     def name(self) -> str:
@@ -90,6 +99,21 @@ class Tool(ABC):
                 errors.extend(self._validate(item, schema["items"], f"{path}[{i}]" if path else f"[{i}]"))
         return errors
     
+    def is_pure_call(self, params: dict[str, Any]) -> bool:
+        """Whether this particular call is pure (tools with read and write actions override)."""
+        return self.pure
+    
+    def memo_resource(self, params: dict[str, Any]) -> str | None:
+        """
+        What a call reads or changes, e.g. a resolved file path.
+        
+        A non-pure call invalidates memoized calls on the same resource (or,
+        for paths, on a parent directory). None means unknown: memoized pure
+        calls with no resource are kept, and a non-pure call with no
+        resource invalidates everything.
+        """
+        return None
+    
     def to_schema(self) -> dict[str, Any]:
         """Convert tool to OpenAI function schema format."""
         return {
@@ -13,6 +13,7 @@ from pathlib import Path
 
 from loguru import logger
 from nanobot.agent.tools.base import Tool
+from nanobot.utils.deadline import deadline_expired
 
 
 # ---------------------------------------------------------------------------
@@ -351,6 +352,8 @@ class CaptchaSolver:
                 
                 # Poll for result (max 120s)
                 for _ in range(60):
+                    if deadline_expired():
+                        break
                     await asyncio.sleep(2)
                     resp = await client.post(
                         "https://api.capsolver.com/getTaskResult",
@@ -417,6 +420,8 @@ class CaptchaSolver:
                 
                 # Poll for result (max 120s)
                 for _ in range(40):
+                    if deadline_expired():
+                        break
                     await asyncio.sleep(3)
                     resp = await client.get(
                         "https://2captcha.com/res.php",
@@ -479,6 +484,8 @@ class CaptchaSolver:
                 task_id = data.get("taskId")
                 
                 for _ in range(40):
+                    if deadline_expired():
+                        break
                     await asyncio.sleep(3)
                     resp = await client.post(
                         "https://api.anti-captcha.com/getTaskResult",
@@ -665,6 +672,9 @@ class BrowserTool(Tool):
         "required": ["action"]
     }
     
+    # Actions that only read the current page
+    READ_ACTIONS = frozenset({"content", "extract", "url"})
+    
     def __init__(self, workspace: Path | str, captcha_provider: str = "", captcha_api_key: str = "", proxy_url: str = ""):
         self.workspace = Path(workspace)
         self.browser = None
@@ -679,6 +689,15 @@ class BrowserTool(Tool):
         self._last_used: float = 0
         self._idle_timeout: float = 120  # seconds (2 minutes)
         self._idle_check_task: asyncio.Task | None = None
+        # Single shared page: concurrent turns must not interleave actions
+        self._action_lock = asyncio.Lock()
+
+    def is_pure_call(self, params: dict[str, Any]) -> bool:
+        return params.get("action") in self.READ_ACTIONS
+    
+    def memo_resource(self, params: dict[str, Any]) -> str | None:
+        # Any other action may change the page
+        return "browser"
 
     # ------------------------------------------------------------------
     # Browser lifecycle
@@ -905,6 +924,10 @@ class BrowserTool(Tool):
     # ------------------------------------------------------------------
 
     async def execute(self, action: str, **kwargs: Any) -> str:
+        async with self._action_lock:
+            return await self._execute_action(action, **kwargs)
+
+    async def _execute_action(self, action: str, **kwargs: Any) -> str:
         try:
             await self._ensure_browser()
             self._last_used = time.time()
@@ -1,6 +1,7 @@
 """Cron tool for scheduling reminders and tasks."""
 
 import time
+from contextvars import ContextVar
 from datetime import datetime
 from typing import Any
 from zoneinfo import ZoneInfo
@@ -16,13 +17,13 @@ class CronTool(Tool):
     def __init__(self, cron_service: CronService, timezone: str = "UTC"):
         self._cron = cron_service
         self._timezone = timezone
-        self._channel = ""
-        self._chat_id = ""
+        self._context: ContextVar[tuple[str, str]] = ContextVar(
+            "cron_tool_context", default=("", "")
+        )
     
     def set_context(self, channel: str, chat_id: str) -> None:
-        """Set the current session context for delivery."""
-        self._channel = channel
-        self._chat_id = chat_id
+        """Set the session context for delivery (current turn only)."""
+        self._context.set((channel, chat_id))
     
     @property
     def name(self) -> str:
@@ -107,7 +108,8 @@ class CronTool(Tool):
     ) -> str:
         if not message:
             return "Error: message is required for add"
-        if not self._channel or not self._chat_id:
+        channel, chat_id = self._context.get()
+        if not channel or not chat_id:
             return "Error: no session context (channel/chat_id)"
         
         # Enforce max job limit per bot
@@ -135,8 +137,8 @@ class CronTool(Tool):
             schedule=schedule,
             message=message,
             deliver=True,
-            channel=self._channel,
-            to=self._chat_id,
+            channel=channel,
+            to=chat_id,
             delete_after_run=delete_after,
         )
         
@@ -19,12 +19,25 @@ def _resolve_path(path: str, allowed_dir: Path | None = None) -> Path:
     return resolved
 
 
-class ReadFileTool(Tool):
-    """Tool to read file contents."""
+class _FileTool(Tool):
+    """Base of tools working on one path, memoized per resolved path."""
     
     def __init__(self, allowed_dir: Path | None = None):
         self._allowed_dir = allowed_dir
+    
+    def memo_resource(self, params: dict[str, Any]) -> str | None:
+        try:
+            return str(_resolve_path(params.get("path", ""), self._allowed_dir))
+        except Exception:
+            return None
 
+
+class ReadFileTool(_FileTool):
+    """Tool to read file contents."""
+    
+    concurrency_safe = True
+    pure = True
+    
     @property
     def name(self) -> str:
         return "read_file"
@@ -62,12 +75,9 @@ class ReadFileTool(Tool):
             return f"Error reading file: {str(e)}"
 
 
-class WriteFileTool(Tool):
+class WriteFileTool(_FileTool):
     """Tool to write content to a file."""
     
-    def __init__(self, allowed_dir: Path | None = None):
-        self._allowed_dir = allowed_dir
-
     @property
     def name(self) -> str:
         return "write_file"
@@ -105,12 +115,9 @@ class WriteFileTool(Tool):
             return f"Error writing file: {str(e)}"
 
 
-class EditFileTool(Tool):
+class EditFileTool(_FileTool):
     """Tool to edit a file by replacing text."""
     
-    def __init__(self, allowed_dir: Path | None = None):
-        self._allowed_dir = allowed_dir
-
     @property
     def name(self) -> str:
         return "edit_file"
@@ -166,12 +173,12 @@ class EditFileTool(Tool):
             return f"Error editing file: {str(e)}"
 
 
-class ListDirTool(Tool):
+class ListDirTool(_FileTool):
     """Tool to list directory contents."""
     
-    def __init__(self, allowed_dir: Path | None = None):
-        self._allowed_dir = allowed_dir
-
+    concurrency_safe = True
+    pure = True
+    
     @property
     def name(self) -> str:
         return "list_dir"
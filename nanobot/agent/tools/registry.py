@@ -1,19 +1,78 @@
 """Tool registry for dynamic tool management."""
 
+import asyncio
+import json
+import os
+from contextvars import ContextVar
+from dataclasses import dataclass, field
 from typing import Any
 
 from nanobot.agent.tools.base import Tool
+from nanobot.providers.base import ToolCallRequest
+from nanobot.utils.deadline import Deadline, current_deadline
+
+# Time a tool gets past the turn deadline to stop on its own (tools cap
+# their own timeouts to the deadline) before it is cancelled
+DEADLINE_GRACE_S = 2.0
+
+
+def _is_failure(result: Any) -> bool:
+    """Whether a tool result reports an error ("Error: ..." or a JSON object with an "error" key)."""
+    if not isinstance(result, str):
+        return False
+    if result.startswith("Error"):
+        return True
+    if result.startswith("{") and '"error"' in result:
+        try:
+            data = json.loads(result)
+        except ValueError:
+            return False
+        return isinstance(data, dict) and "error" in data
+    return False
+
+
+@dataclass
+class _TurnMemo:
+    """Tool calls of one turn, by name plus canonical arguments."""
+    # Successful pure calls -> the resource they read
+    results: dict[str, str | None] = field(default_factory=dict)
+    # Failing calls -> (times failed with the same error, error, resource)
+    failures: dict[str, tuple[int, str, str | None]] = field(default_factory=dict)
+    
+    def invalidate(self, resource: str | None) -> None:
+        """Forget calls on a resource that was just changed (None: anything may have changed)."""
+        if resource is None:
+            self.results.clear()
+            self.failures.clear()
+            return
+        
+        def affected(r: str | None) -> bool:
+            return r is not None and (r == resource or resource.startswith(r.rstrip(os.sep) + os.sep))
+        
+        self.results = {k: r for k, r in self.results.items() if not affected(r)}
+        self.failures = {k: f for k, f in self.failures.items() if not affected(f[2])}
 
 
 class ToolRegistry:
     """
     Registry for agent tools.
     
-    Allows dynamic registration and execution of tools.
+    Allows dynamic registration and execution of tools. Within a turn
+    (see start_turn), an identical repeat of a pure call is answered with a
+    pointer to the earlier result, and a call that keeps failing the same
+    way is not run again.
     """
     
-    def __init__(self):
+    def __init__(self, max_repeat_failures: int = 2):
+        """
+        Args:
+            max_repeat_failures: Identical calls failing identically this
+                many times in a turn are not run again.
+        """
         self._tools: dict[str, Tool] = {}
+        self.max_repeat_failures = max_repeat_failures
+        self._memo: ContextVar[_TurnMemo | None] = ContextVar("tool_memo", default=None)
+        self.stats = {"memo_hits": 0, "repeats_blocked": 0}
     
     def register(self, tool: Tool) -> None:
         """Register a tool."""
@@ -31,17 +90,22 @@ class ToolRegistry:
         """Check if a tool is registered."""
         return name in self._tools
     
+    def start_turn(self) -> None:
+        """Start memoizing tool calls for the current turn (task context)."""
+        self._memo.set(_TurnMemo())
+    
     def get_definitions(self) -> list[dict[str, Any]]:
         """Get all tool definitions in OpenAI format."""
         return [tool.to_schema() for tool in self._tools.values()]
     
-    async def execute(self, name: str, params: dict[str, Any]) -> str:
+    async def execute(self, name: str, params: dict[str, Any], deadline: Deadline | None = None) -> str:
         """
         Execute a tool by name with given parameters.
         
         Args:
             name: Tool name.
             params: Tool parameters.
+            deadline: Turn deadline; the tool is stopped when it has passed.
         
         Returns:
             Tool execution result as string.
@@ -53,13 +117,116 @@ class ToolRegistry:
         if not tool:
             return f"Error: Tool '{name}' not found"
 
+        if deadline is not None and deadline.expired:
+            return f"Error: Tool '{name}' not run, the time for this turn is up"
+        
+        memo = self._memo.get()
+        if memo is None:
+            return await self._run(tool, name, params, deadline)
+        
+        key = f"{name}:{json.dumps(params, sort_keys=True, ensure_ascii=False)}"
+        failed = memo.failures.get(key)
+        if failed and failed[0] >= self.max_repeat_failures:
+            self.stats["repeats_blocked"] += 1
+            return (
+                f"Error: Already tried {name} with these exact arguments {failed[0]} times in this turn, "
+                f"failing the same way each time. Do not repeat it; try a different approach."
+            )
+        pure = tool.is_pure_call(params)
+        if pure and key in memo.results:
+            self.stats["memo_hits"] += 1
+            return f"[Same result as the identical {name} call earlier in this turn; nothing it depends on has changed since.]"
+        
+        result = await self._run(tool, name, params, deadline)
+        
+        resource = tool.memo_resource(params)
+        if not pure:
+            memo.invalidate(resource)
+        if _is_failure(result):
+            count = failed[0] + 1 if failed and failed[1] == result else 1
+            memo.failures[key] = (count, result, resource)
+        else:
+            memo.failures.pop(key, None)
+            if pure:
+                memo.results[key] = resource
+        return result
+    
+    async def _run(self, tool: Tool, name: str, params: dict[str, Any], deadline: Deadline | None) -> str:
+        """Validate and run one tool call within the deadline."""
+        token = current_deadline.set(deadline)
         try:
             errors = tool.validate_params(params)
             if errors:
                 return f"Error: Invalid parameters for tool '{name}': " + "; ".join(errors)
-            return await tool.execute(**params)
+            remaining = deadline.remaining() if deadline else None
+            if remaining is None:
+                return await tool.execute(**params)
+            return await asyncio.wait_for(tool.execute(**params), timeout=remaining + DEADLINE_GRACE_S)
+        except asyncio.TimeoutError:
+            return f"Error: Tool '{name}' stopped, the time for this turn is up"
         except Exception as e:
             return f"Error executing {name}: {str(e)}"
+        finally:
+            current_deadline.reset(token)
+    
+    def is_concurrency_safe(self, name: str) -> bool:
+        """Check if a tool may run concurrently with other safe tools."""
+        tool = self._tools.get(name)
+        return bool(tool and tool.concurrency_safe)
+    
+    def is_pure(self, name: str) -> bool:
+        """Check if a tool is free of side effects (its results may be reused)."""
+        tool = self._tools.get(name)
+        return bool(tool and tool.pure)
+    
+    def plan_batches(self, calls: list[ToolCallRequest]) -> list[list[ToolCallRequest]]:
+        """
+        Group the tool calls of one LLM response into execution batches.
+        
+        Consecutive concurrency-safe calls share a batch; any other call gets
+        a batch of its own, so side effects happen in the order the model
+        asked for them.
+        
+        Args:
+            calls: Tool calls in the order the model issued them.
+        
+        Returns:
+            Batches in execution order.
+        """
+        batches: list[list[ToolCallRequest]] = []
+        for call in calls:
+            if (
+                batches
+                and self.is_concurrency_safe(call.name)
+                and all(self.is_concurrency_safe(c.name) for c in batches[-1])
+            ):
+                batches[-1].append(call)
+            else:
+                batches.append([call])
+        return batches
+    
+    async def execute_batch(self, calls: list[ToolCallRequest], deadline: Deadline | None = None) -> list[str]:
+        """
+        Execute a batch from plan_batches() concurrently.
+        
+        Args:
+            calls: Tool calls to run together.
+            deadline: Turn deadline passed to each execute().
+        
+        Returns:
+            Results in the same order as calls.
+        """
+        if len(calls) == 1:
+            return [await self.execute(calls[0].name, calls[0].arguments, deadline)]
+        
+        results = await asyncio.gather(
+            *(self.execute(call.name, call.arguments, deadline) for call in calls),
+            return_exceptions=True,
+        )
+        return [
+            f"Error: Tool execution crashed: {r}" if isinstance(r, BaseException) else r
+            for r in results
+        ]
     
     @property
     def tool_names(self) -> list[str]:
@@ -0,0 +1,207 @@
+"""Offload store for oversized tool results, and a tool to read them back."""
+
+import re
+import uuid
+from collections import OrderedDict
+from contextvars import ContextVar
+from typing import Any
+
+from nanobot.agent.tools.base import Tool
+
+
+class ResultStore:
+    """
+    Keeps oversized tool results out of the prompt.
+
+    Results longer than threshold_chars are stored under a handle and replaced
+    in the conversation by a head/tail preview. Entries belong to a scope
+    (the session key); a handle is only readable from its own scope. The
+    store is bounded by max_total_chars, evicting least recently used
+    entries first.
+    """
+
+    # Results of these tools are already bounded slices of stored results
+    EXEMPT_TOOLS = frozenset({"tool_result"})
+
+    def __init__(
+        self,
+        threshold_chars: int = 8000,
+        head_chars: int = 1500,
+        tail_chars: int = 500,
+        max_total_chars: int = 20_000_000,
+    ):
+        """
+        Args:
+            threshold_chars: Results longer than this are offloaded (0 disables).
+            head_chars: Characters of the start kept in the preview.
+            tail_chars: Characters of the end kept in the preview.
+            max_total_chars: Size limit of the whole store.
+        """
+        self.threshold_chars = threshold_chars
+        self.head_chars = head_chars
+        self.tail_chars = tail_chars
+        self.max_total_chars = max_total_chars
+        self._entries: OrderedDict[str, tuple[str, str]] = OrderedDict()  # handle -> (scope, text)
+        self._total_chars = 0
+        self._scope: ContextVar[str] = ContextVar("result_store_scope", default="")
+
+    def set_scope(self, scope: str) -> None:
+        """Set the scope (session key) of the current turn."""
+        self._scope.set(scope)
+
+    def offload(self, tool_name: str, result: str) -> str:
+        """
+        Store result if it is oversized.
+
+        Args:
+            tool_name: Tool that produced the result.
+            result: The full result.
+
+        Returns:
+            The result itself, or a preview with the handle to read it back.
+        """
+        if (
+            not self.threshold_chars
+            or len(result) <= self.threshold_chars
+            or tool_name in self.EXEMPT_TOOLS
+        ):
+            return result
+
+        handle = f"res_{uuid.uuid4().hex[:8]}"
+        self._entries[handle] = (self._scope.get(), result)
+        self._total_chars += len(result)
+        self._evict()
+
+        lines = result.count("\n") + 1
+        omitted = len(result) - self.head_chars - self.tail_chars
+        return (
+            f"{result[:self.head_chars]}\n\n"
+            f"[... {omitted:,} characters omitted. The full {tool_name} result "
+            f"({len(result):,} characters, {lines:,} lines) is stored as handle "
+            f"\"{handle}\". Use the tool_result tool with this handle to read more "
+            f"(offset/length) or search it (pattern). ...]\n\n"
+            f"{result[-self.tail_chars:]}"
+        )
+
+    def get(self, handle: str) -> str | None:
+        """Get a stored result of the current scope."""
+        entry = self._entries.get(handle)
+        if entry is None or entry[0] != self._scope.get():
+            return None
+        self._entries.move_to_end(handle)
+        return entry[1]
+
+    def drop_scope(self, scope: str) -> None:
+        """Forget all results of a scope."""
+        for handle in [h for h, (s, _) in self._entries.items() if s == scope]:
+            self._total_chars -= len(self._entries.pop(handle)[1])
+
+    def _evict(self) -> None:
+        """Drop least recently used entries until the store fits its limit."""
+        while self._total_chars > self.max_total_chars and len(self._entries) > 1:
+            _, (_, text) = self._entries.popitem(last=False)
+            self._total_chars -= len(text)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class ToolResultTool(Tool):
+    """Tool to page through or search an offloaded tool result."""
+
+    concurrency_safe = True
+    pure = True
+
+    MAX_MATCHES = 50
+    MAX_LINE_CHARS = 300
+
+    def __init__(self, store: ResultStore):
+        self._store = store
+
+    @property
+    def name(self) -> str:
+        return "tool_result"
+
+    @property
+    def description(self) -> str:
+        return (
+            "Read a large tool result that was shortened in the conversation. "
+            "Give its handle plus either offset/length to read a slice, or pattern "
+            "to list matching lines."
+        )
+
+    @property
+    def parameters(self) -> dict[str, Any]:
+        return {
+            "type": "object",
+            "properties": {
+                "handle": {
+                    "type": "string",
+                    "description": "Handle of the stored result (e.g. res_1a2b3c4d)"
+                },
+                "offset": {
+                    "type": "integer",
+                    "description": "Character offset to start reading at (default 0)",
+                    "minimum": 0
+                },
+                "length": {
+                    "type": "integer",
+                    "description": "Number of characters to read (default 4000)",
+                    "minimum": 1,
+                    "maximum": 8000
+                },
+                "pattern": {
+                    "type": "string",
+                    "description": "Case-insensitive regex; returns matching lines with line numbers"
+                }
+            },
+            "required": ["handle"]
+        }
+
+    async def execute(
+        self,
+        handle: str,
+        offset: int = 0,
+        length: int = 4000,
+        pattern: str | None = None,
+        **kwargs: Any,
+    ) -> str:
+        text = self._store.get(handle)
+        if text is None:
+            return f"Error: Unknown or expired result handle: {handle}"
+
+        if pattern:
+            return self._grep(text, pattern)
+
+        chunk = text[offset:offset + length]
+        end = offset + len(chunk)
+        header = f"[{handle}: characters {offset:,}-{end:,} of {len(text):,}"
+        if end < len(text):
+            header += f"; continue with offset={end}"
+        return f"{header}]\n{chunk}"
+
+    def _grep(self, text: str, pattern: str) -> str:
+        """List lines matching pattern, trimmed around the match."""
+        try:
+            regex = re.compile(pattern, re.IGNORECASE)
+        except re.error as e:
+            return f"Error: Invalid pattern: {e}"
+
+        out: list[str] = []
+        total = 0
+        for number, line in enumerate(text.split("\n"), 1):
+            m = regex.search(line)
+            if not m:
+                continue
+            total += 1
+            if len(out) < self.MAX_MATCHES:
+                if len(line) > self.MAX_LINE_CHARS:
+                    start = max(0, m.start() - self.MAX_LINE_CHARS // 2)
+                    line = "…" + line[start:start + self.MAX_LINE_CHARS] + "…"
+                out.append(f"{number}: {line}")
+
+        if not out:
+            return f"No lines match {pattern!r}"
+        if total > len(out):
+            out.append(f"[{total - len(out)} more matching lines not shown]")
+        return "\n".join(out)
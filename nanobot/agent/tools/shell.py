@@ -7,6 +7,7 @@ from pathlib import Path
 from typing import Any
 
 from nanobot.agent.tools.base import Tool
+from nanobot.utils.deadline import cap_timeout
 
 
 class ExecTool(Tool):
@@ -74,14 +75,22 @@ class ExecTool(Tool):
                 cwd=cwd,
             )
             
+            timeout = cap_timeout(self.timeout)
             try:
                 stdout, stderr = await asyncio.wait_for(
                     process.communicate(),
-                    timeout=self.timeout
+                    timeout=timeout
                 )
             except asyncio.TimeoutError:
                 process.kill()
-                return f"Error: Command timed out after {self.timeout} seconds"
+                await process.wait()
+                return f"Error: Command timed out after {timeout:.0f} seconds"
+            except BaseException:
+                # Turn cancelled (superseded or out of time): don't leave it running
+                if process.returncode is None:
+                    process.kill()
+                await process.wait()
+                raise
             
             output_parts = []
             
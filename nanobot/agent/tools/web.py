@@ -1,20 +1,26 @@
 """Web tools: web_search and web_fetch."""
 
+import asyncio
 import html
+import ipaddress
 import json
 import os
 import re
+from contextvars import ContextVar
 from typing import Any
 from urllib.parse import urlparse
 
 import httpx
 
 from nanobot.agent.tools.base import Tool
+from nanobot.utils.deadline import Deadline, cap_timeout, current_deadline
 
 # Shared constants
 USER_AGENT = "Mozilla/5.0 (Macintosh; Intel Mac OS X 14_7_2) AppleWebKit/537.36"
 MAX_REDIRECTS = 5  # Limit redirects to prevent DoS attacks
 
+_URL_RE = re.compile(r'https?://[^\s<>"\'`]+')
+
 
 def _strip_tags(text: str) -> str:
     """Remove HTML tags and decode entities."""
@@ -43,11 +49,70 @@ def _validate_url(url: str) -> tuple[bool, str]:
         return False, str(e)
 
 
+def extract_urls(text: str, limit: int = 5) -> list[str]:
+    """
+    Find http(s) URLs in message text.
+    
+    Trailing punctuation of the surrounding sentence is stripped and
+    duplicates are dropped.
+    
+    Args:
+        text: Message text.
+        limit: Maximum number of URLs to return.
+    
+    Returns:
+        Valid URLs in order of appearance.
+    """
+    urls: list[str] = []
+    for match in _URL_RE.finditer(text or ""):
+        url = match.group(0).rstrip(".,;:!?'\"")
+        # Keep a closing paren only if the URL opened one (wiki links)
+        while url.endswith((")", "]", "}")) and url.count(url[-1]) > url.count({")": "(", "]": "[", "}": "{"}[url[-1]]):
+            url = url[:-1]
+        if url not in urls and _validate_url(url)[0]:
+            urls.append(url)
+            if len(urls) >= limit:
+                break
+    return urls
+
+
+class _ResponseTooLargeError(Exception):
+    """A response exceeded the byte cap of a fetch."""
+
+
+class _BlockedHostError(Exception):
+    """A fetch limited to public hosts reached a private or local address."""
+
+
+async def _check_public_host(request: httpx.Request) -> None:
+    """
+    httpx request hook: refuse hosts that resolve to a non-public address.
+
+    Runs for every request of a fetch, redirects included.
+
+    Raises:
+        _BlockedHostError: The host is loopback, private, link-local, etc.
+    """
+    host = request.url.host
+    try:
+        infos = await asyncio.get_running_loop().getaddrinfo(host, None)
+    except OSError as e:
+        raise _BlockedHostError(f"{host}: {e}") from e
+    for info in infos:
+        addr = ipaddress.ip_address(info[4][0].split("%")[0])
+        if isinstance(addr, ipaddress.IPv6Address) and addr.ipv4_mapped:
+            addr = addr.ipv4_mapped
+        if not addr.is_global or addr.is_multicast:
+            raise _BlockedHostError(f"{host} resolves to {addr}")
+
+
 class WebSearchTool(Tool):
     """Search the web using Brave Search API."""
     
     name = "web_search"
     description = "Search the web. Returns titles, URLs, and snippets."
+    concurrency_safe = True
+    pure = True
     parameters = {
         "type": "object",
         "properties": {
@@ -72,7 +137,7 @@ class WebSearchTool(Tool):
                     "https://api.search.brave.com/res/v1/web/search",
                     params={"q": query, "count": n},
                     headers={"Accept": "application/json", "X-Subscription-Token": self.api_key},
-                    timeout=10.0
+                    timeout=cap_timeout(10.0)
                 )
                 r.raise_for_status()
             
@@ -90,11 +155,29 @@ class WebSearchTool(Tool):
             return f"Error: {e}"
 
 
+async def _read_body(r: httpx.Response, max_bytes: int | None) -> bytes:
+    """Read a streamed response body, giving up once it exceeds max_bytes."""
+    if not max_bytes:
+        return await r.aread()
+    if int(r.headers.get("content-length") or 0) > max_bytes:
+        raise _ResponseTooLargeError(str(r.url))
+    chunks: list[bytes] = []
+    size = 0
+    async for chunk in r.aiter_bytes():
+        size += len(chunk)
+        if size > max_bytes:
+            raise _ResponseTooLargeError(str(r.url))
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+
 class WebFetchTool(Tool):
     """Fetch and extract content from a URL using Readability."""
     
     name = "web_fetch"
     description = "Fetch URL and extract readable content (HTML → markdown/text)."
+    concurrency_safe = True
+    pure = True
     parameters = {
         "type": "object",
         "properties": {
@@ -107,11 +190,95 @@ class WebFetchTool(Tool):
     
     def __init__(self, max_chars: int = 50000):
         self.max_chars = max_chars
+        # Speculative fetches of the current turn, by URL
+        self._prefetched: ContextVar[dict[str, asyncio.Task[str | None]] | None] = ContextVar(
+            "web_fetch_prefetched", default=None
+        )
+        self.prefetch_stats = {"started": 0, "hits": 0, "wasted": 0, "oversized": 0, "blocked": 0}
     
     async def execute(self, url: str, extractMode: str = "markdown", maxChars: int | None = None, **kwargs: Any) -> str:
-        from readability import Document
-
         max_chars = maxChars or self.max_chars
+        if extractMode == "markdown" and max_chars == self.max_chars:
+            prefetched = await self._take_prefetched(url)
+            if prefetched is not None:
+                return prefetched
+        return await self._fetch(url, extractMode, max_chars)
+    
+    def start_prefetch(self, urls: list[str], max_bytes: int, deadline: Deadline | None = None) -> None:
+        """
+        Start fetching URLs in the background for the current turn.
+        
+        A later web_fetch of the same URL with default options is served
+        from the prefetch. Call end_prefetch() when the turn ends. Nobody
+        asked for these fetches yet, so only public hosts are fetched;
+        links to local or private addresses wait for an explicit web_fetch.
+        
+        Args:
+            urls: URLs to fetch.
+            max_bytes: Responses larger than this are abandoned.
+            deadline: Time budget of the turn; prefetches are abandoned when it runs out.
+        """
+        if not urls:
+            return
+        self._prefetched.set({
+            url: asyncio.create_task(self._prefetch(url, max_bytes, deadline)) for url in urls
+        })
+        self.prefetch_stats["started"] += len(urls)
+    
+    def end_prefetch(self) -> None:
+        """Drop the current turn's unused prefetches."""
+        tasks = self._prefetched.get()
+        if not tasks:
+            return
+        for task in tasks.values():
+            task.cancel()
+        self.prefetch_stats["wasted"] += len(tasks)
+        self._prefetched.set(None)
+    
+    async def _prefetch(self, url: str, max_bytes: int, deadline: Deadline | None) -> str | None:
+        current_deadline.set(deadline)  # This task's own context
+        try:
+            return await asyncio.wait_for(
+                self._fetch(url, "markdown", self.max_chars, max_bytes=max_bytes, public_only=True),
+                deadline.cap(None) if deadline else None,
+            )
+        except _ResponseTooLargeError:
+            self.prefetch_stats["oversized"] += 1
+            return None
+        except _BlockedHostError:
+            self.prefetch_stats["blocked"] += 1
+            return None
+        except asyncio.TimeoutError:
+            return None
+    
+    async def _take_prefetched(self, url: str) -> str | None:
+        """Result of a prefetch of url, if there is a usable one."""
+        tasks = self._prefetched.get()
+        task = tasks.pop(url, None) if tasks else None
+        if task is None:
+            return None
+        result = await task
+        if result is not None:
+            self.prefetch_stats["hits"] += 1
+        return result
+    
+    async def _fetch(
+        self,
+        url: str,
+        extract_mode: str,
+        max_chars: int,
+        max_bytes: int | None = None,
+        public_only: bool = False,
+    ) -> str:
+        """
+        Fetch a URL and extract its content.
+        
+        Raises:
+            _ResponseTooLargeError: If max_bytes is set and the body is larger.
+            _BlockedHostError: If public_only is set and a request goes to a
+                non-public address.
+        """
+        from readability import Document
 
         # Validate URL before fetching
         is_valid, error_msg = _validate_url(url)
@@ -122,24 +289,27 @@ class WebFetchTool(Tool):
             async with httpx.AsyncClient(
                 follow_redirects=True,
                 max_redirects=MAX_REDIRECTS,
-                timeout=30.0
+                timeout=cap_timeout(30.0),
+                event_hooks={"request": [_check_public_host]} if public_only else None,
             ) as client:
-                r = await client.get(url, headers={"User-Agent": USER_AGENT})
-                r.raise_for_status()
+                async with client.stream("GET", url, headers={"User-Agent": USER_AGENT}) as r:
+                    r.raise_for_status()
+                    body = await _read_body(r, max_bytes)
             
             ctype = r.headers.get("content-type", "")
+            page = body.decode(r.encoding or "utf-8", errors="replace")
             
             # JSON
             if "application/json" in ctype:
-                text, extractor = json.dumps(r.json(), indent=2), "json"
+                text, extractor = json.dumps(json.loads(page), indent=2), "json"
             # HTML
-            elif "text/html" in ctype or r.text[:256].lower().startswith(("<!doctype", "<html")):
-                doc = Document(r.text)
-                content = self._to_markdown(doc.summary()) if extractMode == "markdown" else _strip_tags(doc.summary())
+            elif "text/html" in ctype or page[:256].lower().startswith(("<!doctype", "<html")):
+                doc = Document(page)
+                content = self._to_markdown(doc.summary()) if extract_mode == "markdown" else _strip_tags(doc.summary())
                 text = f"# {doc.title()}\n\n{content}" if doc.title() else content
                 extractor = "readability"
             else:
-                text, extractor = r.text, "raw"
+                text, extractor = page, "raw"
             
             truncated = len(text) > max_chars
             if truncated:
@@ -147,6 +317,8 @@ class WebFetchTool(Tool):
             
             return json.dumps({"url": url, "finalUrl": str(r.url), "status": r.status_code,
                               "extractor": extractor, "truncated": truncated, "length": len(text), "text": text})
+        except (_ResponseTooLargeError, _BlockedHostError):
+            raise
         except Exception as e:
             return json.dumps({"error": str(e), "url": url})
     
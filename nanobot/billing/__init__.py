@@ -0,0 +1,6 @@
+"""Platform billing: credit checks and usage reporting."""
+
+from nanobot.billing.credits import CreditGuard, CreditStatus
+from nanobot.billing.usage import UsageReporter
+
+__all__ = ["CreditGuard", "CreditStatus", "UsageReporter"]
@@ -0,0 +1,162 @@
+"""Platform credit checks with caching and request de-duplication."""
+
+import asyncio
+import os
+import time
+from dataclasses import dataclass
+from typing import Any
+
+import httpx
+from loguru import logger
+
+
+@dataclass
+class CreditStatus:
+    """Result of a credit check."""
+    ok: bool
+    balance: float | None = None
+    reason: str | None = None
+    checked_at: float = 0.0  # time.monotonic() of the check
+    error: str | None = None  # Set when the platform could not be reached
+
+
+class CreditGuard:
+    """
+    Async credit pre-check against the hosting platform.
+
+    Results of GET {platform_url}/api/internal/credit-check/{user_id} are
+    cached for a short TTL, so a busy chat does not pay a round-trip per
+    message. Concurrent checks share one in-flight request. When the platform
+    cannot be reached, a recent known result is reused; otherwise fail_open
+    decides whether messages are let through.
+
+    The platform (or anything else that learns about a balance change) can
+    push updates with update() or drop the cache with invalidate().
+    """
+
+    def __init__(
+        self,
+        platform_url: str,
+        user_id: str,
+        ttl_s: float = 30.0,
+        blocked_ttl_s: float = 5.0,
+        max_stale_s: float = 120.0,
+        timeout_s: float = 3.0,
+        fail_open: bool = False,
+    ):
+        """
+        Args:
+            platform_url: Base URL of the platform API.
+            user_id: Platform user whose credits are checked.
+            ttl_s: How long an "ok" result is reused.
+            blocked_ttl_s: How long an "exhausted" result is reused; kept
+                short so top-ups are noticed quickly.
+            max_stale_s: How old a cached result may be to stand in for a
+                failed check.
+            timeout_s: HTTP timeout of a single check.
+            fail_open: Let messages through when no result is available.
+        """
+        self.platform_url = platform_url.rstrip("/")
+        self.user_id = user_id
+        self.ttl_s = ttl_s
+        self.blocked_ttl_s = blocked_ttl_s
+        self.max_stale_s = max_stale_s
+        self.timeout_s = timeout_s
+        self.fail_open = fail_open
+        self._client: httpx.AsyncClient | None = None
+        self._status: CreditStatus | None = None
+        self._inflight: asyncio.Task[CreditStatus] | None = None
+        self.stats = {"checks": 0, "cache_hits": 0, "shared": 0, "errors": 0}
+
+    @classmethod
+    def from_env(cls, **kwargs: Any) -> "CreditGuard | None":
+        """Create a guard from PLATFORM_URL / CREDIT_USER_ID, or None if unset."""
+        platform_url = os.environ.get("PLATFORM_URL")
+        user_id = os.environ.get("CREDIT_USER_ID")
+        if not platform_url or not user_id:
+            return None
+        return cls(platform_url, user_id, **kwargs)
+
+    @property
+    def status(self) -> CreditStatus | None:
+        """The last known credit status."""
+        return self._status
+
+    async def check(self) -> CreditStatus:
+        """
+        Get the current credit status, from cache when fresh.
+
+        Returns:
+            The status. If the platform is unreachable and no recent result
+            exists, ok follows the fail-open policy and error is set.
+        """
+        status = self._status
+        if status is not None:
+            ttl = self.ttl_s if status.ok else self.blocked_ttl_s
+            if time.monotonic() - status.checked_at < ttl:
+                self.stats["cache_hits"] += 1
+                return status
+
+        if self._inflight is None:
+            self._inflight = asyncio.create_task(self._refresh())
+        else:
+            self.stats["shared"] += 1
+        # Shield: a cancelled caller must not cancel the check others wait on
+        return await asyncio.shield(self._inflight)
+
+    async def _refresh(self) -> CreditStatus:
+        """Fetch the status from the platform and cache it."""
+        self.stats["checks"] += 1
+        try:
+            data = await self._fetch()
+            status = CreditStatus(
+                ok=bool(data.get("ok", True)),
+                balance=data.get("balance"),
+                reason=data.get("reason"),
+                checked_at=time.monotonic(),
+            )
+            self._status = status
+            return status
+        except Exception as e:
+            self.stats["errors"] += 1
+            last = self._status
+            if last is not None and time.monotonic() - last.checked_at < self.max_stale_s:
+                logger.warning(f"Credit check failed, using last known status: {e}")
+                return last
+            logger.warning(f"Credit check failed ({'allowing' if self.fail_open else 'blocking'} message): {e}")
+            return CreditStatus(ok=self.fail_open, checked_at=time.monotonic(), error=str(e))
+        finally:
+            self._inflight = None
+
+    async def _fetch(self) -> dict[str, Any]:
+        """GET the credit-check endpoint."""
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout_s,
+                limits=httpx.Limits(max_connections=4, max_keepalive_connections=2),
+                headers={"Accept": "application/json"},
+            )
+        resp = await self._client.get(f"{self.platform_url}/api/internal/credit-check/{self.user_id}")
+        resp.raise_for_status()
+        return resp.json()
+
+    def update(self, ok: bool, balance: float | None = None, reason: str | None = None) -> None:
+        """
+        Record a balance change pushed by the platform.
+
+        Args:
+            ok: Whether the user may keep chatting.
+            balance: The new balance, if known.
+            reason: Why the user is blocked, if not ok.
+        """
+        self._status = CreditStatus(ok=ok, balance=balance, reason=reason, checked_at=time.monotonic())
+
+    def invalidate(self) -> None:
+        """Forget the cached status so the next check asks the platform."""
+        self._status = None
+
+    async def close(self) -> None:
+        """Close the HTTP client."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
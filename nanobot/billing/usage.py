@@ -0,0 +1,243 @@
+"""Batched token usage reporting for platform credit accounting."""
+
+import asyncio
+import json
+import os
+import sys
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any
+
+import httpx
+from loguru import logger
+
+
+class UsageTransport(ABC):
+    """Delivers a batch of usage records to the platform."""
+
+    @abstractmethod
+    async def send(self, records: list[dict[str, Any]]) -> None:
+        """
+        Deliver records; raise on failure so they are kept for a retry.
+
+        Args:
+            records: Usage records with prompt_tokens, completion_tokens and model.
+        """
+        pass
+
+    async def close(self) -> None:
+        """Release transport resources."""
+        pass
+
+
+class StdoutUsageTransport(UsageTransport):
+    """
+    Writes "[USAGE] {json}" lines, the format the platform's bot executor parses.
+
+    A batch is collapsed to one line per model, so the line count no longer
+    grows with the number of LLM calls.
+    """
+
+    async def send(self, records: list[dict[str, Any]]) -> None:
+        totals: dict[str, dict[str, Any]] = {}
+        for r in records:
+            t = totals.setdefault(r["model"], {"prompt_tokens": 0, "completion_tokens": 0, "model": r["model"]})
+            t["prompt_tokens"] += r["prompt_tokens"]
+            t["completion_tokens"] += r["completion_tokens"]
+        text = "".join(f"[USAGE] {json.dumps(t)}\n" for t in totals.values())
+        # A slow reader on the pipe must not stall the event loop
+        await asyncio.to_thread(_write_stdout, text)
+
+
+def _write_stdout(text: str) -> None:
+    sys.stdout.write(text)
+    sys.stdout.flush()
+
+
+class HttpUsageTransport(UsageTransport):
+    """POSTs batches as JSON to {platform_url}/api/internal/usage/{user_id}."""
+
+    def __init__(self, platform_url: str, user_id: str, timeout_s: float = 10.0):
+        self.url = f"{platform_url.rstrip('/')}/api/internal/usage/{user_id}"
+        self._client = httpx.AsyncClient(timeout=timeout_s)
+
+    async def send(self, records: list[dict[str, Any]]) -> None:
+        resp = await self._client.post(self.url, json={"records": records})
+        resp.raise_for_status()
+
+    async def close(self) -> None:
+        await self._client.aclose()
+
+
+class UsageReporter:
+    """
+    Collects token usage of every LLM call and reports it in batches.
+
+    Records are buffered in memory and flushed every flush_interval_s or as
+    soon as batch_size records are pending. Batches that cannot be delivered
+    (and anything still pending at shutdown) go to a JSONL spool file, which
+    is re-sent on the next flush, so reports survive restarts.
+    """
+
+    def __init__(
+        self,
+        transport: UsageTransport,
+        spool_path: Path | None = None,
+        flush_interval_s: float = 5.0,
+        batch_size: int = 50,
+        max_spool_records: int = 10000,
+    ):
+        """
+        Args:
+            transport: Where batches are delivered.
+            spool_path: JSONL file holding undelivered records.
+            flush_interval_s: Maximum time a record waits before being sent.
+            batch_size: Pending record count that triggers an early flush.
+            max_spool_records: Oldest spooled records beyond this are dropped.
+        """
+        self.transport = transport
+        self.spool_path = spool_path
+        self.flush_interval_s = flush_interval_s
+        self.batch_size = max(1, batch_size)
+        self.max_spool_records = max_spool_records
+        self._pending: list[dict[str, Any]] = []
+        self._flush_lock = asyncio.Lock()
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task[None] | None = None
+        self.stats = {"recorded": 0, "sent": 0, "batches": 0, "spooled": 0, "errors": 0}
+
+    @classmethod
+    def from_env(cls, workspace: Path, transport: str = "stdout", **kwargs: Any) -> "UsageReporter":
+        """
+        Create a reporter for the platform configured in the environment.
+
+        Args:
+            workspace: Workspace directory; the spool lives in its .usage folder.
+            transport: "stdout" ([USAGE] lines) or "http" (POST to PLATFORM_URL,
+                needs CREDIT_USER_ID; falls back to stdout otherwise).
+        """
+        platform_url = os.environ.get("PLATFORM_URL")
+        user_id = os.environ.get("CREDIT_USER_ID")
+        if transport == "http" and platform_url and user_id:
+            sink: UsageTransport = HttpUsageTransport(platform_url, user_id)
+        else:
+            sink = StdoutUsageTransport()
+        return cls(sink, spool_path=workspace / ".usage" / "spool.jsonl", **kwargs)
+
+    def record(self, usage: dict[str, int] | None, model: str, source: str = "agent") -> None:
+        """
+        Queue the usage of one LLM call.
+
+        Args:
+            usage: Usage dict from LLMResponse (prompt_tokens, completion_tokens).
+            model: The model that was called.
+            source: What made the call (agent, system, subagent).
+        """
+        if not usage:
+            return
+        prompt = int(usage.get("prompt_tokens", 0) or 0)
+        completion = int(usage.get("completion_tokens", 0) or 0)
+        if prompt <= 0 and completion <= 0:
+            return
+        self._pending.append({
+            "prompt_tokens": prompt,
+            "completion_tokens": completion,
+            "cached_tokens": int(usage.get("cached_tokens", 0) or 0),
+            "model": model,
+            "source": source,
+            "ts": time.time(),
+        })
+        self.stats["recorded"] += 1
+        self._ensure_task()
+        if len(self._pending) >= self.batch_size:
+            self._wakeup.set()
+
+    def _ensure_task(self) -> None:
+        """Start the background flusher on first use."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self) -> None:
+        """Flush on the interval or when woken by a full batch."""
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval_s)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    async def flush(self) -> None:
+        """Send spooled and pending records now."""
+        async with self._flush_lock:
+            records = self._read_spool() + self._pending
+            self._pending = []
+            if not records:
+                return
+            try:
+                await self.transport.send(records)
+            except asyncio.CancelledError:
+                self._write_spool(records)
+                raise
+            except Exception as e:
+                self.stats["errors"] += 1
+                logger.warning(f"Usage report failed, spooling {len(records)} records: {e}")
+                self._write_spool(records)
+                return
+            self.stats["sent"] += len(records)
+            self.stats["batches"] += 1
+            self._clear_spool()
+
+    async def close(self) -> None:
+        """Stop the flusher and deliver (or spool) whatever is pending."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+        await self.transport.close()
+
+    def _read_spool(self) -> list[dict[str, Any]]:
+        """Load undelivered records from the spool file."""
+        if not self.spool_path or not self.spool_path.exists():
+            return []
+        records = []
+        try:
+            for line in self.spool_path.read_text(encoding="utf-8").splitlines():
+                if line.strip():
+                    try:
+                        records.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        continue  # Torn write from a crash
+        except OSError as e:
+            logger.warning(f"Failed to read usage spool: {e}")
+        return records
+
+    def _write_spool(self, records: list[dict[str, Any]]) -> None:
+        """Replace the spool contents with records."""
+        if not self.spool_path:
+            return
+        if len(records) > self.max_spool_records:
+            logger.warning(f"Usage spool full, dropping {len(records) - self.max_spool_records} oldest records")
+            records = records[-self.max_spool_records:]
+        try:
+            self.spool_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.spool_path.with_suffix(".tmp")
+            tmp.write_text("".join(json.dumps(r) + "\n" for r in records), encoding="utf-8")
+            tmp.replace(self.spool_path)
+            self.stats["spooled"] = len(records)
+        except OSError as e:
+            logger.error(f"Failed to write usage spool, {len(records)} records lost: {e}")
+
+    def _clear_spool(self) -> None:
+        """Remove the spool after its records were delivered."""
+        if self.spool_path and self.spool_path.exists():
+            try:
+                self.spool_path.unlink()
+            except OSError:
+                pass
+        self.stats["spooled"] = 0
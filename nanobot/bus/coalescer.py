@@ -0,0 +1,111 @@
+"""Debounced merging of rapid inbound messages into single turns."""
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Callable
+
+from nanobot.bus.events import InboundMessage
+
+
+@dataclass
+class _Pending:
+    """Messages held for one session."""
+    messages: list[InboundMessage] = field(default_factory=list)
+    first_at: float = 0.0
+    timer: asyncio.Task | None = None
+
+
+class InboundCoalescer:
+    """
+    Merges bursts of messages from one sender into one turn.
+
+    Messages are held per session key. The hold ends window_s after the last
+    message of a burst, but never later than max_wait_s after its first one.
+    A message from a different sender in the same chat ends the current
+    burst, so group chat attribution is kept.
+    """
+
+    def __init__(
+        self,
+        on_ready: Callable[[InboundMessage], None],
+        window_s: float = 1.0,
+        max_wait_s: float = 5.0,
+    ):
+        """
+        Args:
+            on_ready: Receives each (possibly merged) message when its hold ends.
+            window_s: Quiet time that ends a burst.
+            max_wait_s: Longest a message is held.
+        """
+        self.on_ready = on_ready
+        self.window_s = window_s
+        self.max_wait_s = max(max_wait_s, window_s)
+        self._pending: dict[str, _Pending] = {}
+        self.stats = {"received": 0, "released": 0}
+
+    def add(self, msg: InboundMessage) -> None:
+        """Hold a message, extending its session's window."""
+        self.stats["received"] += 1
+        key = msg.session_key
+        pending = self._pending.get(key)
+        if pending and pending.messages[-1].sender_id != msg.sender_id:
+            self._release(key)
+            pending = None
+        if pending is None:
+            pending = self._pending[key] = _Pending(first_at=time.monotonic())
+        pending.messages.append(msg)
+
+        if pending.timer:
+            pending.timer.cancel()
+        remaining = pending.first_at + self.max_wait_s - time.monotonic()
+        pending.timer = asyncio.create_task(self._release_later(key, min(self.window_s, max(0.0, remaining))))
+
+    async def _release_later(self, key: str, delay: float) -> None:
+        await asyncio.sleep(delay)
+        self._release(key, from_timer=True)
+
+    def _release(self, key: str, from_timer: bool = False) -> None:
+        """Hand a session's held messages on as one message."""
+        pending = self._pending.pop(key, None)
+        if pending is None:
+            return
+        if pending.timer and not from_timer:
+            pending.timer.cancel()
+        self.stats["released"] += 1
+        self.on_ready(merge_messages(pending.messages))
+
+    def flush(self) -> None:
+        """Release everything held right away."""
+        for key in list(self._pending):
+            self._release(key)
+
+    @property
+    def pending_count(self) -> int:
+        """Number of messages currently held."""
+        return sum(len(p.messages) for p in self._pending.values())
+
+
+def merge_messages(messages: list[InboundMessage]) -> InboundMessage:
+    """
+    Merge messages of one sender into one.
+
+    Text is joined with newlines and media concatenated. Metadata of later
+    messages wins; the timestamp is the first message's.
+    """
+    if len(messages) == 1:
+        return messages[0]
+    first = messages[0]
+    metadata: dict = {}
+    for m in messages:
+        metadata.update(m.metadata)
+    metadata["coalesced"] = len(messages)
+    return InboundMessage(
+        channel=first.channel,
+        sender_id=first.sender_id,
+        chat_id=first.chat_id,
+        content="\n".join(m.content for m in messages if m.content),
+        timestamp=first.timestamp,
+        media=[path for m in messages for path in m.media],
+        metadata=metadata,
+    )
@@ -1,53 +1,285 @@
 """Async message queue for decoupled channel-agent communication."""
 
 import asyncio
-from typing import Callable, Awaitable
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from datetime import datetime
+from typing import AsyncIterator, Callable, Awaitable, Generic, TypeVar
 
 from loguru import logger
 
 from nanobot.bus.events import InboundMessage, OutboundMessage
 
+T = TypeVar("T")
+
+# Lanes in priority order: a lane is served only when all before it are empty
+LANES = ("interactive", "system", "background")
+
+OVERFLOW_POLICIES = ("block", "drop_oldest", "reject")
+
+
+@dataclass
+class LaneLimit:
+    """Capacity of one lane and what happens when it is full."""
+    maxsize: int = 0  # 0 = unbounded
+    overflow: str = "block"  # block, drop_oldest or reject
+
+
+class BusFullError(Exception):
+    """Raised when a message is rejected by a full lane."""
+
+
+def inbound_lane(msg: InboundMessage) -> str:
+    """Lane of an inbound message: explicit metadata, else by origin."""
+    lane = msg.metadata.get("lane")
+    if lane in LANES:
+        return lane
+    if msg.channel == "system":
+        return "system"
+    if msg.metadata.get("internal"):
+        return "background"
+    return "interactive"
+
+
+def outbound_lane(msg: OutboundMessage) -> str:
+    """Lane of an outbound message: explicit metadata, else interactive."""
+    lane = msg.metadata.get("lane")
+    return lane if lane in LANES else "interactive"
+
+
+class LaneQueue(Generic[T]):
+    """
+    Priority queue with one bounded FIFO per lane.
+
+    get() always serves the highest-priority non-empty lane. Each lane has
+    its own capacity and overflow policy, plus depth and wait-time stats.
+    """
+
+    def __init__(
+        self,
+        limits: dict[str, LaneLimit] | None = None,
+        enqueued_at: Callable[[T], float] | None = None,
+    ):
+        """
+        Args:
+            limits: Capacity per lane; missing lanes are unbounded.
+            enqueued_at: Wall-clock time an item entered the system, for
+                time-in-queue stats; defaults to the time put() was called.
+        """
+        limits = limits or {}
+        for lane, limit in limits.items():
+            if lane not in LANES:
+                raise ValueError(f"Unknown lane: {lane}")
+            if limit.overflow not in OVERFLOW_POLICIES:
+                raise ValueError(f"Unknown overflow policy for lane {lane}: {limit.overflow}")
+        self.limits = {lane: limits.get(lane, LaneLimit()) for lane in LANES}
+        self._enqueued_at = enqueued_at
+        self._items: dict[str, deque[tuple[float, T]]] = {lane: deque() for lane in LANES}
+        self._changed = asyncio.Condition()
+        self.stats = {
+            lane: {"enqueued": 0, "dropped": 0, "rejected": 0, "max_depth": 0, "wait_s_total": 0.0, "wait_s_max": 0.0}
+            for lane in LANES
+        }
+
+    async def put(self, item: T, lane: str = "interactive") -> T | None:
+        """
+        Add an item to a lane, applying the lane's overflow policy when full.
+
+        Returns:
+            The item dropped to make room (drop_oldest), else None.
+
+        Raises:
+            BusFullError: If the lane is full and its policy is reject.
+        """
+        limit = self.limits[lane]
+        items = self._items[lane]
+        dropped = None
+        async with self._changed:
+            if limit.maxsize and len(items) >= limit.maxsize:
+                if limit.overflow == "reject":
+                    self.stats[lane]["rejected"] += 1
+                    raise BusFullError(f"{lane} lane is full ({limit.maxsize} messages)")
+                if limit.overflow == "drop_oldest":
+                    dropped = items.popleft()[1]
+                    self.stats[lane]["dropped"] += 1
+                else:
+                    await self._changed.wait_for(lambda: len(items) < limit.maxsize)
+
+            stamp = self._enqueued_at(item) if self._enqueued_at else time.time()
+            items.append((stamp, item))
+            stats = self.stats[lane]
+            stats["enqueued"] += 1
+            stats["max_depth"] = max(stats["max_depth"], len(items))
+            self._changed.notify_all()
+        return dropped
+
+    async def get(self) -> T:
+        """Remove and return the next item of the highest-priority lane."""
+        async with self._changed:
+            await self._changed.wait_for(lambda: any(self._items.values()))
+            lane = next(lane for lane in LANES if self._items[lane])
+            stamp, item = self._items[lane].popleft()
+            wait = max(0.0, time.time() - stamp)
+            stats = self.stats[lane]
+            stats["wait_s_total"] += wait
+            stats["wait_s_max"] = max(stats["wait_s_max"], wait)
+            # Wake putters blocked on a full lane
+            self._changed.notify_all()
+            return item
+
+    def qsize(self, lane: str | None = None) -> int:
+        """Number of queued items in one lane or in all lanes."""
+        if lane:
+            return len(self._items[lane])
+        return sum(len(items) for items in self._items.values())
+
+    def depths(self) -> dict[str, int]:
+        """Current depth of every lane."""
+        return {lane: len(items) for lane, items in self._items.items()}
+
+
+class LaneSlots:
+    """
+    Semaphore that hands free slots to waiters by lane priority.
+
+    Used to cap concurrent agent turns: when a slot frees up, a waiting
+    interactive turn gets it before any system or background turn.
+    """
+
+    def __init__(self, slots: int):
+        self._free = slots
+        self._waiters: dict[str, deque[asyncio.Future[None]]] = {lane: deque() for lane in LANES}
+
+    async def acquire(self, lane: str = "interactive") -> None:
+        """Wait for a slot."""
+        if self._free > 0 and not self.waiting:
+            self._free -= 1
+            return
+        fut: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        self._waiters[lane].append(fut)
+        try:
+            await fut
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled():
+                # Granted just as we were cancelled; pass it on
+                self.release()
+            else:
+                self._waiters[lane].remove(fut)
+            raise
+
+    def release(self) -> None:
+        """Free a slot, handing it to the highest-priority waiter."""
+        for lane in LANES:
+            waiters = self._waiters[lane]
+            while waiters:
+                fut = waiters.popleft()
+                if not fut.done():
+                    fut.set_result(None)
+                    return
+        self._free += 1
+
+    @asynccontextmanager
+    async def slot(self, lane: str = "interactive") -> AsyncIterator[None]:
+        """Hold a slot for the duration of a block."""
+        await self.acquire(lane)
+        try:
+            yield
+        finally:
+            self.release()
+
+    @property
+    def waiting(self) -> int:
+        """Number of tasks waiting for a slot."""
+        return sum(len(w) for w in self._waiters.values())
+
+
+def _inbound_timestamp(msg: InboundMessage) -> float:
+    """When an inbound message was received (its timestamp is naive local time)."""
+    if isinstance(msg.timestamp, datetime):
+        return msg.timestamp.timestamp()
+    return time.time()
+
 
 class MessageBus:
     """
     Async message bus that decouples chat channels from the agent core.
-    
+
     Channels push messages to the inbound queue, and the agent processes
-    them and pushes responses to the outbound queue.
+    them and pushes responses to the outbound queue. Both queues have
+    priority lanes (interactive, system, background) so subagent
+    announcements and background work never queue ahead of users.
     """
-    
-    def __init__(self):
-        self.inbound: asyncio.Queue[InboundMessage] = asyncio.Queue()
-        self.outbound: asyncio.Queue[OutboundMessage] = asyncio.Queue()
+
+    def __init__(
+        self,
+        inbound_limits: dict[str, LaneLimit] | None = None,
+        outbound_limits: dict[str, LaneLimit] | None = None,
+    ):
+        """
+        Args:
+            inbound_limits: Capacity and overflow policy per inbound lane.
+            outbound_limits: Capacity and overflow policy per outbound lane.
+        """
+        self.inbound: LaneQueue[InboundMessage] = LaneQueue(inbound_limits, enqueued_at=_inbound_timestamp)
+        self.outbound: LaneQueue[OutboundMessage] = LaneQueue(outbound_limits)
         self._outbound_subscribers: dict[str, list[Callable[[OutboundMessage], Awaitable[None]]]] = {}
         self._running = False
-    
-    async def publish_inbound(self, msg: InboundMessage) -> None:
-        """Publish a message from a channel to the agent."""
-        await self.inbound.put(msg)
-    
+
+    async def publish_inbound(self, msg: InboundMessage) -> bool:
+        """
+        Publish a message from a channel to the agent.
+
+        Returns:
+            False if the message was rejected by a full lane; the sender is
+            told to retry later.
+        """
+        lane = inbound_lane(msg)
+        try:
+            dropped = await self.inbound.put(msg, lane)
+        except BusFullError as e:
+            logger.warning(f"Inbound message from {msg.channel}:{msg.chat_id} rejected: {e}")
+            if msg.channel != "system":
+                await self.publish_outbound(OutboundMessage(
+                    channel=msg.channel,
+                    chat_id=msg.chat_id,
+                    content="⚠️ I'm receiving too many messages right now. Please try again in a moment.",
+                ))
+            return False
+        if dropped is not None:
+            logger.warning(f"Inbound {lane} lane full, dropped oldest message from {dropped.channel}:{dropped.chat_id}")
+        return True
+
     async def consume_inbound(self) -> InboundMessage:
         """Consume the next inbound message (blocks until available)."""
         return await self.inbound.get()
-    
+
     async def publish_outbound(self, msg: OutboundMessage) -> None:
         """Publish a response from the agent to channels."""
-        await self.outbound.put(msg)
-    
+        lane = outbound_lane(msg)
+        try:
+            dropped = await self.outbound.put(msg, lane)
+        except BusFullError as e:
+            logger.warning(f"Outbound message to {msg.channel}:{msg.chat_id} rejected: {e}")
+            return
+        if dropped is not None:
+            logger.warning(f"Outbound {lane} lane full, dropped oldest message to {dropped.channel}:{dropped.chat_id}")
+
     async def consume_outbound(self) -> OutboundMessage:
         """Consume the next outbound message (blocks until available)."""
         return await self.outbound.get()
-    
+
     def subscribe_outbound(
-        self, 
-        channel: str, 
+        self,
+        channel: str,
         callback: Callable[[OutboundMessage], Awaitable[None]]
     ) -> None:
         """Subscribe to outbound messages for a specific channel."""
         if channel not in self._outbound_subscribers:
             self._outbound_subscribers[channel] = []
         self._outbound_subscribers[channel].append(callback)
-    
+
     async def dispatch_outbound(self) -> None:
         """
         Dispatch outbound messages to subscribed channels.
@@ -65,17 +297,24 @@ class MessageBus:
                         logger.error(f"Error dispatching to {msg.channel}: {e}")
             except asyncio.TimeoutError:
                 continue
-    
+
     def stop(self) -> None:
         """Stop the dispatcher loop."""
         self._running = False
-    
+
     @property
     def inbound_size(self) -> int:
         """Number of pending inbound messages."""
         return self.inbound.qsize()
-    
+
     @property
     def outbound_size(self) -> int:
         """Number of pending outbound messages."""
         return self.outbound.qsize()
+
+    def get_stats(self) -> dict[str, dict]:
+        """Queue depth and per-lane counters (enqueued, dropped, rejected, wait times)."""
+        return {
+            "inbound": {"depth": self.inbound.depths(), "lanes": self.inbound.stats},
+            "outbound": {"depth": self.outbound.depths(), "lanes": self.outbound.stats},
+        }
@@ -1,6 +1,9 @@
 """Base channel interface for chat platforms."""
 
+import asyncio
+import time
 from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
 from typing import Any
 
 from loguru import logger
@@ -9,6 +12,15 @@ from nanobot.bus.events import InboundMessage, OutboundMessage
 from nanobot.bus.queue import MessageBus
 
 
+@dataclass
+class _StreamState:
+    """Throttling state of one live reply preview."""
+    pending: OutboundMessage | None = None
+    flush_task: asyncio.Task | None = None
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+    last_render: float = 0.0
+
+
 class BaseChannel(ABC):
     """
     Abstract base class for chat channel implementations.
@@ -19,6 +31,11 @@ class BaseChannel(ABC):
     
     name: str = "base"
     
+    # Channels that can edit a sent message set this and implement
+    # render_stream() to show replies while they are generated.
+    supports_streaming: bool = False
+    stream_edit_interval_s: float = 1.0
+    
     def __init__(self, config: Any, bus: MessageBus, workspace: Any = None):
         """
         Initialize the channel.
@@ -32,6 +49,7 @@ class BaseChannel(ABC):
         self.bus = bus
         self.workspace = workspace
         self._running = False
+        self._streams: dict[str, _StreamState] = {}
     
     @abstractmethod
     async def start(self) -> None:
@@ -60,6 +78,62 @@ class BaseChannel(ABC):
         """
         pass
     
+    async def render_stream(self, msg: OutboundMessage) -> None:
+        """
+        Show a partial reply, creating or editing the preview message.
+        
+        Args:
+            msg: Partial reply; metadata["stream_id"] identifies the preview
+                and msg.content holds the full text generated so far.
+        """
+        pass
+    
+    async def update_stream(self, msg: OutboundMessage) -> None:
+        """
+        Queue a partial reply for rendering.
+        
+        Updates are throttled to one render per stream_edit_interval_s; only
+        the latest text is rendered, so platform edit rate limits are kept.
+        """
+        if not self.supports_streaming:
+            return
+        stream_id = msg.metadata["stream_id"]
+        state = self._streams.setdefault(stream_id, _StreamState())
+        state.pending = msg
+        if state.flush_task is None:
+            delay = max(0.0, state.last_render + self.stream_edit_interval_s - time.monotonic())
+            state.flush_task = asyncio.create_task(self._flush_stream(state, delay))
+    
+    async def _flush_stream(self, state: _StreamState, delay: float) -> None:
+        """Render the latest pending text of a stream after a delay."""
+        await asyncio.sleep(delay)
+        # From here on end_stream() waits for the render instead of cancelling it
+        state.flush_task = None
+        async with state.lock:
+            msg, state.pending = state.pending, None
+            if msg is None:
+                return
+            state.last_render = time.monotonic()
+            try:
+                await self.render_stream(msg)
+            except Exception as e:
+                logger.debug(f"Stream preview update failed on {self.name}: {e}")
+    
+    async def end_stream(self, stream_id: str) -> None:
+        """
+        Stop rendering a stream before its final message is sent.
+        
+        Drops pending preview updates and waits for a render in progress, so
+        send() sees the preview message it has to finalize.
+        """
+        state = self._streams.pop(stream_id, None)
+        if state is None:
+            return
+        if state.flush_task:
+            state.flush_task.cancel()
+        async with state.lock:
+            state.pending = None
+    
     def is_allowed(self, sender_id: str) -> bool:
         """
         Check if a sender is allowed to use this bot.
@@ -23,6 +23,7 @@ class DiscordChannel(BaseChannel):
     """Discord channel using Gateway websocket."""
 
     name = "discord"
+    supports_streaming = True
 
     def __init__(self, config: DiscordConfig, bus: MessageBus, workspace: Any = None):
         super().__init__(config, bus, workspace=workspace)
@@ -32,6 +33,7 @@ class DiscordChannel(BaseChannel):
         self._heartbeat_task: asyncio.Task | None = None
         self._typing_tasks: dict[str, asyncio.Task] = {}
         self._http: httpx.AsyncClient | None = None
+        self._stream_previews: dict[str, str] = {}  # stream_id -> preview message id
 
     async def start(self) -> None:
         """Start the Discord gateway connection."""
@@ -72,12 +74,48 @@ class DiscordChannel(BaseChannel):
             await self._http.aclose()
             self._http = None
 
+    async def render_stream(self, msg: OutboundMessage) -> None:
+        """Show the partial reply as a message edited in place."""
+        if not self._http:
+            return
+        stream_id = msg.metadata["stream_id"]
+        url = f"{DISCORD_API_BASE}/channels/{msg.chat_id}/messages"
+        headers = {"Authorization": f"Bot {self.config.token}"}
+        payload = {"content": msg.content[:2000]}
+        message_id = self._stream_previews.get(stream_id)
+        if message_id is None:
+            response = await self._http.post(url, headers=headers, json=payload)
+            response.raise_for_status()
+            self._stream_previews[stream_id] = response.json()["id"]
+            await self._stop_typing(msg.chat_id)
+        else:
+            response = await self._http.patch(f"{url}/{message_id}", headers=headers, json=payload)
+            response.raise_for_status()
+
+    async def _finish_preview(self, msg: OutboundMessage, message_id: str, content: str | None) -> bool:
+        """Replace a stream preview with the final text, or delete it if content is None."""
+        url = f"{DISCORD_API_BASE}/channels/{msg.chat_id}/messages/{message_id}"
+        headers = {"Authorization": f"Bot {self.config.token}"}
+        try:
+            if content is None:
+                response = await self._http.delete(url, headers=headers)
+            else:
+                response = await self._http.patch(url, headers=headers, json={"content": content})
+            response.raise_for_status()
+            return True
+        except Exception as e:
+            logger.debug(f"Failed to finalize Discord preview {message_id}: {e}")
+            return False
+
     async def send(self, msg: OutboundMessage) -> None:
         """Send a message through Discord REST API."""
         if not self._http:
             logger.warning("Discord HTTP client not initialized")
             return
 
+        # A streamed reply already has a preview message to finalize
+        preview_id = self._stream_previews.pop(msg.metadata.get("stream_id") or "", None)
+
         import re
         import os
         import mimetypes
@@ -196,6 +234,12 @@ class DiscordChannel(BaseChannel):
             # Clean up text
             text_content = re.sub(r'\n{3,}', '\n\n', text_content).strip()
 
+            if preview_id is not None:
+                if text_content and len(text_content) <= 2000 and not all_files:
+                    if await self._finish_preview(msg, preview_id, text_content):
+                        return
+                await self._finish_preview(msg, preview_id, None)
+
             # Send remaining text if any
             if text_content:
                 payload: dict[str, Any] = {"content": text_content}
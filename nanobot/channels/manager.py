@@ -152,8 +152,14 @@ class ChannelManager:
                 )
                 
                 channel = self.channels.get(msg.channel)
-                if channel:
+                stream_id = msg.metadata.get("stream_id")
+                if channel and msg.metadata.get("streaming"):
+                    # Partial reply: the channel throttles and renders it
+                    await channel.update_stream(msg)
+                elif channel:
                     try:
+                        if stream_id:
+                            await channel.end_stream(stream_id)
                         await channel.send(msg)
                     except Exception as e:
                         logger.error(f"Error sending to {msg.channel}: {e}")
@@ -22,6 +22,7 @@ class SlackChannel(BaseChannel):
     """Slack channel using Socket Mode websocket + Web API."""
 
     name = "slack"
+    supports_streaming = True
 
     def __init__(self, config: SlackConfig, bus: MessageBus, workspace: Any = None):
         super().__init__(config, bus, workspace=workspace)
@@ -29,6 +30,7 @@ class SlackChannel(BaseChannel):
         self._ws: websockets.WebSocketClientProtocol | None = None
         self._http: httpx.AsyncClient | None = None
         self._bot_user_id: str | None = None
+        self._stream_previews: dict[str, str] = {}  # stream_id -> preview message ts
 
     async def start(self) -> None:
         """Start the Slack Socket Mode connection."""
@@ -82,12 +84,45 @@ class SlackChannel(BaseChannel):
             await self._http.aclose()
             self._http = None
 
+    async def _call(self, method: str, payload: dict[str, Any]) -> dict[str, Any]:
+        """Call a Slack Web API method with a JSON body."""
+        resp = await self._http.post(
+            f"{SLACK_API_BASE}/{method}",
+            headers={
+                "Authorization": f"Bearer {self.config.bot_token}",
+                "Content-Type": "application/json",
+            },
+            json=payload,
+        )
+        data = resp.json()
+        if not data.get("ok"):
+            raise RuntimeError(f"Slack {method} error: {data.get('error')}")
+        return data
+
+    async def render_stream(self, msg: OutboundMessage) -> None:
+        """Show the partial reply as a message updated in place."""
+        if not self._http:
+            return
+        stream_id = msg.metadata["stream_id"]
+        ts = self._stream_previews.get(stream_id)
+        if ts is None:
+            payload: dict[str, Any] = {"channel": msg.chat_id, "text": msg.content}
+            if msg.reply_to:
+                payload["thread_ts"] = msg.reply_to
+            data = await self._call("chat.postMessage", payload)
+            self._stream_previews[stream_id] = data["ts"]
+        else:
+            await self._call("chat.update", {"channel": msg.chat_id, "ts": ts, "text": msg.content})
+
     async def send(self, msg: OutboundMessage) -> None:
         """Send a message through Slack Web API."""
         if not self._http:
             logger.warning("Slack HTTP client not initialized")
             return
 
+        # A streamed reply already has a preview message to finalize
+        preview_ts = self._stream_previews.pop(msg.metadata.get("stream_id") or "", None)
+
         import re
         import os
         import mimetypes
@@ -193,6 +228,15 @@ class SlackChannel(BaseChannel):
             # Clean up text
             text_content = re.sub(r'\n{3,}', '\n\n', text_content).strip()
 
+            if preview_ts is not None:
+                try:
+                    if text_content and not all_files:
+                        await self._call("chat.update", {"channel": msg.chat_id, "ts": preview_ts, "text": text_content})
+                        return
+                    await self._call("chat.delete", {"channel": msg.chat_id, "ts": preview_ts})
+                except Exception as e:
+                    logger.debug(f"Failed to finalize Slack preview {preview_ts}: {e}")
+
             # Send text message
             if text_content:
                 payload: dict[str, Any] = {
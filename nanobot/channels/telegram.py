@@ -6,6 +6,7 @@ from typing import Any
 
 from loguru import logger
 from telegram import Update
+from telegram.error import BadRequest
 from telegram.ext import Application, MessageHandler, filters, ContextTypes
 
 from nanobot.bus.events import OutboundMessage
@@ -119,6 +120,7 @@ class TelegramChannel(BaseChannel):
     """
     
     name = "telegram"
+    supports_streaming = True
     
     def __init__(self, config: TelegramConfig, bus: MessageBus, workspace: Any = None, groq_api_key: str = ""):
         super().__init__(config, bus, workspace=workspace)
@@ -127,6 +129,7 @@ class TelegramChannel(BaseChannel):
         self._app: Application | None = None
         self._chat_ids: dict[str, int] = {}  # Map sender_id to chat_id for replies
         self._typing_tasks: dict[int, asyncio.Task] = {}  # chat_id -> typing task
+        self._stream_previews: dict[str, int] = {}  # stream_id -> preview message_id
     
     async def start(self) -> None:
         """Start the Telegram bot with long polling."""
@@ -209,12 +212,39 @@ class TelegramChannel(BaseChannel):
         if task:
             task.cancel()
 
+    async def render_stream(self, msg: OutboundMessage) -> None:
+        """Show the partial reply as a plain-text message edited in place."""
+        if not self._app:
+            return
+        chat_id = int(msg.chat_id)
+        stream_id = msg.metadata["stream_id"]
+        text = msg.content[:4000]
+        message_id = self._stream_previews.get(stream_id)
+        if message_id is None:
+            sent = await self._app.bot.send_message(chat_id=chat_id, text=text)
+            self._stream_previews[stream_id] = sent.message_id
+            await self._stop_typing(chat_id)
+        else:
+            await self._app.bot.edit_message_text(chat_id=chat_id, message_id=message_id, text=text)
+    
+    async def _delete_preview(self, chat_id: int, message_id: int | None) -> None:
+        """Delete a stream preview that cannot hold the final reply."""
+        if message_id is None:
+            return
+        try:
+            await self._app.bot.delete_message(chat_id=chat_id, message_id=message_id)
+        except Exception as e:
+            logger.debug(f"Failed to delete Telegram preview {message_id}: {e}")
+    
     async def send(self, msg: OutboundMessage) -> None:
         """Send a message through Telegram."""
         if not self._app:
             logger.warning("Telegram bot not running")
             return
         
+        # A streamed reply already has a preview message to finalize
+        preview_id = self._stream_previews.pop(msg.metadata.get("stream_id") or "", None)
+        
         try:
             # chat_id should be the Telegram chat ID (integer)
             chat_id = int(msg.chat_id)
@@ -357,12 +387,29 @@ class TelegramChannel(BaseChannel):
             
             # Clean up extra whitespace from removed file paths
             text_content = re.sub(r'\n{3,}', '\n\n', text_content).strip()
+            if not text_content:
+                await self._delete_preview(chat_id, preview_id)
             
             # Send remaining text if any
             if text_content:
                 html_content = _markdown_to_telegram_html(text_content)
                 # Telegram has a 4096 character limit per message — split if needed
                 chunks = _split_telegram_message(html_content, max_len=4000)
+                if preview_id is not None and len(chunks) == 1 and not all_files:
+                    try:
+                        await self._app.bot.edit_message_text(
+                            chat_id=chat_id,
+                            message_id=preview_id,
+                            text=chunks[0],
+                            parse_mode="HTML"
+                        )
+                    except BadRequest as e:
+                        # The preview already shows exactly this text
+                        if "not modified" not in str(e).lower():
+                            raise
+                    return
+                await self._delete_preview(chat_id, preview_id)
+                preview_id = None
                 for chunk in chunks:
                     await self._app.bot.send_message(
                         chat_id=chat_id,
@@ -375,10 +422,18 @@ class TelegramChannel(BaseChannel):
             # Fallback to plain text if HTML parsing fails
             logger.warning(f"HTML parse failed, falling back to plain text: {e}")
             try:
-                await self._app.bot.send_message(
-                    chat_id=int(msg.chat_id),
-                    text=msg.content
-                )
+                if preview_id is not None and len(msg.content) <= 4000:
+                    await self._app.bot.edit_message_text(
+                        chat_id=int(msg.chat_id),
+                        message_id=preview_id,
+                        text=msg.content
+                    )
+                else:
+                    await self._delete_preview(int(msg.chat_id), preview_id)
+                    await self._app.bot.send_message(
+                        chat_id=int(msg.chat_id),
+                        text=msg.content
+                    )
             except Exception as e2:
                 logger.error(f"Error sending Telegram message: {e2}")
         finally:
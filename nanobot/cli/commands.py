@@ -149,6 +149,63 @@ This file stores important information that should persist across sessions.
         console.print("  [dim]Created memory/MEMORY.md[/dim]")
 
 
+def _token_budget(config):
+    """Build the prompt token budget from agent defaults."""
+    from nanobot.agent.tokens import TokenBudget
+    d = config.agents.defaults
+    return TokenBudget(
+        max_context_tokens=d.max_context_tokens,
+        reply_tokens=d.max_tokens,
+        system_share=d.context_system_share,
+        history_share=d.context_history_share,
+        turn_share=d.context_turn_share,
+        max_history_messages=d.max_history_messages,
+    )
+
+
+def _message_bus(config):
+    """Build the message bus with the configured lane capacities."""
+    from nanobot.bus.queue import LANES, LaneLimit, MessageBus
+    inbound = {
+        lane: LaneLimit(maxsize=getattr(config.bus, lane).max_size, overflow=getattr(config.bus, lane).overflow)
+        for lane in LANES
+    }
+    outbound = {lane: LaneLimit(maxsize=config.bus.outbound_max_size) for lane in LANES}
+    return MessageBus(inbound_limits=inbound, outbound_limits=outbound)
+
+
+def _session_store(config):
+    """Build the configured session storage backend."""
+    from nanobot.session.store import JsonlSessionStore, SqliteSessionStore
+    sessions_dir = config.workspace_path / "sessions"
+    if config.sessions.backend == "sqlite":
+        return SqliteSessionStore(sessions_dir / "sessions.db")
+    if config.sessions.backend != "jsonl":
+        raise ValueError(f"Unknown session backend: {config.sessions.backend}")
+    return JsonlSessionStore(sessions_dir)
+
+
+def _session_manager(config):
+    """Build the session manager with the configured backend and memory limits."""
+    from nanobot.session.manager import SessionManager
+    return SessionManager(
+        config.workspace_path,
+        store=_session_store(config),
+        tail_messages=config.sessions.tail_messages,
+        max_cached=config.sessions.cache_max_sessions,
+        max_cached_bytes=int(config.sessions.cache_max_mb * 1024 * 1024),
+        idle_ttl_s=config.sessions.cache_idle_ttl_s,
+        write_behind_s=config.sessions.write_behind_s,
+        fsync=config.sessions.fsync,
+    )
+
+
+def _session_classes(config):
+    """Build the session history policies from the configured classes."""
+    from nanobot.session.policy import SessionClasses, SessionPolicy
+    return SessionClasses([(c.match, SessionPolicy(c.policy, c.max_messages)) for c in config.sessions.classes])
+
+
 # ============================================================================
 # Gateway / Server
 # ============================================================================
@@ -162,13 +219,13 @@ def gateway(
 ):
     """Start the nanobot gateway."""
     from nanobot.config.loader import load_config, get_data_dir
-    from nanobot.bus.queue import MessageBus
     from nanobot.providers.litellm_provider import LiteLLMProvider
     from nanobot.agent.loop import AgentLoop
     from nanobot.channels.manager import ChannelManager
     from nanobot.cron.service import CronService
     from nanobot.cron.types import CronJob
     from nanobot.heartbeat.service import HeartbeatService
+    import time
     
     # If --config provided, set it as env var so load_config picks it up
     if config:
@@ -191,7 +248,7 @@ def gateway(
     console.print(f"[green]✓[/green] Gateway port: {port}")
     
     # Create components
-    bus = MessageBus()
+    bus = _message_bus(config)
     
     # Create provider (supports OpenRouter, Anthropic, OpenAI, Bedrock)
     api_key = config.get_api_key()
@@ -215,6 +272,23 @@ def gateway(
     cron_store_path = config.workspace_path / "cron" / "jobs.json"
     cron = CronService(cron_store_path, timezone=config.agents.defaults.timezone)
     
+    # Platform credit checks (only when PLATFORM_URL / CREDIT_USER_ID are set)
+    from nanobot.billing import CreditGuard
+    credit_guard = CreditGuard.from_env(
+        ttl_s=config.platform.credit_cache_ttl_s,
+        blocked_ttl_s=config.platform.credit_blocked_ttl_s,
+        timeout_s=config.platform.credit_check_timeout_s,
+        fail_open=config.platform.credit_fail_open,
+    )
+    
+    from nanobot.billing import UsageReporter
+    usage_reporter = UsageReporter.from_env(
+        config.workspace_path,
+        transport=config.platform.usage_transport,
+        flush_interval_s=config.platform.usage_flush_interval_s,
+        batch_size=config.platform.usage_batch_size,
+    )
+    
     # Create agent with cron service
     agent = AgentLoop(
         bus=bus,
@@ -222,6 +296,16 @@ def gateway(
         workspace=config.workspace_path,
         model=config.agents.defaults.model,
         max_iterations=config.agents.defaults.max_tool_iterations,
+        turn_timeout_s=config.agents.defaults.turn_timeout_s,
+        response_cache_ttl_s=config.agents.defaults.response_cache_ttl_s,
+        response_cache_max_entries=config.agents.defaults.response_cache_max_entries,
+        session_manager=_session_manager(config),
+        summarize_after_messages=config.sessions.summarize_after_messages,
+        summarize_after_tokens=config.sessions.summarize_after_tokens,
+        summary_keep_messages=config.sessions.summary_keep_messages,
+        summary_model=config.sessions.summary_model or None,
+        tool_digest_chars=config.agents.defaults.tool_digest_chars,
+        session_classes=_session_classes(config),
         brave_api_key=config.tools.web.search.api_key or None,
         exec_config=config.tools.exec,
         browser_config=config.tools.browser,
@@ -229,6 +313,19 @@ def gateway(
         restrict_to_workspace=config.tools.restrict_to_workspace,
         plan=config.agents.defaults.plan,
         timezone=config.agents.defaults.timezone,
+        max_concurrent_turns=config.agents.defaults.max_concurrent_turns,
+        max_pending_turns=config.bus.max_pending_turns,
+        stream=config.agents.defaults.stream,
+        credit_guard=credit_guard,
+        usage_reporter=usage_reporter,
+        coalesce_window_s=config.agents.defaults.coalesce_window_s,
+        coalesce_max_wait_s=config.agents.defaults.coalesce_max_wait_s,
+        on_new_message=config.agents.defaults.on_new_message,
+        prefetch_max_urls=config.tools.web.prefetch_max_urls,
+        prefetch_max_bytes=config.tools.web.prefetch_max_bytes,
+        token_budget=_token_budget(config),
+        offload_threshold=config.tools.offload_threshold_chars,
+        offload_scope=config.tools.offload_scope,
     )
     
     # Set cron callback (needs agent)
@@ -246,7 +343,8 @@ def gateway(
             await bus.publish_outbound(OutboundMessage(
                 channel=job.payload.channel or "cli",
                 chat_id=job.payload.to,
-                content=response or ""
+                content=response or "",
+                metadata={"lane": "background"},
             ))
         return response
     cron.on_job = on_cron_job
@@ -254,7 +352,7 @@ def gateway(
     # Create heartbeat service
     async def on_heartbeat(prompt: str) -> str:
         """Execute heartbeat through the agent."""
-        return await agent.process_direct(prompt, session_key="heartbeat")
+        return await agent.process_direct(prompt, session_key="heartbeat", cacheable=True)
     
     heartbeat = HeartbeatService(
         workspace=config.workspace_path,
@@ -306,11 +404,88 @@ def gateway(
                 except Exception as e:
                     return web.json_response({"error": str(e)}, status=500)
 
+            async def handle_chat_stream(request):
+                """Stream a web chat reply as server-sent events."""
+                try:
+                    body = await request.json()
+                except Exception:
+                    return web.json_response({"error": "invalid JSON"}, status=400)
+                message = body.get("message", "").strip()
+                channel = body.get("channel", "webchat")
+                chat_id = body.get("chat_id", "direct")
+                session_key = body.get("session_key", f"{channel}:{chat_id}")
+                if not message:
+                    return web.json_response({"error": "message is required"}, status=400)
+
+                resp = web.StreamResponse(headers={
+                    "Content-Type": "text/event-stream",
+                    "Cache-Control": "no-cache",
+                    "X-Accel-Buffering": "no",
+                })
+                await resp.prepare(request)
+
+                async def send_event(payload: dict) -> None:
+                    await resp.write(f"data: {_json.dumps(payload)}\n\n".encode())
+
+                async def on_delta(delta: str) -> None:
+                    await send_event({"delta": delta})
+
+                try:
+                    response = await agent.process_direct(
+                        message,
+                        session_key=session_key,
+                        channel=channel,
+                        chat_id=chat_id,
+                        on_stream=on_delta,
+                    )
+                    await send_event({"response": response or "", "done": True})
+                except ConnectionResetError:
+                    pass  # Client went away; the turn itself has completed
+                except Exception as e:
+                    try:
+                        await send_event({"error": str(e), "done": True})
+                    except ConnectionResetError:
+                        pass
+                return resp
+
+            # Taken out of the environment so the agent's shell commands
+            # cannot read it and unblock themselves
+            import hmac
+            import os
+            credits_secret = os.environ.pop("PLATFORM_WEBHOOK_SECRET", "")
+
+            async def handle_credits(request):
+                """Receive a balance change pushed by the platform."""
+                if not agent.credit_guard:
+                    return web.json_response({"error": "credit checks are not enabled"}, status=404)
+                given = request.headers.get("X-Platform-Secret", "")
+                if not credits_secret or not hmac.compare_digest(given.encode(), credits_secret.encode()):
+                    return web.json_response({"error": "unauthorized"}, status=401)
+                try:
+                    body = await request.json()
+                    if not isinstance(body.get("ok"), bool):
+                        return web.json_response({"error": "\"ok\" (true/false) is required"}, status=400)
+                    agent.credit_guard.update(
+                        ok=body["ok"],
+                        balance=body.get("balance"),
+                        reason=body.get("reason"),
+                    )
+                    return web.json_response({"status": "ok"})
+                except Exception as e:
+                    return web.json_response({"error": str(e)}, status=400)
+
             async def handle_health(request):
-                return web.json_response({"status": "ok", "port": port})
+                return web.json_response({
+                    "status": "ok",
+                    "port": port,
+                    "bus": bus.get_stats(),
+                    "sessions": agent.sessions.stats,
+                })
 
             http_app = web.Application()
             http_app.router.add_post("/chat", handle_chat)
+            http_app.router.add_post("/chat/stream", handle_chat_stream)
+            http_app.router.add_post("/credits", handle_credits)
             http_app.router.add_get("/health", handle_health)
 
             runner = web.AppRunner(http_app)
@@ -357,9 +532,19 @@ def gateway(
             # Without this, if channels.start_all() returns (e.g. no channels
             # enabled) the process would exit immediately, killing the web chat
             # gateway and the agent loop.
+            # Idle chats are compressed hourly (restored when used again)
+            archive_after_s = config.sessions.archive_after_days * 86400
+            archive_at = time.monotonic() + 60 if archive_after_s > 0 and config.sessions.backend == "jsonl" else None
+            
             try:
                 while True:
                     await asyncio.sleep(60)
+                    if archive_at is not None and time.monotonic() >= archive_at:
+                        archive_at = time.monotonic() + 3600
+                        try:
+                            await asyncio.to_thread(agent.sessions.archive, archive_after_s)
+                        except Exception as e:
+                            logger.warning(f"Session archiving failed: {e}")
                     # If both tasks died, log but keep running for web chat
                     if agent_task.done() and channels_task.done():
                         agent_exc = agent_task.exception() if not agent_task.cancelled() else None
@@ -376,6 +561,10 @@ def gateway(
             cron.stop()
             agent.stop()
             await channels.stop_all()
+            if agent.credit_guard:
+                await agent.credit_guard.close()
+            await agent.usage.close()
+            agent.sessions.close()
     
     asyncio.run(run())
 
@@ -424,6 +613,10 @@ def agent(
         exec_config=config.tools.exec,
         browser_config=config.tools.browser,
         restrict_to_workspace=config.tools.restrict_to_workspace,
+        token_budget=_token_budget(config),
+        offload_threshold=config.tools.offload_threshold_chars,
+        offload_scope=config.tools.offload_scope,
+        session_manager=_session_manager(config),
     )
     
     if message:
@@ -431,6 +624,8 @@ def agent(
         async def run_once():
             response = await agent_loop.process_direct(message, session_id)
             console.print(f"\n{__logo__} {response}")
+            await agent_loop.usage.close()
+            agent_loop.sessions.close()
         
         asyncio.run(run_once())
     else:
@@ -449,6 +644,8 @@ def agent(
                 except KeyboardInterrupt:
                     console.print("\nGoodbye!")
                     break
+            await agent_loop.usage.close()
+            agent_loop.sessions.close()
         
         asyncio.run(run_interactive())
 
@@ -739,6 +936,63 @@ def cron_run(
         console.print(f"[red]Failed to run job {job_id}[/red]")
 
 
+# ============================================================================
+# Session Commands
+# ============================================================================
+
+sessions_app = typer.Typer(help="Manage conversation sessions")
+app.add_typer(sessions_app, name="sessions")
+
+
+@sessions_app.command("migrate")
+def sessions_migrate():
+    """Copy JSONL session files into the SQLite session store."""
+    from nanobot.config.loader import load_config
+    from nanobot.session.store import JsonlSessionStore, SqliteSessionStore, migrate_sessions
+    
+    config = load_config()
+    sessions_dir = config.workspace_path / "sessions"
+    target = SqliteSessionStore(sessions_dir / "sessions.db")
+    try:
+        copied = migrate_sessions(JsonlSessionStore(sessions_dir), target)
+    finally:
+        target.close()
+    
+    console.print(f"[green]✓[/green] Copied {copied} session(s) to {target.path}")
+    if config.sessions.backend != "sqlite":
+        console.print('Set "sessions": {"backend": "sqlite"} in your config to use it.')
+
+
+@sessions_app.command("archive")
+def sessions_archive(
+    days: float = typer.Option(None, "--days", "-d", help="Archive chats idle this many days (default: sessions.archiveAfterDays)"),
+):
+    """Compress idle chat histories and report the space reclaimed."""
+    from nanobot.config.loader import load_config
+    
+    config = load_config()
+    days = config.sessions.archive_after_days if days is None else days
+    if days <= 0:
+        console.print("[red]Error: --days must be positive[/red]")
+        raise typer.Exit(1)
+    
+    sessions = _session_manager(config)
+    try:
+        report = sessions.archive(days * 86400)
+    except NotImplementedError:
+        console.print(f"[yellow]The {config.sessions.backend} session backend does not archive.[/yellow]")
+        raise typer.Exit(1)
+    finally:
+        sessions.close()
+    
+    mb = 1024 * 1024
+    console.print(
+        f"[green]✓[/green] Archived {report.sessions} session(s) idle for {days:g}+ days: "
+        f"{report.bytes_before / mb:.1f} MB → {report.bytes_after / mb:.1f} MB "
+        f"({report.reclaimed / mb:.1f} MB reclaimed)"
+    )
+
+
 # ============================================================================
 # Status Commands
 # ============================================================================
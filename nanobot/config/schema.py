@@ -75,8 +75,22 @@ class AgentDefaults(BaseModel):
     max_tokens: int = 8192
     temperature: float = 0.7
     max_tool_iterations: int = 20
+    turn_timeout_s: float = 300.0  # Time budget of a turn across LLM calls and tools (0 = none)
     plan: str = "free"
     timezone: str = "UTC"
+    max_concurrent_turns: int = 4  # Turns of different chats run in parallel; same chat stays ordered
+    stream: bool = True  # Stream replies as they are generated (live message edits, SSE)
+    max_context_tokens: int = 32000  # Prompt budget per call (capped by the model's context window)
+    context_system_share: float = 0.25  # Budget split: system prompt / history / current turn;
+    context_history_share: float = 0.5  # unused system and turn shares go to history
+    context_turn_share: float = 0.25
+    max_history_messages: int = 200  # History messages considered per call, before the token budget applies
+    tool_digest_chars: int = 2000  # History shows what earlier replies fetched/read, newest first, up to this many chars (0 disables)
+    coalesce_window_s: float = 0.0  # Merge a user's rapid messages arriving within this gap (0 disables; delays every reply by the gap)
+    coalesce_max_wait_s: float = 5.0  # ...but never hold a message longer than this
+    on_new_message: str = "queue"  # While a chat's turn runs: "queue" new messages, "cancel" the turn, or "inject" them into it
+    response_cache_ttl_s: float = 0.0  # Reuse LLM responses of identical cron/heartbeat prompts this long (0 disables)
+    response_cache_max_entries: int = 500  # Least recently used responses beyond this are dropped
 
 
 class AgentsConfig(BaseModel):
@@ -128,6 +142,8 @@ class BrowserConfig(BaseModel):
 class WebToolsConfig(BaseModel):
     """Web tools configuration."""
     search: WebSearchConfig = Field(default_factory=WebSearchConfig)
+    prefetch_max_urls: int = 2  # Start fetching links in a user's message right away (0 disables)
+    prefetch_max_bytes: int = 2_000_000  # Abandon prefetches of larger responses
 
 
 class ExecToolConfig(BaseModel):
@@ -142,6 +158,61 @@ class ToolsConfig(BaseModel):
     browser: BrowserConfig = Field(default_factory=BrowserConfig)
     exec: ExecToolConfig = Field(default_factory=ExecToolConfig)
     restrict_to_workspace: bool = False  # If true, restrict all tool access to workspace directory
+    offload_threshold_chars: int = 8000  # Longer tool results are stored and previewed (0 disables)
+    offload_scope: str = "turn"  # Keep offloaded results for the "turn" or the whole "session"
+
+
+class PlatformConfig(BaseModel):
+    """Hosting platform integration (enabled by PLATFORM_URL / CREDIT_USER_ID env vars)."""
+    credit_cache_ttl_s: float = 30.0  # Reuse an "ok" credit check for this long
+    credit_blocked_ttl_s: float = 5.0  # Re-check exhausted credits this often (notice top-ups)
+    credit_check_timeout_s: float = 3.0
+    credit_fail_open: bool = False  # Allow messages when the platform cannot be reached
+    usage_transport: str = "stdout"  # "stdout" ([USAGE] lines) or "http" (POST to PLATFORM_URL)
+    usage_flush_interval_s: float = 5.0  # Report token usage at least this often
+    usage_batch_size: int = 50  # ...or as soon as this many LLM calls are pending
+
+
+class BusLaneConfig(BaseModel):
+    """Capacity of one message bus lane."""
+    max_size: int = 0  # 0 = unbounded
+    overflow: str = "block"  # When full: "block", "drop_oldest" or "reject" (with a notice to the sender)
+
+
+class BusConfig(BaseModel):
+    """Message bus lanes: interactive (users) before system (subagents) before background (cron, heartbeat)."""
+    interactive: BusLaneConfig = Field(default_factory=lambda: BusLaneConfig(max_size=1000, overflow="reject"))
+    system: BusLaneConfig = Field(default_factory=lambda: BusLaneConfig(max_size=500, overflow="block"))
+    background: BusLaneConfig = Field(default_factory=lambda: BusLaneConfig(max_size=100, overflow="drop_oldest"))
+    outbound_max_size: int = 1000  # Per outbound lane; publishers wait when full
+    max_pending_turns: int = 16  # Stop taking inbound messages while this many turns wait for the agent
+
+
+class SessionClassConfig(BaseModel):
+    """History policy of the sessions whose key matches a glob pattern."""
+    match: str  # Session key pattern, e.g. "cron:*" or "telegram:12345"
+    policy: str = "full"  # "full", "ephemeral" (no history), "ring" (last maxMessages) or "summarized"
+    max_messages: int = 0  # ring: messages kept; summarized: summarize past this many
+
+
+class SessionsConfig(BaseModel):
+    """Conversation session storage."""
+    backend: str = "jsonl"  # "jsonl" (one file per chat) or "sqlite" (sessions/sessions.db)
+    tail_messages: int = 200  # Most recent messages of a session held in memory
+    cache_max_sessions: int = 256  # Sessions held in memory, least recently used dropped first (0 = unlimited)
+    cache_max_mb: float = 64.0  # Approximate memory budget of cached sessions (0 = unlimited)
+    cache_idle_ttl_s: float = 3600.0  # Drop sessions from memory after this long unused (0 = never)
+    write_behind_s: float = 0.5  # Save on a background thread, merging saves of a chat within this window (0 = save inline)
+    fsync: bool = False  # Sync each batch of background writes to disk
+    archive_after_days: float = 30.0  # Gzip chats idle this long into sessions/archive/ (0 disables; JSONL backend)
+    summarize_after_messages: int = 0  # Fold older messages into a rolling summary past this many (0 disables)
+    summarize_after_tokens: int = 0  # ...or past this many tokens of unsummarized history (0 disables)
+    summary_keep_messages: int = 20  # Most recent messages always kept verbatim
+    summary_model: str = ""  # Model for summaries (empty = the agent's model)
+    classes: list[SessionClassConfig] = Field(default_factory=lambda: [  # First match wins; others keep full history
+        SessionClassConfig(match="heartbeat", policy="ring", max_messages=4),
+        SessionClassConfig(match="cron:*", policy="ring", max_messages=4),
+    ])
 
 
 class Config(BaseSettings):
@@ -151,6 +222,9 @@ class Config(BaseSettings):
     providers: ProvidersConfig = Field(default_factory=ProvidersConfig)
     gateway: GatewayConfig = Field(default_factory=GatewayConfig)
     tools: ToolsConfig = Field(default_factory=ToolsConfig)
+    platform: PlatformConfig = Field(default_factory=PlatformConfig)
+    bus: BusConfig = Field(default_factory=BusConfig)
+    sessions: SessionsConfig = Field(default_factory=SessionsConfig)
     
     @property
     def workspace_path(self) -> Path:
@@ -1,6 +1,9 @@
 """Heartbeat service - periodic agent wake-up to check for tasks."""
 
 import asyncio
+import hashlib
+import random
+import time
 from pathlib import Path
 from typing import Any, Callable, Coroutine
 
@@ -9,6 +12,9 @@ from loguru import logger
 # Default interval: 30 minutes
 DEFAULT_HEARTBEAT_INTERVAL_S = 30 * 60
 
+# Longest gap between agent runs while HEARTBEAT.md is unchanged and OK
+DEFAULT_MAX_INTERVAL_S = 4 * 60 * 60
+
 # The prompt sent to agent during heartbeat
 HEARTBEAT_PROMPT = """Read HEARTBEAT.md in your workspace (if it exists).
 Follow any instructions or tasks listed there.
@@ -41,6 +47,11 @@ class HeartbeatService:
     
     The agent reads HEARTBEAT.md from the workspace and executes any
     tasks listed there. If nothing needs attention, it replies HEARTBEAT_OK.
+    
+    While HEARTBEAT.md stays unchanged and keeps getting HEARTBEAT_OK, the
+    agent is woken exponentially less often (2x, 4x, ... the interval, up to
+    max_interval_s); editing the file resets this. Ticks are jittered so
+    many gateways started together do not wake their agents at once.
     """
     
     def __init__(
@@ -49,13 +60,23 @@ class HeartbeatService:
         on_heartbeat: Callable[[str], Coroutine[Any, Any, str]] | None = None,
         interval_s: int = DEFAULT_HEARTBEAT_INTERVAL_S,
         enabled: bool = True,
+        max_interval_s: int = DEFAULT_MAX_INTERVAL_S,
+        jitter: float = 0.1,
     ):
         self.workspace = workspace
         self.on_heartbeat = on_heartbeat
         self.interval_s = interval_s
         self.enabled = enabled
+        self.max_interval_s = max(interval_s, max_interval_s)
+        self.jitter = jitter
         self._running = False
         self._task: asyncio.Task | None = None
+        
+        # Outcome of the last agent run, for skipping unchanged ticks
+        self._last_digest: str | None = None
+        self._ok_streak = 0
+        self._next_due = 0.0
+        self.stats = {"ticks": 0, "runs": 0, "skipped": 0}
     
     @property
     def heartbeat_file(self) -> Path:
@@ -87,11 +108,19 @@ class HeartbeatService:
             self._task.cancel()
             self._task = None
     
+    def _next_sleep(self, first: bool = False) -> float:
+        """Seconds until the next tick: a random phase first, then the interval ± jitter."""
+        if first:
+            return random.uniform(0, self.interval_s)
+        return self.interval_s * random.uniform(1 - self.jitter, 1 + self.jitter)
+    
     async def _run_loop(self) -> None:
         """Main heartbeat loop."""
+        first = True
         while self._running:
             try:
-                await asyncio.sleep(self.interval_s)
+                await asyncio.sleep(self._next_sleep(first))
+                first = False
                 if self._running:
                     await self._tick()
             except asyncio.CancelledError:
@@ -103,21 +132,40 @@ class HeartbeatService:
         """Execute a single heartbeat tick."""
         content = self._read_heartbeat_file()
         
+        self.stats["ticks"] += 1
+        
         # Skip if HEARTBEAT.md is empty or doesn't exist
         if _is_heartbeat_empty(content):
             logger.debug("Heartbeat: no tasks (HEARTBEAT.md empty)")
             return
         
+        # Back off while the file is unchanged since the last HEARTBEAT_OK
+        digest = hashlib.sha256(content.encode("utf-8")).hexdigest()
+        now = time.monotonic()
+        if digest != self._last_digest:
+            self._ok_streak = 0
+        elif self._ok_streak and now < self._next_due:
+            self.stats["skipped"] += 1
+            logger.debug("Heartbeat: HEARTBEAT.md unchanged since last OK, skipping")
+            return
+        
         logger.info("Heartbeat: checking for tasks...")
         
         if self.on_heartbeat:
             try:
+                self.stats["runs"] += 1
                 response = await self.on_heartbeat(HEARTBEAT_PROMPT)
+                self._last_digest = digest
                 
                 # Check if agent said "nothing to do"
                 if HEARTBEAT_OK_TOKEN.replace("_", "") in response.upper().replace("_", ""):
-                    logger.info("Heartbeat: OK (no action needed)")
+                    self._ok_streak += 1
+                    backoff = min(self.interval_s * 2 ** self._ok_streak, self.max_interval_s)
+                    # Half an interval of slack so a jittered tick is not missed
+                    self._next_due = now + backoff - self.interval_s / 2
+                    logger.info(f"Heartbeat: OK (no action needed), next check in ~{backoff / 60:.0f} min unless HEARTBEAT.md changes")
                 else:
+                    self._ok_streak = 0
                     logger.info(f"Heartbeat: completed task")
                     
             except Exception as e:
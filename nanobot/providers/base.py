@@ -2,7 +2,9 @@
 
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
-from typing import Any
+from typing import Any, AsyncIterator
+
+from nanobot.utils.deadline import Deadline
 
 
 @dataclass
@@ -27,6 +29,18 @@ class LLMResponse:
         return len(self.tool_calls) > 0
 
 
+@dataclass
+class LLMStreamEvent:
+    """
+    One event from a streaming chat call.
+    
+    Text arrives as a series of deltas; the last event carries the fully
+    assembled response (content, tool calls, usage) and no delta.
+    """
+    delta: str = ""
+    response: LLMResponse | None = None
+
+
 class LLMProvider(ABC):
     """
     Abstract base class for LLM providers.
@@ -47,6 +61,7 @@ class LLMProvider(ABC):
         model: str | None = None,
         max_tokens: int = 16384,
         temperature: float = 0.7,
+        deadline: Deadline | None = None,
     ) -> LLMResponse:
         """
         Send a chat completion request.
@@ -57,12 +72,46 @@ class LLMProvider(ABC):
             model: Model identifier (provider-specific).
             max_tokens: Maximum tokens in response.
             temperature: Sampling temperature.
+            deadline: Turn deadline; the request gives up when it passes.
         
         Returns:
             LLMResponse with content and/or tool calls.
         """
         pass
     
+    async def chat_stream(
+        self,
+        messages: list[dict[str, Any]],
+        tools: list[dict[str, Any]] | None = None,
+        model: str | None = None,
+        max_tokens: int = 16384,
+        temperature: float = 0.7,
+        deadline: Deadline | None = None,
+    ) -> AsyncIterator[LLMStreamEvent]:
+        """
+        Send a chat completion request and stream the reply.
+        
+        Providers without native streaming fall back to a single delta
+        carrying the whole content.
+        
+        Args:
+            Same as chat().
+        
+        Yields:
+            LLMStreamEvent deltas, then one final event with the response.
+        """
+        response = await self.chat(
+            messages=messages,
+            tools=tools,
+            model=model,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            deadline=deadline,
+        )
+        if response.content and response.finish_reason != "error":
+            yield LLMStreamEvent(delta=response.content)
+        yield LLMStreamEvent(response=response)
+    
     @abstractmethod
     def get_default_model(self) -> str:
         """Get the default model for this provider."""
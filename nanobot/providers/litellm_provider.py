@@ -1,12 +1,17 @@
 """LiteLLM provider implementation for multi-provider support."""
 
+import asyncio
+import json
 import os
-from typing import Any
+from typing import Any, AsyncIterator
 
 import litellm
 from litellm import acompletion
 
-from nanobot.providers.base import LLMProvider, LLMResponse, ToolCallRequest
+from nanobot.providers.base import LLMProvider, LLMResponse, LLMStreamEvent, ToolCallRequest
+from nanobot.utils.deadline import Deadline
+
+TIMEOUT_ERROR = "Error calling LLM: timed out, the time for this turn is up"
 
 
 class LiteLLMProvider(LLMProvider):
@@ -73,6 +78,7 @@ class LiteLLMProvider(LLMProvider):
         model: str | None = None,
         max_tokens: int = 16384,
         temperature: float = 0.7,
+        deadline: Deadline | None = None,
     ) -> LLMResponse:
         """
         Send a chat completion request via LiteLLM.
@@ -83,10 +89,136 @@ class LiteLLMProvider(LLMProvider):
             model: Model identifier (e.g., 'anthropic/claude-sonnet-4-5').
             max_tokens: Maximum tokens in response.
             temperature: Sampling temperature.
+            deadline: Turn deadline; the request gives up when it passes.
         
         Returns:
             LLMResponse with content and/or tool calls.
         """
+        kwargs = self._build_kwargs(messages, tools, model, max_tokens, temperature, deadline)
+        
+        try:
+            response = await asyncio.wait_for(acompletion(**kwargs), kwargs.get("timeout"))
+            return self._parse_response(response)
+        except asyncio.TimeoutError:
+            return LLMResponse(content=TIMEOUT_ERROR, finish_reason="error")
+        except Exception as e:
+            # Return error as content for graceful handling
+            return LLMResponse(
+                content=f"Error calling LLM: {str(e)}",
+                finish_reason="error",
+            )
+    
+    async def chat_stream(
+        self,
+        messages: list[dict[str, Any]],
+        tools: list[dict[str, Any]] | None = None,
+        model: str | None = None,
+        max_tokens: int = 16384,
+        temperature: float = 0.7,
+        deadline: Deadline | None = None,
+    ) -> AsyncIterator[LLMStreamEvent]:
+        """
+        Stream a chat completion via LiteLLM (stream=True).
+        
+        Text deltas are yielded as they arrive; tool call fragments are
+        assembled by index and returned in the final event.
+        """
+        kwargs = self._build_kwargs(messages, tools, model, max_tokens, temperature, deadline)
+        kwargs["stream"] = True
+        kwargs["stream_options"] = {"include_usage": True}
+        
+        content_parts: list[str] = []
+        tool_parts: dict[int, dict[str, str]] = {}
+        finish_reason = "stop"
+        usage: dict[str, int] = {}
+        
+        try:
+            stream = await asyncio.wait_for(acompletion(**kwargs), kwargs.get("timeout"))
+            chunks = stream.__aiter__()
+            while True:
+                # Bound each wait, not the whole loop: the consumer's time
+                # between chunks must not be interrupted
+                try:
+                    chunk = await asyncio.wait_for(
+                        chunks.__anext__(), deadline.remaining() if deadline else None
+                    )
+                except StopAsyncIteration:
+                    break
+                if getattr(chunk, "usage", None):
+                    usage = self._parse_usage(chunk.usage)
+                if not chunk.choices:
+                    continue
+                choice = chunk.choices[0]
+                delta = choice.delta
+                
+                if delta and delta.content:
+                    content_parts.append(delta.content)
+                    yield LLMStreamEvent(delta=delta.content)
+                
+                for tc in (getattr(delta, "tool_calls", None) or []):
+                    index = tc.index if tc.index is not None else len(tool_parts)
+                    part = tool_parts.setdefault(index, {"id": "", "name": "", "arguments": ""})
+                    if tc.id:
+                        part["id"] = tc.id
+                    if tc.function:
+                        if tc.function.name:
+                            part["name"] = tc.function.name
+                        if tc.function.arguments:
+                            part["arguments"] += tc.function.arguments
+                
+                if choice.finish_reason:
+                    finish_reason = choice.finish_reason
+        except asyncio.TimeoutError:
+            yield LLMStreamEvent(response=LLMResponse(content=TIMEOUT_ERROR, finish_reason="error"))
+            return
+        except Exception as e:
+            yield LLMStreamEvent(response=LLMResponse(
+                content=f"Error calling LLM: {str(e)}",
+                finish_reason="error",
+            ))
+            return
+        
+        content = "".join(content_parts)
+        if not usage:
+            # Some providers ignore include_usage; estimate so credits are still tracked
+            try:
+                prompt_tokens = litellm.token_counter(model=kwargs["model"], messages=messages)
+                completion_tokens = litellm.token_counter(model=kwargs["model"], text=content)
+                usage = {
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": completion_tokens,
+                    "total_tokens": prompt_tokens + completion_tokens,
+                }
+            except Exception:
+                pass
+        
+        tool_calls = [
+            ToolCallRequest(
+                id=part["id"],
+                name=part["name"],
+                arguments=self._parse_arguments(part["arguments"]),
+            )
+            for _, part in sorted(tool_parts.items())
+            if part["name"]
+        ]
+        
+        yield LLMStreamEvent(response=LLMResponse(
+            content=content or None,
+            tool_calls=tool_calls,
+            finish_reason=finish_reason,
+            usage=usage,
+        ))
+    
+    def _build_kwargs(
+        self,
+        messages: list[dict[str, Any]],
+        tools: list[dict[str, Any]] | None,
+        model: str | None,
+        max_tokens: int,
+        temperature: float,
+        deadline: Deadline | None = None,
+    ) -> dict[str, Any]:
+        """Normalize the model name and build acompletion() arguments."""
         model = model or self.default_model
         
         # Normalize model names
@@ -132,7 +264,7 @@ class LiteLLMProvider(LLMProvider):
 
         kwargs: dict[str, Any] = {
             "model": model,
-            "messages": messages,
+            "messages": self._prepare_messages(messages, model),
             "max_tokens": max_tokens,
             "temperature": temperature,
         }
@@ -150,15 +282,87 @@ class LiteLLMProvider(LLMProvider):
             kwargs["tools"] = tools
             kwargs["tool_choice"] = "auto"
         
-        try:
-            response = await acompletion(**kwargs)
-            return self._parse_response(response)
-        except Exception as e:
-            # Return error as content for graceful handling
-            return LLMResponse(
-                content=f"Error calling LLM: {str(e)}",
-                finish_reason="error",
-            )
+        # Request timeout: whatever is left of the turn
+        if deadline is not None and deadline.remaining() is not None:
+            kwargs["timeout"] = deadline.remaining()
+        
+        return kwargs
+    
+    @staticmethod
+    def _supports_cache_control(model: str) -> bool:
+        """Whether the model takes explicit prompt cache breakpoints (Anthropic Claude)."""
+        model_low = model.lower()
+        return model_low.startswith("anthropic/") or "claude" in model_low
+    
+    def _prepare_messages(self, messages: list[dict[str, Any]], model: str) -> list[dict[str, Any]]:
+        """
+        Adapt system prompt blocks to the provider.
+        
+        For Claude, the stable system blocks and the last message get
+        cache_control breakpoints, so the prefix (and, in a tool loop, all
+        earlier iterations) is read from cache. Other providers get the system
+        blocks joined into one string; their automatic prefix caching works
+        because the volatile block comes last.
+        """
+        if not messages:
+            return messages
+        cache = self._supports_cache_control(model)
+        breakpoint = {"type": "ephemeral"}
+        prepared = []
+        for msg in messages:
+            content = msg.get("content")
+            if msg.get("role") == "system" and isinstance(content, list):
+                if cache:
+                    # Breakpoints after each block except the volatile last one
+                    content = [
+                        {**block, "cache_control": breakpoint} if i < len(content) - 1 else block
+                        for i, block in enumerate(content)
+                    ]
+                else:
+                    content = "\n\n---\n\n".join(block.get("text", "") for block in content)
+                msg = {**msg, "content": content}
+            prepared.append(msg)
+        
+        last = prepared[-1]
+        if cache and last.get("role") in ("user", "tool"):
+            content = last.get("content")
+            if isinstance(content, str) and content:
+                content = [{"type": "text", "text": content, "cache_control": breakpoint}]
+            elif isinstance(content, list) and content:
+                content = content[:-1] + [{**content[-1], "cache_control": breakpoint}]
+            prepared[-1] = {**last, "content": content}
+        return prepared
+    
+    @staticmethod
+    def _parse_arguments(args: Any) -> dict[str, Any]:
+        """Parse tool call arguments from a JSON string if needed."""
+        if isinstance(args, str):
+            if not args:
+                return {}
+            try:
+                args = json.loads(args)
+            except json.JSONDecodeError:
+                args = {"raw": args}
+        return args
+    
+    @staticmethod
+    def _parse_usage(usage: Any) -> dict[str, int]:
+        """Extract token counts, including prompt cache reads/writes, from a LiteLLM usage object."""
+        result = {
+            "prompt_tokens": usage.prompt_tokens,
+            "completion_tokens": usage.completion_tokens,
+            "total_tokens": usage.total_tokens,
+        }
+        # OpenAI-style details, with Anthropic's own field as fallback
+        details = getattr(usage, "prompt_tokens_details", None)
+        cached = getattr(details, "cached_tokens", None) if details else None
+        cached = cached or getattr(usage, "cache_read_input_tokens", None)
+        if cached:
+            result["cached_tokens"] = cached
+        created = getattr(usage, "cache_creation_input_tokens", None)
+        if created:
+            result["cache_creation_tokens"] = created
+        return result
     
     def _parse_response(self, response: Any) -> LLMResponse:
         """Parse LiteLLM response into our standard format."""
@@ -168,28 +372,15 @@ class LiteLLMProvider(LLMProvider):
         tool_calls = []
         if hasattr(message, "tool_calls") and message.tool_calls:
             for tc in message.tool_calls:
-                # Parse arguments from JSON string if needed
-                args = tc.function.arguments
-                if isinstance(args, str):
-                    import json
-                    try:
-                        args = json.loads(args)
-                    except json.JSONDecodeError:
-                        args = {"raw": args}
-                
                 tool_calls.append(ToolCallRequest(
                     id=tc.id,
                     name=tc.function.name,
-                    arguments=args,
+                    arguments=self._parse_arguments(tc.function.arguments),
                 ))
         
         usage = {}
         if hasattr(response, "usage") and response.usage:
-            usage = {
-                "prompt_tokens": response.usage.prompt_tokens,
-                "completion_tokens": response.usage.completion_tokens,
-                "total_tokens": response.usage.total_tokens,
-            }
+            usage = self._parse_usage(response.usage)
         
         return LLMResponse(
             content=message.content,
@@ -0,0 +1,168 @@
+"""Disk cache of LLM responses for repeated internal turns."""
+
+import hashlib
+import json
+import re
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+from loguru import logger
+
+from nanobot.providers.base import LLMResponse, ToolCallRequest
+
+# The clock line of the system prompt changes every minute, so scheduled
+# runs would never share a key; the TTL bounds how stale a reply can get
+_CLOCK_RE = re.compile(r"## Current Time\n[^\n]*")
+
+
+def _text(content: Any) -> str:
+    """Flatten message content (string or content blocks) to text."""
+    if isinstance(content, list):
+        return "\n".join(
+            part.get("text", "") if part.get("type") == "text" else json.dumps(part, sort_keys=True)
+            for part in content
+        )
+    return content or ""
+
+
+def _turn_messages(messages: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """System messages plus the current turn (from the last user message on)."""
+    start = max((i for i, m in enumerate(messages) if m.get("role") == "user"), default=0)
+    return [m for m in messages[:start] if m.get("role") == "system"] + messages[start:]
+
+
+def _tool_names(messages: list[dict[str, Any]]) -> list[str]:
+    """Names of the tools called in a transcript."""
+    return [
+        tc.get("function", {}).get("name", "")
+        for m in messages
+        for tc in m.get("tool_calls") or []
+    ]
+
+
+class ResponseCache:
+    """
+    LRU/TTL disk cache of LLM responses, keyed by prompt.
+
+    Meant for internal turns (cron jobs, heartbeat) that send the same
+    prompt again and again. The key hashes the model, the tool schema, the
+    system prompt without its clock line, and the current turn's messages;
+    the session history before the turn (a log of earlier runs) is left
+    out. A reply to a time-dependent prompt ("what is due now?") can thus
+    be reused for up to ttl_s; keep the TTL below the schedule's
+    granularity for such jobs. Tool calls still execute for real: a cached
+    response asking for read_file is followed by an actual read, and the
+    next call is only a hit if the file content is unchanged.
+
+    Transcripts that involve a tool with side effects are never cached or
+    served from cache. get() and put() do file I/O; call them off the
+    event loop.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Path,
+        is_pure_tool: Callable[[str], bool],
+        ttl_s: float = 3600.0,
+        max_entries: int = 500,
+    ):
+        """
+        Args:
+            cache_dir: Directory of cache entries (one JSON file each).
+            is_pure_tool: Whether a tool is free of side effects.
+            ttl_s: Entries older than this are ignored and removed.
+            max_entries: Least recently used entries beyond this are removed
+                (checked every max_entries/10 writes).
+        """
+        self.cache_dir = cache_dir
+        self.is_pure_tool = is_pure_tool
+        self.ttl_s = ttl_s
+        self.max_entries = max_entries
+        # Listing the directory is the costly part of eviction; do it only
+        # every tenth of max_entries writes
+        self._evict_every = max(1, max_entries // 10)
+        self._puts = 0
+        self.stats = {"hits": 0, "misses": 0, "bypassed": 0, "stored": 0}
+
+    def key(self, messages: list[dict[str, Any]], tools: list[dict[str, Any]] | None, model: str) -> str | None:
+        """
+        Cache key of an LLM call, or None if the call must not be cached.
+        """
+        turn = _turn_messages(messages)
+        if not all(self.is_pure_tool(name) for name in _tool_names(turn)):
+            return None
+        normalized = [
+            {
+                "role": m.get("role"),
+                "content": _CLOCK_RE.sub("", _text(m.get("content"))),
+                "tool_calls": [
+                    [tc.get("function", {}).get("name"), tc.get("function", {}).get("arguments")]
+                    for tc in m.get("tool_calls") or []
+                ],
+                "name": m.get("name"),
+            }
+            for m in turn
+        ]
+        payload = json.dumps([model, tools or [], normalized], sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str | None) -> LLMResponse | None:
+        """Cached response for a key, if present and fresh."""
+        if key is None:
+            self.stats["bypassed"] += 1
+            return None
+        path = self.cache_dir / f"{key}.json"
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            self.stats["misses"] += 1
+            return None
+        if time.time() - data.get("created_at", 0) > self.ttl_s:
+            path.unlink(missing_ok=True)
+            self.stats["misses"] += 1
+            return None
+
+        path.touch()  # mtime is the LRU order
+        self.stats["hits"] += 1
+        return LLMResponse(
+            content=data.get("content"),
+            tool_calls=[ToolCallRequest(**tc) for tc in data.get("tool_calls", [])],
+            finish_reason=data.get("finish_reason", "stop"),
+            usage={},  # Served from cache: no tokens used
+        )
+
+    def put(self, key: str | None, response: LLMResponse) -> None:
+        """Store a response, unless it failed or calls a tool with side effects."""
+        if key is None or response.finish_reason == "error":
+            return
+        if not all(self.is_pure_tool(tc.name) for tc in response.tool_calls):
+            return
+        data = {
+            "created_at": time.time(),
+            "content": response.content,
+            "tool_calls": [
+                {"id": tc.id, "name": tc.name, "arguments": tc.arguments} for tc in response.tool_calls
+            ],
+            "finish_reason": response.finish_reason,
+        }
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            tmp = self.cache_dir / f"{key}.tmp"
+            tmp.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+            tmp.replace(self.cache_dir / f"{key}.json")
+            self.stats["stored"] += 1
+            self._puts += 1
+            if self._puts % self._evict_every == 0:
+                self._evict()
+        except OSError as e:
+            logger.warning(f"Could not write LLM response cache entry: {e}")
+
+    def _evict(self) -> None:
+        """Remove least recently used entries beyond max_entries."""
+        entries = list(self.cache_dir.glob("*.json"))
+        if len(entries) <= self.max_entries:
+            return
+        entries.sort(key=lambda p: p.stat().st_mtime)
+        for path in entries[:len(entries) - self.max_entries]:
+            path.unlink(missing_ok=True)
@@ -1,5 +1,16 @@
 """Session management module."""
 
 from nanobot.session.manager import SessionManager, Session
+from nanobot.session.policy import SessionClasses, SessionPolicy
+from nanobot.session.store import SessionStore, JsonlSessionStore, SqliteSessionStore, migrate_sessions
 
-__all__ = ["SessionManager", "Session"]
+__all__ = [
+    "SessionManager",
+    "Session",
+    "SessionClasses",
+    "SessionPolicy",
+    "SessionStore",
+    "JsonlSessionStore",
+    "SqliteSessionStore",
+    "migrate_sessions",
+]
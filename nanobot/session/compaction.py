@@ -0,0 +1,158 @@
+"""Rolling summaries of the older part of long sessions."""
+
+from typing import Any, Callable
+
+from loguru import logger
+
+from nanobot.agent.tokens import estimate_message_tokens
+from nanobot.providers.base import LLMProvider
+from nanobot.session.manager import Session
+
+SUMMARY_PROMPT = """You keep the long-term memory of a chat between a user and an AI assistant.
+Update the summary below with the new messages. Keep facts about the user, their preferences,
+decisions made, open tasks and questions, and results the assistant found (names, numbers,
+links, file paths). Drop small talk and anything later messages made obsolete.
+Write in the third person, as short bullet points, at most {max_words} words.
+Reply with the updated summary only."""
+
+
+def _transcript(messages: list[dict[str, Any]], max_chars: int) -> str:
+    """Render messages as a plain transcript, each cut to max_chars."""
+    lines = []
+    for m in messages:
+        content = m.get("content") or ""
+        if not isinstance(content, str):
+            content = " ".join(p.get("text", "") for p in content if p.get("type") == "text")
+        if len(content) > max_chars:
+            content = content[:max_chars] + " …"
+        lines.append(f"{m.get('role', 'user')}: {content}")
+    return "\n\n".join(lines)
+
+
+class SessionCompactor:
+    """
+    Folds the older messages of a session into a rolling summary.
+
+    Once more than after_messages messages (or after_tokens tokens) are
+    not yet summarized, everything but the keep_messages most recent ones
+    is summarized together with the previous summary, usually by a cheap
+    model. Session.get_history then leaves the summarized messages out and
+    the context builder puts the summary ahead of the recent ones, so the
+    prompt stays the same size however long the chat gets. The messages
+    themselves stay in the session store.
+    """
+
+    def __init__(
+        self,
+        provider: LLMProvider,
+        model: str | None = None,
+        after_messages: int = 60,
+        after_tokens: int = 0,
+        keep_messages: int = 20,
+        max_tokens: int = 1024,
+        max_message_chars: int = 2000,
+        on_usage: Callable[[dict[str, int], str], None] | None = None,
+    ):
+        """
+        Args:
+            provider: LLM provider for the summary calls.
+            model: Model for summaries (default: the provider's default).
+            after_messages: Summarize once this many messages are unsummarized (0 = no limit).
+            after_tokens: ...or once they add up to this many tokens (0 = no limit).
+            keep_messages: Most recent messages always kept verbatim.
+            max_tokens: Length limit of a summary.
+            max_message_chars: Each message is cut to this length for the summary call.
+            on_usage: Called with the token usage and model of every summary call.
+        """
+        self.provider = provider
+        self.model = model or provider.get_default_model()
+        self.after_messages = after_messages
+        self.after_tokens = after_tokens
+        self.keep_messages = max(1, keep_messages)
+        self.max_tokens = max_tokens
+        self.max_message_chars = max_message_chars
+        self.on_usage = on_usage
+        self.stats = {"summaries": 0, "messages_summarized": 0, "failures": 0}
+
+    def _pending(self, session: Session) -> list[dict[str, Any]]:
+        """Unsummarized messages held in memory."""
+        return session.messages[max(0, session.summarized_through - session.offset):]
+
+    def due(self, session: Session) -> bool:
+        """Whether the unsummarized part of a session is over a threshold."""
+        pending = self._pending(session)
+        if len(pending) <= self.keep_messages:
+            return False
+        if self.after_messages and len(pending) > self.after_messages:
+            return True
+        if self.after_tokens and sum(estimate_message_tokens(m) for m in pending) > self.after_tokens:
+            return True
+        return False
+
+    async def compact(self, session: Session) -> bool:
+        """
+        Summarize all but the most recent messages of a session.
+
+        Args:
+            session: The session; its summary is updated in place.
+
+        Returns:
+            True if the summary was updated.
+        """
+        result = await self.summarize(session)
+        return result is not None and self.apply(session, *result)
+
+    async def summarize(self, session: Session) -> tuple[str, int] | None:
+        """
+        Write the new summary of a session without changing it.
+
+        Returns:
+            (summary, number of leading messages it covers), or None if
+            there was nothing to summarize or the call failed.
+        """
+        pending = self._pending(session)
+        span = pending[:-self.keep_messages]
+        if not span:
+            return None
+        through = session.message_count - len(pending) + len(span)
+
+        previous = session.summary or "(empty)"
+        response = await self.provider.chat(
+            messages=[
+                {"role": "system", "content": SUMMARY_PROMPT.format(max_words=self.max_tokens * 2 // 3)},
+                {"role": "user", "content": (
+                    f"## Summary so far\n\n{previous}\n\n"
+                    f"## New messages\n\n{_transcript(span, self.max_message_chars)}"
+                )},
+            ],
+            model=self.model,
+            max_tokens=self.max_tokens,
+            temperature=0.2,
+        )
+        if self.on_usage:
+            self.on_usage(response.usage, self.model)
+        text = (response.content or "").strip()
+        if response.finish_reason == "error" or not text:
+            self.stats["failures"] += 1
+            logger.warning(f"Could not summarize session {session.key}: {text[:200]}")
+            return None
+        return text, through
+
+    def apply(self, session: Session, text: str, through: int) -> bool:
+        """
+        Set a summary from summarize() on a session.
+
+        The session may be a newer copy than the one summarized (it can be
+        evicted from and reloaded into the cache meanwhile).
+
+        Returns:
+            False if the session was cleared or summarized further meanwhile.
+        """
+        if session.message_count < through or session.summarized_through >= through:
+            return False
+        summarized = through - session.summarized_through
+        session.set_summary(text, through)
+        self.stats["summaries"] += 1
+        self.stats["messages_summarized"] += summarized
+        logger.info(f"Summarized {summarized} older messages of session {session.key}")
+        return True
@@ -1,14 +1,17 @@
 """Session management for conversation history."""
 
-import json
+import dataclasses
+import time
+from collections import OrderedDict
 from pathlib import Path
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 from loguru import logger
 
-from nanobot.utils.helpers import ensure_dir, safe_filename
+if TYPE_CHECKING:
+    from nanobot.session.store import ArchiveReport, SessionStore
 
 
 @dataclass
@@ -17,6 +20,8 @@ class Session:
     A conversation session.
     
     Stores messages in JSONL format for easy reading and persistence.
+    Only a tail window of the messages is kept in memory; offset counts
+    the older ones that stay on disk.
     """
     
     key: str  # channel:chat_id
@@ -24,6 +29,12 @@ class Session:
     created_at: datetime = field(default_factory=datetime.now)
     updated_at: datetime = field(default_factory=datetime.now)
     metadata: dict[str, Any] = field(default_factory=dict)
+    offset: int = 0  # Messages before messages[0], on disk only
+    # Persistence bookkeeping: messages already stored (or queued to be),
+    # and whether the next save must replace what is stored (messages
+    # were removed)
+    _persisted: int = field(default=0, repr=False, compare=False)
+    _rewrite: bool = field(default=False, repr=False, compare=False)
     
     def add_message(self, role: str, content: str, **kwargs: Any) -> None:
         """Add a message to the session."""
@@ -46,34 +57,124 @@ class Session:
         Returns:
             List of messages in LLM format.
         """
-        # Get recent messages
-        recent = self.messages[-max_messages:] if len(self.messages) > max_messages else self.messages
+        # Get recent messages, leaving out those the summary covers
+        unsummarized = self.messages[max(0, self.summarized_through - self.offset):]
+        recent = unsummarized[-max_messages:] if len(unsummarized) > max_messages else unsummarized
         
-        # Convert to LLM format (just role and content)
-        return [{"role": m["role"], "content": m["content"]} for m in recent]
+        # Convert to LLM format (role and content, plus any tool digest)
+        return [
+            {"role": m["role"], "content": m["content"], **({"tools": m["tools"]} if m.get("tools") else {})}
+            for m in recent
+        ]
+    
+    @property
+    def message_count(self) -> int:
+        """Number of messages, including those only on disk."""
+        return self.offset + len(self.messages)
+    
+    @property
+    def summary(self) -> str:
+        """Rolling summary of the messages before summarized_through."""
+        return self.metadata.get("summary", {}).get("text", "")
+    
+    @property
+    def summarized_through(self) -> int:
+        """Number of leading messages the summary covers."""
+        return self.metadata.get("summary", {}).get("through", 0)
+    
+    def set_summary(self, text: str, through: int) -> None:
+        """Replace the rolling summary, which now covers the first `through` messages."""
+        self.metadata["summary"] = {"text": text, "through": through}
+    
+    def keep_last(self, n: int) -> None:
+        """Drop all but the last n messages, here and in storage."""
+        if self.message_count <= n:
+            return
+        self.messages = self.messages[-n:]
+        self.metadata.pop("summary", None)
+        self.offset = 0
+        self._rewrite = True
     
     def clear(self) -> None:
         """Clear all messages in the session."""
         self.messages = []
+        self.metadata.pop("summary", None)
+        self.offset = 0
         self.updated_at = datetime.now()
+        self._rewrite = True
+
+
+def _estimate_size(session: Session) -> int:
+    """Rough in-memory size of a session's messages, in bytes."""
+    return sum(len(str(m.get("content") or "")) + 200 for m in session.messages)
 
 
 class SessionManager:
     """
     Manages conversation sessions.
     
-    Sessions are stored as JSONL files in the sessions directory.
+    Sessions are persisted by a SessionStore: JSONL files in the sessions
+    directory by default (see nanobot.session.store), or SQLite.
+    
+    Loaded sessions are cached, least recently used first out once there
+    are more than max_cached of them or they hold more than
+    max_cached_bytes, and after idle_ttl_s without use. Evicted sessions
+    are reloaded from the store on their next use. Sessions with unsaved
+    messages or queued writes are never evicted, so a session is only
+    loaded from the store once everything saved of it is written.
+    
+    With write_behind_s set, save() only queues a snapshot of the session
+    and a background thread writes it (see nanobot.session.persister);
+    call flush() or close() before exiting.
     """
     
-    def __init__(self, workspace: Path):
+    def __init__(
+        self,
+        workspace: Path,
+        store: "SessionStore | None" = None,
+        tail_messages: int = 200,
+        max_cached: int = 256,
+        max_cached_bytes: int = 64 * 1024 * 1024,
+        idle_ttl_s: float = 3600.0,
+        write_behind_s: float = 0.0,
+        fsync: bool = False,
+    ):
+        """
+        Args:
+            workspace: Workspace whose sessions/ directory holds the sessions.
+            store: Storage backend (default: JSONL files in sessions/).
+            tail_messages: Most recent messages of a session kept in memory.
+            max_cached: Most sessions kept in memory (0 = unlimited).
+            max_cached_bytes: Approximate memory budget of cached sessions (0 = unlimited).
+            idle_ttl_s: Sessions unused this long are dropped from memory (0 = never).
+            write_behind_s: Save on a background thread, coalescing saves within
+                this window (0 = save synchronously).
+            fsync: With write-behind, sync each batch of writes to disk.
+        """
+        from nanobot.session.persister import SessionPersister
+        from nanobot.session.store import JsonlSessionStore
         self.workspace = workspace
-        self.sessions_dir = ensure_dir(workspace / "sessions")
-        self._cache: dict[str, Session] = {}
+        self.sessions_dir = workspace / "sessions"
+        self.store = store or JsonlSessionStore(self.sessions_dir)
+        self.tail_messages = max(1, tail_messages)
+        self.max_cached = max_cached
+        self.max_cached_bytes = max_cached_bytes
+        self.idle_ttl_s = idle_ttl_s
+        self._cache: OrderedDict[str, Session] = OrderedDict()
+        self._last_used: dict[str, float] = {}
+        self._sizes: dict[str, int] = {}
+        self.cache_stats = {"cache_hits": 0, "cache_misses": 0, "evictions": 0}
+        self.persister = SessionPersister(
+            self.store, delay_s=write_behind_s, fsync=fsync
+        ) if write_behind_s > 0 else None
     
-    def _get_session_path(self, key: str) -> Path:
-        """Get the file path for a session."""
-        safe_key = safe_filename(key.replace(":", "_"))
-        return self.sessions_dir / f"{safe_key}.jsonl"
+    @property
+    def stats(self) -> dict[str, Any]:
+        """Cache, store and write-behind counters."""
+        stats: dict[str, Any] = {**self.cache_stats, **self.store.stats}
+        if self.persister:
+            stats.update(self.persister.stats, queue_depth=self.persister.queue_depth)
+        return stats
     
     def get_or_create(self, key: str) -> Session:
         """
@@ -86,72 +187,79 @@ class SessionManager:
             The session.
         """
         # Check cache
-        if key in self._cache:
-            return self._cache[key]
+        session = self._cache.get(key)
+        if session is not None:
+            self.cache_stats["cache_hits"] += 1
+            self._remember(session)
+            return session
         
-        # Try to load from disk
-        session = self._load(key)
+        # Try to load from the store
+        self.cache_stats["cache_misses"] += 1
+        session = self.store.load(key, tail=self.tail_messages)
         if session is None:
             session = Session(key=key)
         
-        self._cache[key] = session
+        self._remember(session)
+        self._evict(keep=key)
         return session
     
-    def _load(self, key: str) -> Session | None:
-        """Load a session from disk."""
-        path = self._get_session_path(key)
-        
-        if not path.exists():
-            return None
+    def _remember(self, session: Session) -> None:
+        """Put a session in the cache as the most recently used one."""
+        self._cache[session.key] = session
+        self._cache.move_to_end(session.key)
+        self._last_used[session.key] = time.monotonic()
+        self._sizes[session.key] = _estimate_size(session)
+    
+    def _evict(self, keep: str | None = None) -> None:
+        """
+        Drop idle and least recently used sessions beyond the cache limits.
         
-        try:
-            messages = []
-            metadata = {}
-            created_at = None
-            
-            with open(path) as f:
-                for line in f:
-                    line = line.strip()
-                    if not line:
-                        continue
-                    
-                    data = json.loads(line)
-                    
-                    if data.get("_type") == "metadata":
-                        metadata = data.get("metadata", {})
-                        created_at = datetime.fromisoformat(data["created_at"]) if data.get("created_at") else None
-                    else:
-                        messages.append(data)
-            
-            return Session(
-                key=key,
-                messages=messages,
-                created_at=created_at or datetime.now(),
-                metadata=metadata
-            )
-        except Exception as e:
-            logger.warning(f"Failed to load session {key}: {e}")
-            return None
+        Args:
+            keep: Key of the session just used; it stays even if the others
+                cannot be dropped, so callers hold the cached object.
+        """
+        now = time.monotonic()
+        total = sum(self._sizes.values())
+        for key in list(self._cache):
+            if key == keep:
+                continue
+            session = self._cache[key]
+            if session._persisted < len(session.messages) or session._rewrite:
+                continue  # Unsaved messages: keep until the next save
+            idle = self.idle_ttl_s > 0 and now - self._last_used.get(key, now) > self.idle_ttl_s
+            too_many = self.max_cached > 0 and len(self._cache) > self.max_cached
+            too_big = self.max_cached_bytes > 0 and total > self.max_cached_bytes
+            if not (idle or too_many or too_big):
+                continue
+            if self.persister and self.persister.is_pending(key):
+                continue  # Queued writes: keep until they are written
+            total -= self._sizes.pop(key, 0)
+            self._cache.pop(key)
+            self._last_used.pop(key, None)
+            self.cache_stats["evictions"] += 1
     
     def save(self, session: Session) -> None:
-        """Save a session to disk."""
-        path = self._get_session_path(session.key)
-        
-        with open(path, "w") as f:
-            # Write metadata first
-            metadata_line = {
-                "_type": "metadata",
-                "created_at": session.created_at.isoformat(),
-                "updated_at": session.updated_at.isoformat(),
-                "metadata": session.metadata
-            }
-            f.write(json.dumps(metadata_line) + "\n")
-            
-            # Write messages
-            for msg in session.messages:
-                f.write(json.dumps(msg) + "\n")
+        """Persist the messages added since the last save."""
+        if self.persister:
+            self.persister.submit(dataclasses.replace(
+                session, messages=list(session.messages), metadata=dict(session.metadata)
+            ))
+        else:
+            self.store.save(session)
+        session._persisted = len(session.messages)
+        session._rewrite = False
+        self._trim(session)
         
-        self._cache[session.key] = session
+        self._remember(session)
+        self._evict(keep=session.key)
+    
+    def _trim(self, session: Session) -> None:
+        """Drop saved messages beyond the tail window from memory."""
+        drop = min(len(session.messages) - self.tail_messages, session._persisted)
+        if drop > 0:
+            del session.messages[:drop]
+            session.offset += drop
+            session._persisted -= drop
     
     def delete(self, key: str) -> bool:
         """
@@ -165,38 +273,48 @@ class SessionManager:
         """
         # Remove from cache
         self._cache.pop(key, None)
+        self._last_used.pop(key, None)
+        self._sizes.pop(key, None)
         
-        # Remove file
-        path = self._get_session_path(key)
-        if path.exists():
-            path.unlink()
-            return True
-        return False
+        if self.persister:
+            self.persister.discard(key)
+        return self.store.delete(key)
     
     def list_sessions(self) -> list[dict[str, Any]]:
         """
         List all sessions.
         
         Returns:
-            List of session info dicts.
+            List of session info dicts, most recently updated first.
         """
-        sessions = []
+        self.flush()
+        return self.store.list_sessions()
+    
+    def archive(self, idle_s: float) -> "ArchiveReport":
+        """
+        Compress sessions idle for idle_s seconds (see SessionStore.archive).
         
-        for path in self.sessions_dir.glob("*.jsonl"):
-            try:
-                # Read just the metadata line
-                with open(path) as f:
-                    first_line = f.readline().strip()
-                    if first_line:
-                        data = json.loads(first_line)
-                        if data.get("_type") == "metadata":
-                            sessions.append({
-                                "key": path.stem.replace("_", ":"),
-                                "created_at": data.get("created_at"),
-                                "updated_at": data.get("updated_at"),
-                                "path": str(path)
-                            })
-            except Exception:
-                continue
+        Archived sessions are restored when they are next used.
         
-        return sorted(sessions, key=lambda x: x.get("updated_at", ""), reverse=True)
+        Raises:
+            NotImplementedError: The store does not archive.
+        """
+        self.flush()
+        report = self.store.archive(idle_s)
+        if report.sessions:
+            logger.info(
+                f"Archived {report.sessions} idle session(s), "
+                f"{report.bytes_before} -> {report.bytes_after} bytes"
+            )
+        return report
+    
+    def flush(self) -> None:
+        """Wait until queued saves are written."""
+        if self.persister:
+            self.persister.flush()
+    
+    def close(self) -> None:
+        """Write queued saves and close the store."""
+        if self.persister:
+            self.persister.close()
+        self.store.close()
@@ -0,0 +1,196 @@
+"""Write-behind persistence of sessions on a background thread."""
+
+import dataclasses
+import threading
+import time
+
+from loguru import logger
+
+from nanobot.session.manager import Session
+from nanobot.session.store import SessionStore
+
+
+def _coalesce(older: Session, newer: Session) -> Session:
+    """
+    Merge two pending snapshots of a session into one save.
+
+    The result writes everything older would have written plus what newer
+    adds. Messages newer already dropped from its window (they were queued
+    with older) are taken from older.
+    """
+    if newer._rewrite:
+        return newer
+    start = older.offset if older._rewrite else older.offset + older._persisted
+    if newer.offset <= start:
+        messages, offset, persisted = newer.messages, newer.offset, start - newer.offset
+    else:
+        messages = older.messages[start - older.offset:newer.offset - older.offset] + newer.messages
+        offset, persisted = start, 0
+    return dataclasses.replace(
+        newer, messages=messages, offset=offset, _persisted=persisted, _rewrite=older._rewrite
+    )
+
+
+class SessionPersister:
+    """
+    Saves sessions on a background thread instead of the event loop.
+
+    Saves of the same session within delay_s of its first pending save are
+    coalesced into one write. Each batch of writes is optionally followed
+    by one fsync of everything it wrote (group commit). A snapshot that
+    fails to save is queued again, merged with any newer one, and retried
+    with exponential backoff. flush() waits until all pending saves are
+    written; call it (or close()) on shutdown.
+    """
+
+    MAX_RETRY_S = 60.0
+
+    def __init__(self, store: SessionStore, delay_s: float = 0.5, fsync: bool = False):
+        """
+        Args:
+            store: Store the snapshots are written to.
+            delay_s: How long a save may wait for more saves of the same session.
+            fsync: Sync each batch to stable storage after writing it.
+        """
+        self.store = store
+        self.delay_s = delay_s
+        self.fsync = fsync
+        self._pending: dict[str, Session] = {}
+        self._since: float | None = None  # When the oldest pending save was queued
+        self._writing: set[str] = set()
+        self._discarded: set[str] = set()  # Deleted while being written
+        self._retry_s = 0.0  # Current backoff after failed saves
+        self._retry_at = 0.0
+        self._urgent = False
+        self._closed = False
+        self._cond = threading.Condition()
+        self.stats = {
+            "queued": 0, "coalesced": 0, "written": 0, "batches": 0, "errors": 0, "retries": 0,
+            "write_ms_avg": 0.0, "write_ms_max": 0.0,
+        }
+        self._thread = threading.Thread(target=self._run, name="session-persister", daemon=True)
+        self._thread.start()
+
+    @property
+    def queue_depth(self) -> int:
+        """Sessions waiting to be written."""
+        return len(self._pending)
+
+    def submit(self, snapshot: Session) -> None:
+        """Queue a snapshot of a session for writing."""
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Session persister is closed")
+            older = self._pending.get(snapshot.key)
+            if older is not None:
+                snapshot = _coalesce(older, snapshot)
+                self.stats["coalesced"] += 1
+            self._pending[snapshot.key] = snapshot
+            self.stats["queued"] += 1
+            if self._since is None:
+                self._since = time.monotonic()
+            self._cond.notify_all()
+
+    def is_pending(self, key: str) -> bool:
+        """Whether a session has writes queued or in progress."""
+        with self._cond:
+            return key in self._pending or key in self._writing
+
+    def discard(self, key: str) -> None:
+        """Drop the queued writes of a deleted session and wait for one in progress."""
+        with self._cond:
+            self._pending.pop(key, None)
+            if key in self._writing:
+                self._discarded.add(key)
+                self._cond.wait_for(lambda: key not in self._writing)
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """
+        Write all pending saves now and wait for them.
+
+        Returns:
+            False if the timeout passed first.
+        """
+        with self._cond:
+            self._urgent = True
+            self._cond.notify_all()
+            done = self._cond.wait_for(lambda: not self._pending and not self._writing, timeout)
+            self._urgent = False
+            return done
+
+    def close(self, timeout: float | None = 10.0) -> None:
+        """Flush and stop the writer thread."""
+        self.flush(timeout)
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join(timeout)
+
+    def _run(self) -> None:
+        """Writer thread: wait out the coalescing window, then write a batch."""
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending or self._closed)
+                if not self._pending:
+                    return  # Closed and nothing left
+                while not self._closed:
+                    until = self._retry_at if self._urgent else max(self._retry_at, self._since + self.delay_s)
+                    left = until - time.monotonic()
+                    if left <= 0:
+                        break
+                    self._cond.wait(left)
+                if not self._pending:
+                    continue  # Discarded while waiting
+                batch, self._pending, self._since = self._pending, {}, None
+                self._writing = set(batch)
+
+            failed: dict[str, Session] = {}
+            for snapshot in batch.values():
+                started = time.perf_counter()
+                try:
+                    self.store.save(snapshot)
+                except Exception as e:
+                    self.stats["errors"] += 1
+                    logger.error(f"Failed to save session {snapshot.key}: {e}")
+                    failed[snapshot.key] = snapshot
+                    continue
+                self._record_write((time.perf_counter() - started) * 1000)
+            if self.fsync:
+                try:
+                    self.store.sync(batch)
+                except Exception as e:
+                    self.stats["errors"] += 1
+                    logger.error(f"Failed to sync sessions: {e}")
+            self.stats["batches"] += 1
+
+            with self._cond:
+                self._requeue(failed)
+                self._writing = set()
+                self._discarded = set()
+                self._cond.notify_all()
+
+    def _requeue(self, failed: dict[str, Session]) -> None:
+        """Queue failed snapshots again, ahead of newer ones, and back off (lock held)."""
+        if not failed:
+            self._retry_s = 0.0
+            return
+        if self._closed:
+            logger.error(f"Giving up on saving {len(failed)} session(s) at shutdown")
+            return
+        for key, snapshot in failed.items():
+            if key in self._discarded:
+                continue
+            newer = self._pending.get(key)
+            self._pending[key] = _coalesce(snapshot, newer) if newer is not None else snapshot
+            self.stats["retries"] += 1
+        self._retry_s = min(max(self._retry_s * 2, 1.0), self.MAX_RETRY_S)
+        self._retry_at = time.monotonic() + self._retry_s
+        if self._since is None:
+            self._since = time.monotonic()
+
+    def _record_write(self, ms: float) -> None:
+        """Update the write latency metrics."""
+        written = self.stats["written"] + 1
+        self.stats["written"] = written
+        self.stats["write_ms_avg"] += (ms - self.stats["write_ms_avg"]) / written
+        self.stats["write_ms_max"] = max(self.stats["write_ms_max"], ms)
@@ -0,0 +1,56 @@
+"""Per-session history policies (session classes)."""
+
+from dataclasses import dataclass
+from fnmatch import fnmatchcase
+
+POLICIES = ("full", "ephemeral", "ring", "summarized")
+
+
+@dataclass
+class SessionPolicy:
+    """
+    How much history a class of sessions keeps.
+
+    full: everything (subject to the global summary settings).
+    ephemeral: no history; nothing is stored.
+    ring: only the last max_messages messages are kept and stored.
+    summarized: past max_messages unsummarized messages, the older half is
+        folded into the rolling summary.
+    """
+    policy: str = "full"
+    max_messages: int = 0
+
+    def __post_init__(self):
+        if self.policy not in POLICIES:
+            raise ValueError(f"Unknown session policy: {self.policy}")
+        if self.policy in ("ring", "summarized") and self.max_messages <= 0:
+            raise ValueError(f"Session policy {self.policy} needs max_messages > 0")
+
+
+FULL = SessionPolicy()
+
+# Scheduled turns repeat the same prompt; a couple of earlier runs are
+# enough to avoid repeating a reminder, the rest is cost
+DEFAULT_CLASSES: list[tuple[str, SessionPolicy]] = [
+    ("heartbeat", SessionPolicy("ring", 4)),
+    ("cron:*", SessionPolicy("ring", 4)),
+]
+
+
+class SessionClasses:
+    """Maps session keys to policies by glob pattern; the first match wins."""
+
+    def __init__(self, rules: list[tuple[str, SessionPolicy]] | None = None):
+        """
+        Args:
+            rules: (pattern, policy) pairs, e.g. ("cron:*", SessionPolicy("ring", 4)).
+                Unmatched sessions keep their full history.
+        """
+        self.rules = DEFAULT_CLASSES if rules is None else rules
+
+    def policy_for(self, key: str) -> SessionPolicy:
+        """Policy of a session."""
+        for pattern, policy in self.rules:
+            if fnmatchcase(key, pattern):
+                return policy
+        return FULL
@@ -0,0 +1,616 @@
+"""Storage backends for conversation sessions."""
+
+import asyncio
+import gzip
+import json
+import os
+import shutil
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Iterable
+
+from loguru import logger
+
+from nanobot.session.manager import Session
+from nanobot.utils.helpers import ensure_dir, safe_filename
+
+
+def _metadata_record(session: Session, message_count: int | None = None) -> dict[str, Any]:
+    """The metadata line of a session file."""
+    if message_count is None:
+        message_count = session.offset + len(session.messages)
+    return {
+        "_type": "metadata",
+        "key": session.key,
+        "created_at": session.created_at.isoformat(),
+        "updated_at": session.updated_at.isoformat(),
+        "metadata": session.metadata,
+        "message_count": message_count,
+    }
+
+
+def _read_last_line(path: Path, chunk: int = 8192) -> str:
+    """Read the last non-empty line of a file without reading all of it."""
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        end = f.tell()
+        data = b""
+        while end > 0:
+            start = max(0, end - chunk)
+            f.seek(start)
+            data = f.read(end - start) + data
+            end = start
+            lines = data.rstrip(b"\n").split(b"\n")
+            if len(lines) > 1 or start == 0:
+                return lines[-1].decode("utf-8", errors="replace").strip()
+    return ""
+
+
+def _needs_rewrite(session: Session) -> bool:
+    """Whether messages were removed since the session was last saved."""
+    return session._rewrite or session._persisted > len(session.messages)
+
+
+@dataclass
+class ArchiveReport:
+    """What an archive run compressed."""
+    sessions: int = 0
+    bytes_before: int = 0
+    bytes_after: int = 0
+
+    @property
+    def reclaimed(self) -> int:
+        """Bytes of disk space freed."""
+        return self.bytes_before - self.bytes_after
+
+
+class SessionStore(ABC):
+    """
+    Where sessions are persisted.
+
+    Stores write what changed since the last save (session.messages from
+    session._persisted on), or everything when the session was cleared;
+    the caller updates the bookkeeping afterwards.
+    """
+
+    stats: dict[str, int]
+
+    @abstractmethod
+    def load(self, key: str, tail: int | None = None) -> Session | None:
+        """
+        Load a session.
+
+        Args:
+            key: Session key.
+            tail: Only load this many of the most recent messages (None = all).
+
+        Returns:
+            The session, or None if it is not stored.
+        """
+
+    @abstractmethod
+    def save(self, session: Session) -> None:
+        """Persist a session's new messages and metadata."""
+
+    @abstractmethod
+    def delete(self, key: str) -> bool:
+        """Delete a session. Returns True if it existed."""
+
+    @abstractmethod
+    def list_sessions(self) -> list[dict[str, Any]]:
+        """Info dicts (key, created_at, updated_at, ...) of all stored sessions."""
+
+    def sync(self, keys: Iterable[str]) -> None:
+        """Force what was written for these sessions to stable storage."""
+
+    def archive(self, idle_s: float) -> ArchiveReport:
+        """Compress sessions not written for idle_s seconds; they are restored on use."""
+        raise NotImplementedError(f"{type(self).__name__} does not archive sessions")
+
+    def close(self) -> None:
+        """Release resources held by the store."""
+
+
+class JsonlSessionStore(SessionStore):
+    """
+    One JSONL file per session.
+
+    Saving appends only the messages added since the last save, followed
+    by a metadata trailer record; on load the last metadata record wins,
+    so files written by older versions (one metadata line at the top)
+    load unchanged. Once a file has collected compact_after trailers it
+    is rewritten in the background with a single metadata record.
+
+    Idle sessions can be archived: gzipped into sessions/archive/ and
+    restored transparently the next time they are loaded or saved.
+    """
+
+    def __init__(self, sessions_dir: Path, compact_after: int = 50):
+        """
+        Args:
+            sessions_dir: Directory of the session files.
+            compact_after: Appended metadata records before a file is compacted.
+        """
+        self.sessions_dir = ensure_dir(sessions_dir)
+        self.archive_dir = sessions_dir / "archive"
+        self.compact_after = compact_after
+        self._locks: dict[str, threading.Lock] = {}
+        self._trailers: dict[str, int] = {}  # Metadata records per file since the last compaction
+        self._compacting: set[str] = set()
+        self.stats = {"appends": 0, "rewrites": 0, "compactions": 0, "archived": 0, "rehydrated": 0}
+
+    def path(self, key: str) -> Path:
+        """Get the file path for a session."""
+        safe_key = safe_filename(key.replace(":", "_"))
+        return self.sessions_dir / f"{safe_key}.jsonl"
+
+    def archived_path(self, key: str) -> Path:
+        """Get the archive file path for a session."""
+        return self.archive_dir / f"{self.path(key).name}.gz"
+
+    def _lock(self, key: str) -> threading.Lock:
+        """Per-file lock serializing appends with compaction and archiving."""
+        return self._file_lock(self.path(key))
+
+    def _file_lock(self, path: Path) -> threading.Lock:
+        """Lock of a session file."""
+        return self._locks.setdefault(path.name, threading.Lock())
+
+    def _rehydrate(self, key: str) -> None:
+        """Restore an archived session file, if there is one."""
+        if not self.archived_path(key).exists():
+            return
+        with self._lock(key):
+            self._rehydrate_locked(key)
+
+    def _rehydrate_locked(self, key: str) -> None:
+        """_rehydrate() for callers holding the file lock."""
+        archived = self.archived_path(key)
+        path = self.path(key)
+        if path.exists() or not archived.exists():
+            return
+        tmp = path.with_suffix(".jsonl.tmp")
+        with gzip.open(archived, "rb") as src, open(tmp, "wb") as dst:
+            shutil.copyfileobj(src, dst)
+        tmp.replace(path)
+        archived.unlink()
+        self.stats["rehydrated"] += 1
+        logger.info(f"Restored archived session {key}")
+
+    def load(self, key: str, tail: int | None = None) -> Session | None:
+        """Load a session from its file, streaming it through a bounded window."""
+        self._rehydrate(key)
+        path = self.path(key)
+
+        if not path.exists():
+            return None
+
+        try:
+            # Only the tail stays in memory; offset counts the rest
+            messages: deque[dict[str, Any]] = deque(maxlen=tail)
+            total = 0
+            metadata = {}
+            created_at = None
+            updated_at = None
+            trailers = 0
+
+            with open(path) as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+
+                    try:
+                        data = json.loads(line)
+                    except ValueError:
+                        # A crash mid-append can leave a partial line
+                        logger.warning(f"Skipping malformed line in session {key}")
+                        continue
+
+                    if data.get("_type") == "metadata":
+                        metadata = data.get("metadata", {})
+                        created_at = datetime.fromisoformat(data["created_at"]) if data.get("created_at") else None
+                        updated_at = datetime.fromisoformat(data["updated_at"]) if data.get("updated_at") else None
+                        trailers += 1
+                    else:
+                        messages.append(data)
+                        total += 1
+
+            self._trailers[key] = trailers
+            return Session(
+                key=key,
+                messages=list(messages),
+                offset=total - len(messages),
+                created_at=created_at or datetime.now(),
+                updated_at=updated_at or datetime.now(),
+                metadata=metadata,
+                _persisted=len(messages),
+            )
+        except Exception as e:
+            logger.warning(f"Failed to load session {key}: {e}")
+            return None
+
+    def save(self, session: Session) -> None:
+        """
+        Append the new messages and a metadata record.
+
+        The file is rewritten instead when it does not exist yet or
+        messages were removed since the last save.
+
+        Raises:
+            FileNotFoundError: The file of a session with older messages
+                only on disk (offset > 0) is gone; it is not replaced with
+                the in-memory tail.
+        """
+        path = self.path(session.key)
+        with self._lock(session.key):
+            if not _needs_rewrite(session):
+                # Under the lock, so the archiver cannot move it away again
+                self._rehydrate_locked(session.key)
+                if not path.exists() and session.offset > 0:
+                    raise FileNotFoundError(
+                        f"Session file of {session.key} is missing; "
+                        f"not overwriting {session.offset} older messages with the tail"
+                    )
+            if _needs_rewrite(session) or not path.exists():
+                self._rewrite(path, session)
+                self._trailers[session.key] = 1
+                self.stats["rewrites"] += 1
+            else:
+                with open(path, "a+b") as f:
+                    # Terminate a partial last line left by an interrupted write
+                    if f.tell() > 0:
+                        f.seek(-1, os.SEEK_END)
+                        if f.read(1) != b"\n":
+                            f.write(b"\n")
+                    lines = [json.dumps(m) for m in session.messages[session._persisted:]]
+                    lines.append(json.dumps(_metadata_record(session)))
+                    f.write(("\n".join(lines) + "\n").encode("utf-8"))
+                self._trailers[session.key] = self._trailers.get(session.key, 1) + 1
+                self.stats["appends"] += 1
+
+        if self._trailers[session.key] >= self.compact_after:
+            self._schedule_compaction(session.key)
+
+    def _rewrite(self, path: Path, session: Session) -> None:
+        """Write a session file from scratch, replacing the old one atomically."""
+        tmp = path.with_suffix(".jsonl.tmp")
+        with open(tmp, "w") as f:
+            # Write metadata first
+            f.write(json.dumps(_metadata_record(session)) + "\n")
+
+            # Write messages
+            for msg in session.messages:
+                f.write(json.dumps(msg) + "\n")
+        tmp.replace(path)
+
+    def _schedule_compaction(self, key: str) -> None:
+        """Compact a session file, off the event loop when one is running."""
+        if key in self._compacting:
+            return
+        self._compacting.add(key)
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._compact(key)
+            return
+        loop.run_in_executor(None, self._compact, key)
+
+    def _compact(self, key: str) -> None:
+        """
+        Rewrite a session file with a single metadata record at the end.
+
+        Works from the file alone (the last metadata record in it is kept),
+        never from the live session. The rewrite runs without the file
+        lock, so saves are not held up by it; the lock is only taken to
+        copy over what was appended meanwhile and swap the files.
+        """
+        path = self.path(key)
+        tmp = path.with_suffix(".jsonl.compact")
+        try:
+            with self._lock(key):
+                if not path.exists():
+                    return
+                stat = path.stat()
+            # Stream the file: older messages are not in memory
+            count = 0
+            record = None
+            with open(path, "rb") as src, open(tmp, "wb") as dst:
+                while src.tell() < stat.st_size:
+                    line = src.readline(stat.st_size - src.tell()).strip()
+                    if not line:
+                        continue
+                    try:
+                        data = json.loads(line)
+                    except ValueError:
+                        continue
+                    if data.get("_type") == "metadata":
+                        record = data
+                        continue
+                    dst.write(line + b"\n")
+                    count += 1
+                if record is not None:
+                    record["message_count"] = count
+                    dst.write(json.dumps(record).encode("utf-8") + b"\n")
+
+            with self._lock(key):
+                try:
+                    current = path.stat()
+                except FileNotFoundError:
+                    return  # Archived or deleted meanwhile
+                if current.st_ino != stat.st_ino or current.st_size < stat.st_size:
+                    return  # Rewritten meanwhile
+                # Appends made during the rewrite, trailers included
+                with open(path, "rb") as src, open(tmp, "ab") as dst:
+                    src.seek(stat.st_size)
+                    appended = src.read()
+                    dst.write(appended)
+                tmp.replace(path)
+                trailers = appended.count(b'"_type": "metadata"')
+                self._trailers[key] = trailers + (1 if record is not None else 0)
+                self.stats["compactions"] += 1
+        except Exception as e:
+            logger.warning(f"Failed to compact session {key}: {e}")
+        finally:
+            tmp.unlink(missing_ok=True)
+            self._compacting.discard(key)
+
+    def sync(self, keys: Iterable[str]) -> None:
+        """fsync the session files, then the directory (for renames)."""
+        for key in keys:
+            try:
+                with open(self.path(key), "rb") as f:
+                    os.fsync(f.fileno())
+            except FileNotFoundError:
+                continue
+        fd = os.open(self.sessions_dir, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    def archive(self, idle_s: float) -> ArchiveReport:
+        """Gzip session files not written for idle_s seconds into the archive directory."""
+        report = ArchiveReport()
+        cutoff = time.time() - idle_s
+        for path in self.sessions_dir.glob("*.jsonl"):
+            try:
+                if path.stat().st_mtime > cutoff:
+                    continue
+                ensure_dir(self.archive_dir)
+                archived = self.archive_dir / f"{path.name}.gz"
+                with self._file_lock(path):
+                    stat = path.stat()  # Written since the check above?
+                    if stat.st_mtime > cutoff:
+                        continue
+                    size = stat.st_size
+                    tmp = archived.with_suffix(".tmp")
+                    with open(path, "rb") as src, gzip.open(tmp, "wb") as dst:
+                        shutil.copyfileobj(src, dst)
+                    tmp.replace(archived)
+                    path.unlink()
+            except OSError as e:
+                logger.warning(f"Could not archive {path.name}: {e}")
+                continue
+            report.sessions += 1
+            report.bytes_before += size
+            report.bytes_after += archived.stat().st_size
+            self.stats["archived"] += 1
+        return report
+
+    def delete(self, key: str) -> bool:
+        """Delete a session file and its archived copy."""
+        path = self.path(key)
+        self._trailers.pop(key, None)
+        with self._lock(key):
+            deleted = False
+            for p in (path, self.archived_path(key)):
+                if p.exists():
+                    p.unlink()
+                    deleted = True
+        return deleted
+
+    def list_sessions(self) -> list[dict[str, Any]]:
+        """List sessions, archived ones included, by reading their metadata records."""
+        sessions = []
+
+        for path in self.sessions_dir.glob("*.jsonl"):
+            try:
+                # The trailer is the latest metadata; older files only
+                # have it on the first line
+                data = json.loads(_read_last_line(path) or "{}")
+                if data.get("_type") != "metadata":
+                    with open(path) as f:
+                        data = json.loads(f.readline().strip() or "{}")
+                if data.get("_type") == "metadata":
+                    sessions.append(self._info(path, path.stem, data))
+            except Exception:
+                continue
+
+        for path in self.archive_dir.glob("*.jsonl.gz"):
+            try:
+                # Cold and compressed: read it through for the last metadata
+                data = {}
+                with gzip.open(path, "rt") as f:
+                    for line in f:
+                        if '"_type": "metadata"' in line:
+                            data = json.loads(line)
+                if data:
+                    sessions.append({**self._info(path, path.name[:-len(".jsonl.gz")], data), "archived": True})
+            except Exception:
+                continue
+
+        return sorted(sessions, key=lambda x: x.get("updated_at", ""), reverse=True)
+
+    @staticmethod
+    def _info(path: Path, stem: str, data: dict[str, Any]) -> dict[str, Any]:
+        """Session info dict from a metadata record."""
+        return {
+            # Older files do not store the key; channel names have no
+            # underscores, chat IDs may
+            "key": data.get("key") or stem.replace("_", ":", 1),
+            "created_at": data.get("created_at"),
+            "updated_at": data.get("updated_at"),
+            "message_count": data.get("message_count"),
+            "path": str(path)
+        }
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    key TEXT PRIMARY KEY,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    metadata TEXT NOT NULL DEFAULT '{}',
+    message_count INTEGER NOT NULL DEFAULT 0,
+    bytes INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS sessions_by_updated ON sessions (updated_at);
+CREATE TABLE IF NOT EXISTS messages (
+    key TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (key, seq)
+) WITHOUT ROWID;
+"""
+
+
+class SqliteSessionStore(SessionStore):
+    """
+    All sessions in one SQLite database (WAL mode).
+
+    The sessions table is the catalog (listing is an index scan instead
+    of opening every file) and messages are keyed by (session, sequence
+    number), so loading the tail of a long session reads only the tail.
+    """
+
+    def __init__(self, path: Path):
+        """
+        Args:
+            path: Database file.
+        """
+        self.path = path
+        ensure_dir(path.parent)
+        self._db = sqlite3.connect(str(path), check_same_thread=False)
+        self._lock = threading.Lock()
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+        self.stats = {"appends": 0, "rewrites": 0}
+
+    def load(self, key: str, tail: int | None = None) -> Session | None:
+        """Load a session's metadata and its last messages."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT created_at, updated_at, metadata, message_count FROM sessions WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if tail is None:
+                rows = self._db.execute("SELECT data FROM messages WHERE key = ? ORDER BY seq", (key,)).fetchall()
+            else:
+                rows = self._db.execute(
+                    "SELECT data FROM messages WHERE key = ? ORDER BY seq DESC LIMIT ?", (key, tail)
+                ).fetchall()[::-1]
+
+        messages = [json.loads(data) for (data,) in rows]
+        return Session(
+            key=key,
+            messages=messages,
+            offset=row[3] - len(messages),
+            created_at=datetime.fromisoformat(row[0]),
+            updated_at=datetime.fromisoformat(row[1]),
+            metadata=json.loads(row[2]),
+            _persisted=len(messages),
+        )
+
+    def save(self, session: Session) -> None:
+        """Insert the new messages and update the catalog row in one transaction."""
+        rewrite = _needs_rewrite(session)
+        start = 0 if rewrite else session._persisted
+        rows = [
+            (session.key, session.offset + i, json.dumps(msg))
+            for i, msg in enumerate(session.messages[start:], start)
+        ]
+        added = sum(len(data) for _, _, data in rows)
+
+        with self._lock, self._db:
+            if rewrite:
+                self._db.execute("DELETE FROM messages WHERE key = ?", (session.key,))
+                self._db.execute("DELETE FROM sessions WHERE key = ?", (session.key,))
+            self._db.executemany("INSERT OR REPLACE INTO messages (key, seq, data) VALUES (?, ?, ?)", rows)
+            self._db.execute(
+                "INSERT INTO sessions (key, created_at, updated_at, metadata, message_count, bytes) "
+                "VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (key) DO UPDATE SET updated_at = excluded.updated_at, "
+                "metadata = excluded.metadata, message_count = excluded.message_count, "
+                "bytes = sessions.bytes + excluded.bytes",
+                (
+                    session.key,
+                    session.created_at.isoformat(),
+                    session.updated_at.isoformat(),
+                    json.dumps(session.metadata),
+                    session.offset + len(session.messages),
+                    added,
+                ),
+            )
+        self.stats["rewrites" if rewrite else "appends"] += 1
+
+    def delete(self, key: str) -> bool:
+        """Delete a session and its messages."""
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM messages WHERE key = ?", (key,))
+            deleted = self._db.execute("DELETE FROM sessions WHERE key = ?", (key,)).rowcount
+        return deleted > 0
+
+    def list_sessions(self) -> list[dict[str, Any]]:
+        """List sessions from the catalog, most recently updated first."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT key, created_at, updated_at, message_count, bytes FROM sessions ORDER BY updated_at DESC"
+            ).fetchall()
+        return [
+            {"key": key, "created_at": created, "updated_at": updated, "message_count": count, "bytes": size}
+            for key, created, updated, count, size in rows
+        ]
+
+    def sync(self, keys: Iterable[str]) -> None:
+        """Checkpoint the WAL, which syncs all committed transactions to disk."""
+        with self._lock:
+            self._db.execute("PRAGMA wal_checkpoint(FULL)")
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._db.close()
+
+
+def migrate_sessions(source: SessionStore, target: SessionStore) -> int:
+    """
+    Copy every session from one store to another.
+
+    Sessions already in the target are replaced, so an interrupted
+    migration can simply be run again.
+
+    Args:
+        source: Store to read from.
+        target: Store to write to.
+
+    Returns:
+        Number of sessions copied.
+    """
+    copied = 0
+    for info in source.list_sessions():
+        session = source.load(info["key"])
+        if session is None:
+            continue
+        session._rewrite = True
+        target.save(session)
+        copied += 1
+    return copied
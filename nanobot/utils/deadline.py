@@ -0,0 +1,60 @@
+"""Turn-level time budget shared by LLM calls and tools."""
+
+import time
+from contextvars import ContextVar
+
+
+class Deadline:
+    """
+    A point in time by which a turn must finish.
+
+    Every operation of the turn waits at most min(its own timeout, the time
+    left), so one slow call cannot push the turn past its budget.
+    """
+
+    def __init__(self, timeout_s: float | None):
+        """
+        Args:
+            timeout_s: Seconds from now; None means no deadline.
+        """
+        self.timeout_s = timeout_s
+        self.expires_at = time.monotonic() + timeout_s if timeout_s else None
+
+    def remaining(self) -> float | None:
+        """Seconds left (never negative), or None without a deadline."""
+        if self.expires_at is None:
+            return None
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        """Whether the time is up."""
+        remaining = self.remaining()
+        return remaining is not None and remaining <= 0
+
+    def cap(self, timeout: float | None) -> float | None:
+        """An operation's own timeout, shortened to the time left."""
+        remaining = self.remaining()
+        if remaining is None:
+            return timeout
+        if timeout is None:
+            return remaining
+        return min(timeout, remaining)
+
+
+# Deadline of the turn being executed, for tools that apply their own timeouts
+current_deadline: ContextVar[Deadline | None] = ContextVar("current_deadline", default=None)
+
+
+def cap_timeout(timeout: float) -> float:
+    """Shorten timeout to what is left of the current turn's deadline, if any."""
+    deadline = current_deadline.get()
+    if deadline is None:
+        return timeout
+    return deadline.cap(timeout)
+
+
+def deadline_expired() -> bool:
+    """Whether the current turn's deadline has passed."""
+    deadline = current_deadline.get()
+    return deadline is not None and deadline.expired
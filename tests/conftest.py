@@ -0,0 +1,73 @@
+import inspect
+from typing import Any, Awaitable, Callable
+
+import pytest
+
+from nanobot.agent.loop import AgentLoop
+from nanobot.bus.queue import MessageBus
+from nanobot.config.schema import BrowserConfig
+from nanobot.providers.base import LLMProvider, LLMResponse
+
+Reply = str | LLMResponse
+Script = Reply | list[Reply] | Callable[[list[dict[str, Any]]], Reply | Awaitable[Reply]] | None
+
+
+class ScriptedProvider(LLMProvider):
+    """
+    Fake LLM with scripted responses; records every prompt it is sent.
+
+    The script is one response for every call, a list of responses in call
+    order (the last one repeats), or a function of the prompt (sync or
+    async). Without a script it echoes the last message as "re: <text>".
+    """
+
+    def __init__(self, script: Script = None):
+        super().__init__()
+        self.script = script
+        self.prompts: list[list[dict[str, Any]]] = []
+        self.kwargs: list[dict[str, Any]] = []
+
+    @property
+    def calls(self) -> int:
+        return len(self.prompts)
+
+    async def chat(self, messages: list[dict[str, Any]], **kwargs: Any) -> LLMResponse:
+        self.prompts.append(messages)
+        self.kwargs.append(kwargs)
+        if self.script is None:
+            reply: Reply = f"re: {messages[-1]['content']}"
+        elif isinstance(self.script, list):
+            reply = self.script[min(self.calls, len(self.script)) - 1]
+        elif callable(self.script):
+            reply = self.script(messages)
+            if inspect.isawaitable(reply):
+                reply = await reply
+        else:
+            reply = self.script
+        return LLMResponse(content=reply) if isinstance(reply, str) else reply
+
+    def get_default_model(self) -> str:
+        return "test-model"
+
+
+@pytest.fixture
+def make_provider() -> Callable[..., ScriptedProvider]:
+    """Build a ScriptedProvider from a script."""
+    return ScriptedProvider
+
+
+@pytest.fixture
+def make_loop(tmp_path) -> Callable[..., AgentLoop]:
+    """Build an AgentLoop in tmp_path on a ScriptedProvider; extra kwargs go to AgentLoop."""
+
+    def make(script: Script = None, **kwargs: Any) -> AgentLoop:
+        return AgentLoop(
+            bus=MessageBus(),
+            provider=ScriptedProvider(script),
+            workspace=tmp_path,
+            browser_config=BrowserConfig(enabled=False),
+            plan="pro",
+            **kwargs,
+        )
+
+    return make
@@ -0,0 +1,130 @@
+import asyncio
+from typing import Any
+
+from nanobot.agent.loop import _interrupted_note
+from nanobot.bus.events import InboundMessage
+from nanobot.providers.base import LLMResponse, ToolCallRequest
+
+
+async def echo_slowly(messages: list[dict[str, Any]]) -> str:
+    """Replies with the last user message; 'slow' messages take a while."""
+    text = messages[-1]["content"]
+    if "slow" in text:
+        await asyncio.sleep(0.3)
+    return f"re: {text}"
+
+
+async def test_slow_session_does_not_block_other_sessions(make_loop) -> None:
+    loop = make_loop(echo_slowly, max_concurrent_turns=4)
+    done: list[str] = []
+
+    async def ask(text: str, key: str) -> None:
+        await loop.process_direct(text, session_key=key, internal=True)
+        done.append(text)
+
+    await asyncio.gather(ask("slow one", "a:1"), ask("fast one", "b:1"))
+    assert done == ["fast one", "slow one"]
+
+
+async def test_same_session_turns_stay_ordered(make_loop) -> None:
+    loop = make_loop(echo_slowly, max_concurrent_turns=4)
+    done: list[str] = []
+
+    async def ask(text: str) -> None:
+        await loop.process_direct(text, session_key="a:1", internal=True)
+        done.append(text)
+
+    await asyncio.gather(ask("slow first"), ask("second"))
+    assert done == ["slow first", "second"]
+    history = loop.sessions.get_or_create("a:1").messages
+    assert [m["content"] for m in history if m["role"] == "user"] == ["slow first", "second"]
+
+
+async def test_run_publishes_replies_from_bus(make_loop) -> None:
+    loop = make_loop()
+    task = asyncio.create_task(loop.run())
+    await loop.bus.publish_inbound(InboundMessage(
+        channel="telegram", sender_id="u", chat_id="42", content="hello",
+        metadata={"internal": True},
+    ))
+    reply = await asyncio.wait_for(loop.bus.consume_outbound(), timeout=2)
+    loop.stop()
+    await task
+    assert reply.chat_id == "42"
+    assert reply.content == "re: hello"
+
+
+async def test_process_direct_streams_visible_deltas(make_loop) -> None:
+    loop = make_loop()
+    deltas: list[str] = []
+
+    async def on_stream(delta: str) -> None:
+        deltas.append(delta)
+
+    reply = await loop.process_direct("hi", session_key="a:1", internal=True, on_stream=on_stream)
+    assert reply == "re: hi"
+    assert "".join(deltas) == "re: hi"
+
+
+def _user_msg(text: str) -> InboundMessage:
+    return InboundMessage(channel="telegram", sender_id="u", chat_id="42", content=text)
+
+
+async def test_new_message_cancels_running_turn(make_loop) -> None:
+    loop = make_loop(echo_slowly, stream=False, on_new_message="cancel")
+    loop._submit(_user_msg("slow question"))
+    await asyncio.sleep(0.05)
+    loop._submit(_user_msg("actually this"))
+
+    reply = await asyncio.wait_for(loop.bus.consume_outbound(), timeout=2)
+    assert reply.content == "re: actually this"
+    assert loop.bus.outbound_size == 0
+    assert loop.interrupt_stats["superseded"] == 1
+    history = [m["content"] for m in loop.sessions.get_or_create("telegram:42").messages]
+    assert history[0] == "slow question"
+    assert history[1].startswith("[Interrupted")
+    assert history[2:] == ["actually this", "re: actually this"]
+
+
+async def test_new_message_is_injected_into_running_turn(make_loop) -> None:
+    async def list_then_answer(messages: list[dict[str, Any]]) -> LLMResponse:
+        """Lists the workspace on the first call, then answers every user message since."""
+        if loop.provider.calls == 1:
+            await asyncio.sleep(0.2)
+            return LLMResponse(content=None, tool_calls=[ToolCallRequest(id="t1", name="list_dir", arguments={"path": "."})])
+        asked = [m["content"] for m in messages if m["role"] == "user"]
+        return LLMResponse(content="re: " + " + ".join(asked[-2:]))
+
+    loop = make_loop(list_then_answer, stream=False, on_new_message="inject")
+    loop._submit(_user_msg("list files"))
+    await asyncio.sleep(0.05)
+    loop._submit(_user_msg("only python ones"))
+
+    reply = await asyncio.wait_for(loop.bus.consume_outbound(), timeout=2)
+    assert reply.content == "re: list files + only python ones"
+    await asyncio.sleep(0.05)
+    assert loop.bus.outbound_size == 0
+    assert loop.provider.calls == 2
+    assert loop.interrupt_stats["injected"] == 1
+
+
+def test_interrupted_note_lists_tool_work() -> None:
+    note = _interrupted_note([
+        {"role": "assistant", "content": None, "tool_calls": [
+            {"id": "t1", "type": "function", "function": {"name": "web_fetch", "arguments": '{"url": "https://a.example"}'}},
+        ]},
+        {"role": "tool", "tool_call_id": "t1", "name": "web_fetch", "content": "Example page\n text"},
+    ])
+    assert note.splitlines()[1] == '- web_fetch({"url": "https://a.example"}) → Example page text'
+
+
+async def test_error_reply_closes_the_live_preview(make_loop) -> None:
+    def fail(messages: list[dict[str, Any]]) -> LLMResponse:
+        raise RuntimeError("provider down")
+
+    loop = make_loop(fail)
+    loop._submit(_user_msg("hi"))
+
+    reply = await asyncio.wait_for(loop.bus.consume_outbound(), timeout=2)
+    assert reply.content.startswith("Sorry, I encountered an error")
+    assert reply.metadata["stream_id"]
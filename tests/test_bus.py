@@ -0,0 +1,80 @@
+import asyncio
+
+import pytest
+
+from nanobot.bus.events import InboundMessage
+from nanobot.bus.queue import LaneLimit, LaneQueue, LaneSlots, MessageBus
+
+
+def _msg(content: str, channel: str = "telegram", **metadata) -> InboundMessage:
+    return InboundMessage(channel=channel, sender_id="u1", chat_id="c1", content=content, metadata=metadata)
+
+
+async def test_interactive_lane_served_first() -> None:
+    bus = MessageBus()
+    await bus.publish_inbound(_msg("cron", internal=True))
+    await bus.publish_inbound(_msg("subagent done", channel="system"))
+    await bus.publish_inbound(_msg("hello"))
+
+    order = [(await bus.consume_inbound()).content for _ in range(3)]
+
+    assert order == ["hello", "subagent done", "cron"]
+    stats = bus.get_stats()["inbound"]
+    assert stats["lanes"]["background"]["enqueued"] == 1
+    assert stats["depth"] == {"interactive": 0, "system": 0, "background": 0}
+
+
+async def test_overflow_policies() -> None:
+    bus = MessageBus(inbound_limits={
+        "interactive": LaneLimit(maxsize=1, overflow="reject"),
+        "background": LaneLimit(maxsize=1, overflow="drop_oldest"),
+    })
+    assert await bus.publish_inbound(_msg("first"))
+    assert not await bus.publish_inbound(_msg("second"))
+    notice = await bus.consume_outbound()
+    assert notice.chat_id == "c1" and "try again" in notice.content
+
+    await bus.publish_inbound(_msg("old", internal=True))
+    await bus.publish_inbound(_msg("new", internal=True))
+
+    assert (await bus.consume_inbound()).content == "first"
+    assert (await bus.consume_inbound()).content == "new"
+    lanes = bus.get_stats()["inbound"]["lanes"]
+    assert lanes["interactive"]["rejected"] == 1
+    assert lanes["background"]["dropped"] == 1
+
+
+async def test_block_policy_waits_for_room() -> None:
+    queue: LaneQueue[str] = LaneQueue({"interactive": LaneLimit(maxsize=1)})
+    await queue.put("a")
+    blocked = asyncio.create_task(queue.put("b"))
+    await asyncio.sleep(0.01)
+    assert not blocked.done()
+
+    assert await queue.get() == "a"
+    await asyncio.wait_for(blocked, timeout=1)
+    assert await queue.get() == "b"
+
+
+async def test_freed_slot_goes_to_interactive_waiter() -> None:
+    slots = LaneSlots(1)
+    await slots.acquire()
+    granted: list[str] = []
+
+    async def wait(lane: str) -> None:
+        await slots.acquire(lane)
+        granted.append(lane)
+
+    waiters = [asyncio.create_task(wait("background")), asyncio.create_task(wait("interactive"))]
+    await asyncio.sleep(0.01)
+    slots.release()
+    await asyncio.sleep(0.01)
+
+    assert granted == ["interactive"]
+    slots.release()
+    await asyncio.gather(*waiters)
+
+
+def test_unknown_overflow_policy_rejected() -> None:
+    with pytest.raises(ValueError):
+        LaneQueue({"interactive": LaneLimit(maxsize=1, overflow="spill")})
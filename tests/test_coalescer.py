@@ -0,0 +1,43 @@
+import asyncio
+
+from nanobot.bus.coalescer import InboundCoalescer
+from nanobot.bus.events import InboundMessage
+
+
+def inbound(text: str, sender: str = "u1", media: list[str] | None = None) -> InboundMessage:
+    return InboundMessage(channel="telegram", sender_id=sender, chat_id="42", content=text, media=media or [])
+
+
+async def test_burst_is_merged_into_one_message() -> None:
+    ready: list[InboundMessage] = []
+    coalescer = InboundCoalescer(ready.append, window_s=0.05, max_wait_s=1.0)
+
+    coalescer.add(inbound("hey"))
+    await asyncio.sleep(0.03)
+    coalescer.add(inbound("", media=["a.jpg"]))
+    await asyncio.sleep(0.03)
+    coalescer.add(inbound("what is this?", media=["b.jpg"]))
+    assert ready == []
+
+    await asyncio.sleep(0.1)
+    assert len(ready) == 1
+    assert ready[0].content == "hey\nwhat is this?"
+    assert ready[0].media == ["a.jpg", "b.jpg"]
+    assert ready[0].metadata["coalesced"] == 3
+
+
+async def test_max_wait_and_sender_change_end_a_burst() -> None:
+    ready: list[InboundMessage] = []
+    coalescer = InboundCoalescer(ready.append, window_s=0.05, max_wait_s=0.08)
+
+    coalescer.add(inbound("a"))
+    coalescer.add(inbound("b", sender="u2"))
+    assert [m.content for m in ready] == ["a"]
+
+    for text in ("c", "d", "e"):
+        await asyncio.sleep(0.03)
+        coalescer.add(inbound(text, sender="u2"))
+    await asyncio.sleep(0.1)
+    # The burst kept going past max_wait_s, so it was split
+    assert len(ready) >= 3
+    assert "\n".join(m.content for m in ready[1:]) == "b\nc\nd\ne"
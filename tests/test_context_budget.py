@@ -0,0 +1,48 @@
+from nanobot.agent.context import ContextBuilder
+from nanobot.agent.tokens import TokenBudget, fit_history
+
+
+def turn(i: int, size: int = 40) -> list[dict]:
+    return [
+        {"role": "user", "content": f"q{i} " + "x" * size},
+        {"role": "assistant", "content": f"a{i} " + "y" * size},
+    ]
+
+
+def test_fit_history_keeps_newest_messages_within_budget() -> None:
+    history = [m for i in range(10) for m in turn(i)]
+    kept = fit_history(history, budget_tokens=60)
+    assert kept == history[-4:]
+    assert kept[0]["role"] == "user"
+
+
+def test_large_message_pushes_older_history_out(tmp_path) -> None:
+    builder = ContextBuilder(tmp_path, budget=TokenBudget(max_context_tokens=20_000, reply_tokens=0))
+    history = turn(0) + [
+        {"role": "user", "content": "doc " + "z" * 4 * 20_000},
+        {"role": "assistant", "content": "summary"},
+    ] + turn(2)
+
+    messages = builder.build_messages(history, "now", model="unknown-model")
+    contents = [m["content"] for m in messages[1:-1]]
+    assert contents == [m["content"] for m in turn(2)]
+
+    # A short chat keeps everything
+    messages = builder.build_messages(turn(0) + turn(1), "now", model="unknown-model")
+    assert len(messages) == 6
+
+
+def test_system_prompt_sections_rebuild_only_when_inputs_change(tmp_path) -> None:
+    builder = ContextBuilder(tmp_path)
+    (tmp_path / "SOUL.md").write_text("be kind")
+    builder.build_system_prompt()
+    rebuilds = builder.prompt_cache.stats["rebuilds"]
+
+    builder.build_system_prompt()
+    assert builder.prompt_cache.stats["rebuilds"] == rebuilds
+
+    builder.memory.write_long_term("user likes tea")
+    prompt = builder.build_system_prompt()
+    assert "user likes tea" in prompt and "be kind" in prompt
+    assert builder.prompt_cache.stats["rebuilds"] == rebuilds + 1
+    assert builder.prompt_cache.hit_rate > 0.5
@@ -0,0 +1,60 @@
+import asyncio
+
+import httpx
+
+from nanobot.billing import CreditGuard
+
+
+def make_guard(handler, **kwargs) -> CreditGuard:
+    guard = CreditGuard("http://platform", "u1", **kwargs)
+    guard._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return guard
+
+
+async def test_concurrent_checks_share_one_request() -> None:
+    calls = 0
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return httpx.Response(200, json={"ok": True, "balance": 4.2})
+
+    guard = make_guard(handler)
+    results = await asyncio.gather(*(guard.check() for _ in range(5)))
+    assert calls == 1
+    assert all(r.ok and r.balance == 4.2 for r in results)
+
+    # Fresh result is served from cache
+    await guard.check()
+    assert calls == 1
+    assert guard.stats["cache_hits"] == 1
+
+
+async def test_failure_policy_and_stale_fallback() -> None:
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(503)
+
+    closed = make_guard(handler)
+    status = await closed.check()
+    assert not status.ok and status.error
+
+    opened = make_guard(handler, fail_open=True)
+    assert (await opened.check()).ok
+
+    # A recent known status stands in for a failed check
+    closed.update(ok=True, balance=1.0)
+    closed._status.checked_at -= 60
+    status = await closed.check()
+    assert status.ok and status.balance == 1.0
+
+
+async def test_pushed_update_replaces_cached_status() -> None:
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json={"ok": True, "balance": 3.0})
+
+    guard = make_guard(handler)
+    assert (await guard.check()).ok
+    guard.update(ok=False, balance=0.0, reason="exhausted")
+    status = await guard.check()
+    assert not status.ok and status.reason == "exhausted"
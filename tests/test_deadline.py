@@ -0,0 +1,79 @@
+import asyncio
+import os
+from typing import Any
+
+import pytest
+
+from nanobot.agent.tools.base import Tool
+from nanobot.agent.tools.registry import ToolRegistry
+from nanobot.agent.tools.shell import ExecTool
+from nanobot.providers.base import LLMResponse, ToolCallRequest
+from nanobot.utils.deadline import Deadline, cap_timeout
+
+
+class SleepTool(Tool):
+    name = "sleep"
+    description = "Sleep, reporting the timeout it was given."
+    parameters = {"type": "object", "properties": {"seconds": {"type": "number"}}, "required": ["seconds"]}
+
+    async def execute(self, seconds: float, **kwargs: Any) -> str:
+        capped = cap_timeout(60)
+        await asyncio.sleep(seconds)
+        return f"slept, own timeout {capped:.0f}s"
+
+
+def test_deadline_caps_timeouts() -> None:
+    assert Deadline(None).cap(30) == 30
+    assert Deadline(None).remaining() is None
+    deadline = Deadline(10)
+    assert 9 < deadline.cap(30) <= 10
+    assert deadline.cap(5) == 5
+    assert not deadline.expired
+    assert Deadline(0.0001).cap(None) is not None
+
+
+async def test_registry_passes_deadline_to_tools() -> None:
+    tools = ToolRegistry()
+    tools.register(SleepTool())
+
+    assert await tools.execute("sleep", {"seconds": 0}) == "slept, own timeout 60s"
+    assert await tools.execute("sleep", {"seconds": 0}, Deadline(5)) == "slept, own timeout 5s"
+
+    expired = Deadline(0.01)
+    await asyncio.sleep(0.02)
+    assert "time for this turn is up" in await tools.execute("sleep", {"seconds": 0}, expired)
+
+
+async def test_cancelled_exec_kills_its_process(tmp_path) -> None:
+    tool = ExecTool(working_dir=str(tmp_path))
+    task = asyncio.create_task(tool.execute("echo $$ > pid; exec sleep 30"))
+    while not (tmp_path / "pid").exists() or not (tmp_path / "pid").read_text().strip():
+        await asyncio.sleep(0.01)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    with pytest.raises(ProcessLookupError):
+        os.kill(int((tmp_path / "pid").read_text()), 0)
+
+
+def keep_sleeping(messages: list[dict[str, Any]]) -> LLMResponse:
+    """Keeps calling the sleep tool, with interim text."""
+    return LLMResponse(
+        content="Checked two sources so far.",
+        tool_calls=[ToolCallRequest(id=f"t{len(messages)}", name="sleep", arguments={"seconds": 0.1})],
+    )
+
+
+async def test_turn_returns_partial_answer_when_time_is_up(make_loop) -> None:
+    loop = make_loop(keep_sleeping, stream=False, turn_timeout_s=0.25)
+    loop.tools.register(SleepTool())
+
+    reply = await asyncio.wait_for(loop.process_direct("research this", session_key="a:1"), timeout=5)
+
+    assert reply.startswith("Checked two sources so far.")
+    assert "ran out of time" in reply
+    saved = loop.sessions.get_or_create("a:1").messages[-1]["content"]
+    assert "Interrupted by the time limit" in saved
+    assert "- sleep(" in saved
+    assert all(kwargs["deadline"] is not None for kwargs in loop.provider.kwargs)
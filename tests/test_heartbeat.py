@@ -0,0 +1,59 @@
+from nanobot.heartbeat import service
+from nanobot.heartbeat.service import HeartbeatService
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+def make_service(tmp_path, monkeypatch, replies: list[str]) -> tuple[HeartbeatService, FakeClock, list[str]]:
+    clock = FakeClock()
+    monkeypatch.setattr(service, "time", clock)
+    prompts: list[str] = []
+
+    async def on_heartbeat(prompt: str) -> str:
+        prompts.append(prompt)
+        return replies.pop(0) if replies else "HEARTBEAT_OK"
+
+    hb = HeartbeatService(tmp_path, on_heartbeat=on_heartbeat, interval_s=100, max_interval_s=400)
+    (tmp_path / "HEARTBEAT.md").write_text("Remind me to stretch if it's after 5pm")
+    return hb, clock, prompts
+
+
+async def test_unchanged_ok_backs_off_exponentially(tmp_path, monkeypatch) -> None:
+    hb, clock, prompts = make_service(tmp_path, monkeypatch, [])
+    ran_at = []
+    for tick in range(12):
+        clock.now = tick * 100
+        before = len(prompts)
+        await hb._tick()
+        if len(prompts) > before:
+            ran_at.append(tick)
+
+    # Gaps of 2, 4, then capped at 4 intervals
+    assert ran_at == [0, 2, 6, 10]
+    assert hb.stats == {"ticks": 12, "runs": 4, "skipped": 8}
+
+
+async def test_file_change_and_action_reset_backoff(tmp_path, monkeypatch) -> None:
+    hb, clock, prompts = make_service(tmp_path, monkeypatch, ["HEARTBEAT_OK", "Reminded you to stretch"])
+    await hb._tick()
+    clock.now = 100
+    (tmp_path / "HEARTBEAT.md").write_text("Remind me to drink water")
+    await hb._tick()  # changed file runs right away
+    clock.now = 200
+    await hb._tick()  # last run did something, so no backoff
+
+    assert len(prompts) == 3
+
+
+def test_ticks_are_jittered(tmp_path) -> None:
+    hb = HeartbeatService(tmp_path, interval_s=1000, jitter=0.1)
+    first = {round(hb._next_sleep(first=True)) for _ in range(20)}
+    later = [hb._next_sleep() for _ in range(20)]
+    assert len(first) > 1 and all(0 <= s <= 1000 for s in first)
+    assert all(900 <= s <= 1100 for s in later)
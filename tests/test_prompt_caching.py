@@ -0,0 +1,43 @@
+from types import SimpleNamespace
+
+from nanobot.agent.context import ContextBuilder
+from nanobot.providers.litellm_provider import LiteLLMProvider
+
+
+def test_system_prompt_puts_volatile_context_last(tmp_path) -> None:
+    builder = ContextBuilder(tmp_path)
+    builder.memory.write_long_term("likes tea")
+    messages = builder.build_messages([], "hi", channel="telegram", chat_id="42")
+    blocks = [b["text"] for b in messages[0]["content"]]
+    assert len(blocks) == 3
+    assert "Current Time" not in blocks[0] and "likes tea" not in blocks[0]
+    assert "likes tea" in blocks[1]
+    assert "Current Time" in blocks[2] and "Chat ID: 42" in blocks[2]
+
+
+def test_cache_breakpoints_for_claude_and_flat_system_elsewhere(tmp_path) -> None:
+    provider = LiteLLMProvider()
+    messages = ContextBuilder(tmp_path).build_messages([], "hi", channel="cli", chat_id="d")
+
+    claude = provider._prepare_messages(messages, "anthropic/claude-opus-4-5")
+    system = claude[0]["content"]
+    assert all("cache_control" in b for b in system[:-1])
+    assert "cache_control" not in system[-1]
+    assert claude[-1]["content"] == [{"type": "text", "text": "hi", "cache_control": {"type": "ephemeral"}}]
+    assert messages[-1]["content"] == "hi"  # input left untouched
+
+    other = provider._prepare_messages(messages, "openai/gpt-4o")
+    assert isinstance(other[0]["content"], str)
+    assert other[0]["content"].endswith(messages[0]["content"][-1]["text"])
+    assert other[-1]["content"] == "hi"
+
+
+def test_usage_reports_cached_tokens() -> None:
+    usage = SimpleNamespace(
+        prompt_tokens=1000, completion_tokens=10, total_tokens=1010,
+        prompt_tokens_details=SimpleNamespace(cached_tokens=900),
+        cache_creation_input_tokens=50,
+    )
+    parsed = LiteLLMProvider._parse_usage(usage)
+    assert parsed["cached_tokens"] == 900
+    assert parsed["cache_creation_tokens"] == 50
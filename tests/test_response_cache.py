@@ -0,0 +1,78 @@
+import os
+import time
+from typing import Any
+
+from nanobot.providers.base import LLMResponse, ToolCallRequest
+from nanobot.providers.response_cache import ResponseCache
+
+PURE = {"read_file", "web_fetch"}
+
+
+def _system(now: str) -> dict[str, Any]:
+    return {"role": "system", "content": [
+        {"type": "text", "text": "# Identity"},
+        {"type": "text", "text": f"# Current Context\n\n## Current Time\n{now} (UTC)"},
+    ]}
+
+
+def test_key_ignores_clock_and_history_but_not_tool_results(tmp_path) -> None:
+    cache = ResponseCache(tmp_path, is_pure_tool=PURE.__contains__)
+    turn = [{"role": "user", "content": "check HEARTBEAT.md"}]
+    earlier = [{"role": "user", "content": "check HEARTBEAT.md"}, {"role": "assistant", "content": "HEARTBEAT_OK"}]
+
+    key = cache.key([_system("2026-01-01 09:00"), *turn], None, "m")
+    assert key == cache.key([_system("2026-01-01 09:30"), *earlier, *turn], None, "m")
+    assert key != cache.key([_system("2026-01-01 09:00"), *turn], None, "other-model")
+
+    read = {"role": "assistant", "content": None, "tool_calls": [
+        {"id": "t1", "type": "function", "function": {"name": "read_file", "arguments": '{"path": "HEARTBEAT.md"}'}},
+    ]}
+    before = cache.key([*turn, read, {"role": "tool", "tool_call_id": "t1", "name": "read_file", "content": "- [ ] a"}], None, "m")
+    after = cache.key([*turn, read, {"role": "tool", "tool_call_id": "t1", "name": "read_file", "content": "- [ ] b"}], None, "m")
+    assert before is not None and before != after
+
+
+def test_side_effect_tools_bypass_cache(tmp_path) -> None:
+    cache = ResponseCache(tmp_path, is_pure_tool=PURE.__contains__)
+    exec_call = {"role": "assistant", "content": None, "tool_calls": [
+        {"id": "t1", "type": "function", "function": {"name": "exec", "arguments": '{"command": "date"}'}},
+    ]}
+    assert cache.key([{"role": "user", "content": "hi"}, exec_call], None, "m") is None
+
+    key = cache.key([{"role": "user", "content": "hi"}], None, "m")
+    cache.put(key, LLMResponse(content=None, tool_calls=[ToolCallRequest(id="t", name="exec", arguments={})]))
+    assert cache.get(key) is None
+    cache.put(key, LLMResponse(content="hello"))
+    assert cache.get(key).content == "hello"
+
+
+def test_ttl_and_lru_eviction(tmp_path) -> None:
+    cache = ResponseCache(tmp_path, is_pure_tool=PURE.__contains__, ttl_s=60, max_entries=2)
+    keys = [cache.key([{"role": "user", "content": str(i)}], None, "m") for i in range(3)]
+    for i, key in enumerate(keys[:2]):
+        cache.put(key, LLMResponse(content=str(i)))
+        os.utime(tmp_path / f"{key}.json", (time.time() - 10 + i, time.time() - 10 + i))
+    cache.get(keys[0])  # now most recently used
+    cache.put(keys[2], LLMResponse(content="2"))
+
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0]).content == "0"
+
+    cache.ttl_s = 0
+    assert cache.get(keys[2]) is None
+
+
+async def test_internal_turns_reuse_cached_response(make_loop) -> None:
+    loop = make_loop(
+        LLMResponse(content="HEARTBEAT_OK", usage={"prompt_tokens": 100, "completion_tokens": 2}),
+        response_cache_ttl_s=3600,
+    )
+    # Runs 30 minutes apart, as the heartbeat would send them
+    for now in ["2026-01-01 09:00", "2026-01-01 09:30"]:
+        loop.context._get_current_context = lambda *_, now=now: f"# Current Context\n\n## Current Time\n{now}"
+        assert await loop.process_direct("heartbeat", session_key="heartbeat", internal=True) == "HEARTBEAT_OK"
+    await loop.process_direct("heartbeat", session_key="cli:user")
+
+    # Second internal run is a hit; the user turn always calls the model
+    assert loop.provider.calls == 2
+    assert loop.response_cache.stats["hits"] == 1
@@ -0,0 +1,259 @@
+import json
+import os
+import time
+
+import pytest
+
+from nanobot.session.manager import SessionManager
+from nanobot.session.store import JsonlSessionStore, SqliteSessionStore, migrate_sessions
+
+
+def _lines(path) -> list[dict]:
+    return [json.loads(line) for line in path.read_text().splitlines() if line.strip()]
+
+
+def test_save_appends_only_new_messages(tmp_path) -> None:
+    sessions = SessionManager(tmp_path)
+    session = sessions.get_or_create("telegram:42")
+    session.add_message("user", "hi")
+    sessions.save(session)
+    path = sessions.store.path("telegram:42")
+    size = path.stat().st_size
+
+    session.add_message("assistant", "hello")
+    sessions.save(session)
+
+    tail = path.read_bytes()[size:].decode().splitlines()
+    assert [json.loads(line).get("role") for line in tail] == ["assistant", None]
+    assert (sessions.stats["appends"], sessions.stats["rewrites"]) == (1, 1)
+
+    loaded = SessionManager(tmp_path).get_or_create("telegram:42")
+    assert [m["content"] for m in loaded.messages] == ["hi", "hello"]
+    assert SessionManager(tmp_path).list_sessions()[0]["key"] == "telegram:42"
+
+
+def test_loads_legacy_files_and_skips_partial_lines(tmp_path) -> None:
+    sessions = SessionManager(tmp_path)
+    path = sessions.store.path("cli:direct")
+    path.write_text(
+        json.dumps({"_type": "metadata", "created_at": "2026-01-01T00:00:00", "metadata": {"a": 1}}) + "\n"
+        + json.dumps({"role": "user", "content": "old"}) + "\n"
+        + '{"role": "assis'
+    )
+
+    session = sessions.get_or_create("cli:direct")
+    assert [m["content"] for m in session.messages] == ["old"]
+    session.add_message("assistant", "new")
+    sessions.save(session)
+
+    reloaded = SessionManager(tmp_path).get_or_create("cli:direct")
+    assert [m["content"] for m in reloaded.messages] == ["old", "new"]
+    assert reloaded.metadata == {"a": 1}
+
+
+def test_clear_rewrites_and_trailers_are_compacted(tmp_path) -> None:
+    sessions = SessionManager(tmp_path, store=JsonlSessionStore(tmp_path / "sessions", compact_after=3))
+    session = sessions.get_or_create("a:1")
+    for i in range(4):
+        session.add_message("user", str(i))
+        sessions.save(session)
+    path = sessions.store.path("a:1")
+
+    records = _lines(path)
+    assert sessions.stats["compactions"] == 1
+    assert sum(r.get("_type") == "metadata" for r in records) <= 2
+    assert [r["content"] for r in records if "role" in r] == ["0", "1", "2", "3"]
+
+    session.clear()
+    sessions.save(session)
+    assert [r.get("_type") for r in _lines(path)] == ["metadata"]
+
+
+def test_compaction_keeps_saves_made_while_it_runs(tmp_path) -> None:
+    store = JsonlSessionStore(tmp_path / "sessions", compact_after=1000)
+    sessions = SessionManager(tmp_path, store=store)
+    session = sessions.get_or_create("a:1")
+    for i in range(3):
+        session.add_message("user", str(i))
+        sessions.save(session)
+
+    # Save again between the unlocked rewrite and the final swap
+    lock, calls = store._lock, []
+
+    def lock_and_save(key):
+        calls.append(key)
+        if len(calls) == 2:
+            session.add_message("user", "3")
+            session.metadata["late"] = True
+            sessions.save(session)
+        return lock(key)
+
+    store._lock = lock_and_save
+    store._compact("a:1")
+
+    records = _lines(store.path("a:1"))
+    assert store.stats["compactions"] == 1
+    assert [r["content"] for r in records if "role" in r] == ["0", "1", "2", "3"]
+    assert [r.get("_type") for r in records].count("metadata") == 2
+    assert store.load("a:1").metadata["late"] is True
+
+
+def test_memory_holds_a_tail_window_and_evicts(tmp_path) -> None:
+    sessions = SessionManager(tmp_path, tail_messages=3, max_cached=2)
+    session = sessions.get_or_create("a:1")
+    for i in range(5):
+        session.add_message("user", str(i))
+    sessions.save(session)
+
+    assert [m["content"] for m in session.messages] == ["2", "3", "4"]
+    assert session.offset == 2
+    for key in ("b:1", "c:1"):
+        sessions.save(sessions.get_or_create(key))
+    assert "a:1" not in sessions._cache
+
+    # Reloaded lazily with the same window; appends continue the log
+    session = sessions.get_or_create("a:1")
+    assert (session.offset, [m["content"] for m in session.messages]) == (2, ["2", "3", "4"])
+    session.add_message("user", "5")
+    sessions.save(session)
+    assert [r["content"] for r in _lines(sessions.store.path("a:1")) if "role" in r] == [str(i) for i in range(6)]
+    assert sessions.stats["evictions"] >= 1
+
+
+def test_sqlite_store_reads_tails_and_lists_exact_keys(tmp_path) -> None:
+    store = SqliteSessionStore(tmp_path / "sessions.db")
+    sessions = SessionManager(tmp_path, store=store, tail_messages=2)
+    session = sessions.get_or_create("telegram:chat_with_underscores")
+    for i in range(3):
+        session.add_message("user", str(i))
+        sessions.save(session)
+
+    loaded = store.load("telegram:chat_with_underscores", tail=2)
+    assert (loaded.offset, [m["content"] for m in loaded.messages]) == (1, ["1", "2"])
+    [info] = store.list_sessions()
+    assert (info["key"], info["message_count"]) == ("telegram:chat_with_underscores", 3)
+
+    session.clear()
+    sessions.save(session)
+    assert store.load("telegram:chat_with_underscores").messages == []
+    assert sessions.delete("telegram:chat_with_underscores")
+    store.close()
+
+
+def test_migrate_jsonl_sessions_to_sqlite(tmp_path) -> None:
+    source = JsonlSessionStore(tmp_path / "sessions")
+    legacy = source.path("whatsapp:123_group")
+    legacy.write_text(
+        json.dumps({"_type": "metadata", "created_at": "2026-01-01T00:00:00", "updated_at": "2026-01-02T00:00:00"}) + "\n"
+        + json.dumps({"role": "user", "content": "hello"}) + "\n"
+    )
+    target = SqliteSessionStore(tmp_path / "sessions.db")
+
+    assert migrate_sessions(source, target) == 1
+    assert migrate_sessions(source, target) == 1  # rerunning replaces, no duplicates
+    session = target.load("whatsapp:123_group")
+    assert [m["content"] for m in session.messages] == ["hello"]
+    assert session.created_at.year == 2026
+    target.close()
+
+
+def test_write_behind_coalesces_saves_and_flushes(tmp_path) -> None:
+    sessions = SessionManager(tmp_path, tail_messages=2, write_behind_s=60)
+    session = sessions.get_or_create("a:1")
+    for i in range(5):
+        session.add_message("user", str(i))
+        sessions.save(session)  # window trims messages still queued for writing
+
+    path = sessions.store.path("a:1")
+    assert not path.exists()
+    assert sessions.stats["queue_depth"] == 1 and sessions.stats["coalesced"] == 4
+
+    sessions.flush()
+    assert [r["content"] for r in _lines(path) if "role" in r] == ["0", "1", "2", "3", "4"]
+    assert sessions.stats["written"] == 1
+
+    session.add_message("user", "5")
+    sessions.save(session)
+    sessions.close()
+    assert [m["content"] for m in SessionManager(tmp_path).get_or_create("a:1").messages] == [str(i) for i in range(6)]
+
+
+def test_idle_sessions_are_archived_and_restored(tmp_path) -> None:
+    sessions = SessionManager(tmp_path)
+    for key in ("a:1", "b:1"):
+        session = sessions.get_or_create(key)
+        session.add_message("user", "hello " * 200)
+        sessions.save(session)
+    old = time.time() - 3 * 86400
+    os.utime(sessions.store.path("a:1"), (old, old))
+
+    report = sessions.archive(86400)
+    assert report.sessions == 1 and report.reclaimed > 0
+    assert not sessions.store.path("a:1").exists()
+    assert {s["key"]: s.get("archived", False) for s in sessions.list_sessions()} == {"a:1": True, "b:1": False}
+
+    # Saving the cached session and loading it afresh both restore the file
+    cached = sessions.get_or_create("a:1")
+    cached.add_message("assistant", "hi")
+    sessions.save(cached)
+    restored = SessionManager(tmp_path).get_or_create("a:1")
+    assert [m["role"] for m in restored.messages] == ["user", "assistant"]
+    assert sessions.stats["rehydrated"] == 1
+
+
+def test_save_never_replaces_a_missing_file_with_the_tail(tmp_path) -> None:
+    sessions = SessionManager(tmp_path, tail_messages=2)
+    session = sessions.get_or_create("a:1")
+    for i in range(4):
+        session.add_message("user", str(i))
+        sessions.save(session)
+    assert session.offset == 2
+    sessions.store.archive(0)
+
+    session.add_message("user", "4")
+    sessions.save(session)  # restores the archived file, then appends
+    path = sessions.store.path("a:1")
+    assert [r["content"] for r in _lines(path) if "role" in r] == ["0", "1", "2", "3", "4"]
+
+    path.unlink()
+    session.add_message("user", "5")
+    with pytest.raises(FileNotFoundError):
+        sessions.save(session)
+    assert not path.exists()
+
+
+def test_failed_write_behind_saves_are_retried(tmp_path) -> None:
+    store = JsonlSessionStore(tmp_path / "sessions")
+    save = store.save
+    failures = [OSError("disk full")]
+
+    def flaky_save(session):
+        if failures:
+            raise failures.pop()
+        save(session)
+
+    store.save = flaky_save
+    sessions = SessionManager(tmp_path, store=store, write_behind_s=0.01)
+    session = sessions.get_or_create("a:1")
+    session.add_message("user", "0")
+    sessions.save(session)
+    time.sleep(0.1)  # first write fails and is queued again
+    session.add_message("user", "1")
+    sessions.save(session)
+
+    assert sessions.persister.flush(timeout=5)
+    assert sessions.stats["errors"] == 1 and sessions.stats["retries"] == 1
+    assert [r["content"] for r in _lines(store.path("a:1")) if "role" in r] == ["0", "1"]
+    sessions.close()
+
+
+def test_session_just_used_is_not_evicted(tmp_path) -> None:
+    sessions = SessionManager(tmp_path, max_cached=1, write_behind_s=60)
+    pending = sessions.get_or_create("a:1")
+    pending.add_message("user", "0")
+    sessions.save(pending)  # queued, so "a:1" cannot be evicted
+
+    fresh = sessions.get_or_create("b:1")
+    assert sessions.get_or_create("b:1") is fresh
+    assert sessions.get_or_create("a:1") is pending
+    sessions.close()
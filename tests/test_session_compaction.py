@@ -0,0 +1,68 @@
+import asyncio
+from typing import Any
+
+from nanobot.providers.base import LLMResponse
+from nanobot.session.compaction import SessionCompactor
+from nanobot.session.manager import Session, SessionManager
+
+
+def summarize(messages: list[dict[str, Any]]) -> LLMResponse:
+    """Answers chat turns with 'ok' and summary requests with a fixed summary."""
+    if "## New messages" in str(messages[-1]["content"]):
+        return LLMResponse(content="- User's name is Ada", usage={"prompt_tokens": 50, "completion_tokens": 5})
+    return LLMResponse(content="ok")
+
+
+async def test_compactor_summarizes_all_but_recent_messages(make_provider) -> None:
+    compactor = SessionCompactor(make_provider(summarize), after_messages=6, keep_messages=2)
+    session = Session(key="a:1")
+    for i in range(6):
+        session.add_message("user", f"m{i}")
+    assert not compactor.due(session)
+    session.add_message("user", "m6")
+    assert compactor.due(session)
+
+    assert await compactor.compact(session)
+    assert (session.summary, session.summarized_through) == ("- User's name is Ada", 5)
+    assert [m["content"] for m in session.get_history()] == ["m5", "m6"]
+    assert not compactor.due(session)
+
+
+async def test_summary_is_fed_ahead_of_recent_history(make_loop) -> None:
+    loop = make_loop(summarize, stream=False, summarize_after_messages=4, summary_keep_messages=2)
+    for i in range(3):
+        await loop.process_direct(f"message {i}", session_key="a:1", internal=True)
+    await asyncio.gather(*loop._summarizing.values())
+
+    await loop.process_direct("what's my name?", session_key="a:1", internal=True)
+    prompt = loop.provider.prompts[-1]
+    system = [b["text"] for b in prompt[0]["content"]]
+    assert system[-2].startswith("# Earlier in this conversation")
+    assert system[-1].startswith("# Current Context")
+    assert [m["content"] for m in prompt[1:]] == ["message 2", "ok", "what's my name?"]
+
+    reloaded = loop.sessions.store.load("a:1")
+    assert reloaded.summarized_through == 4
+
+
+async def test_summary_lands_on_the_reloaded_session(tmp_path, make_loop) -> None:
+    async def summarize_slowly(messages: list[dict[str, Any]]) -> LLMResponse:
+        if "## New messages" in str(messages[-1]["content"]):
+            await asyncio.sleep(0.2)
+        return summarize(messages)
+
+    loop = make_loop(
+        summarize_slowly, stream=False, summarize_after_messages=4, summary_keep_messages=2,
+        session_manager=SessionManager(tmp_path, max_cached=1),
+    )
+    for i in range(3):
+        await loop.process_direct(f"message {i}", session_key="a:1", internal=True)
+    # While the summary is being written, "a:1" is evicted and reloaded
+    await loop.process_direct("hello", session_key="b:1", internal=True)
+    await loop.process_direct("message 3", session_key="a:1", internal=True)
+    await asyncio.gather(*loop._summarizing.values())
+
+    session = loop.sessions.get_or_create("a:1")
+    assert session.summary == "- User's name is Ada"
+    assert [m["content"] for m in session.messages[-2:]] == ["message 3", "ok"]
+    assert loop.sessions.store.load("a:1").summarized_through == 4
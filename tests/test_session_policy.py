@@ -0,0 +1,32 @@
+import pytest
+
+from nanobot.session.policy import SessionClasses, SessionPolicy
+
+
+def test_first_matching_class_wins() -> None:
+    classes = SessionClasses([("cron:daily", SessionPolicy("ephemeral")), ("cron:*", SessionPolicy("ring", 2))])
+    assert classes.policy_for("cron:daily").policy == "ephemeral"
+    assert classes.policy_for("cron:other").policy == "ring"
+    assert classes.policy_for("telegram:1").policy == "full"
+    with pytest.raises(ValueError):
+        SessionPolicy("ring")
+
+
+async def test_cron_sessions_keep_a_short_ring_by_default(make_loop) -> None:
+    loop = make_loop(stream=False)
+    for i in range(5):
+        await loop.process_direct(f"run {i}", session_key="cron:job1", internal=True)
+        await loop.process_direct(f"chat {i}", session_key="telegram:1", internal=True)
+
+    stored = loop.sessions.store.load("cron:job1")
+    assert [m["content"] for m in stored.messages] == ["run 3", "re: run 3", "run 4", "re: run 4"]
+    assert loop.sessions.store.load("telegram:1").message_count == 10
+
+
+async def test_ephemeral_sessions_send_and_store_no_history(make_loop) -> None:
+    loop = make_loop(stream=False, session_classes=SessionClasses([("heartbeat", SessionPolicy("ephemeral"))]))
+    for _ in range(2):
+        await loop.process_direct("check", session_key="heartbeat", internal=True)
+
+    assert [m["role"] for m in loop.provider.prompts[-1]] == ["system", "user"]
+    assert loop.sessions.store.load("heartbeat") is None
@@ -0,0 +1,73 @@
+import asyncio
+
+import pytest
+
+from nanobot.agent.loop import _strip_thinking
+from nanobot.agent.streaming import ThinkingFilter
+from nanobot.bus.events import OutboundMessage
+from nanobot.bus.queue import MessageBus
+from nanobot.channels.base import BaseChannel
+
+SAMPLES = [
+    "Hello there, how are you?",
+    "<think>secret plan</think>The answer is 42.",
+    "Intro\n<THINKING>hidden\nmore</thinking>\nVisible line",
+    "Thought: I should not show this\nBut this is fine\n**Thought: nor this**\nend",
+    "a < b and <reasoning>why</reasoning>c > d",
+    "  \n  leading space\nthinking: drop me\nthoughtful line stays",
+]
+
+
+def run_filter(text: str, size: int) -> str:
+    f = ThinkingFilter()
+    return "".join(f.feed(text[i:i + size]) for i in range(0, len(text), size))
+
+
+@pytest.mark.parametrize("text", SAMPLES)
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 1000])
+def test_filter_matches_strip_thinking(text: str, size: int) -> None:
+    assert run_filter(text, size).strip() == _strip_thinking(text)
+
+
+def test_filter_emits_visible_text_immediately() -> None:
+    f = ThinkingFilter()
+    assert f.feed("Hel") == "Hel"
+    assert f.feed("lo <th") == "lo "
+    assert f.feed("ink>hidden") == ""
+    assert f.feed("</think> world") == " world"
+
+
+class PreviewChannel(BaseChannel):
+    name = "preview"
+    supports_streaming = True
+    stream_edit_interval_s = 0.05
+
+    def __init__(self):
+        super().__init__(config=None, bus=MessageBus())
+        self.rendered: list[str] = []
+
+    async def start(self) -> None:
+        pass
+
+    async def stop(self) -> None:
+        pass
+
+    async def send(self, msg: OutboundMessage) -> None:
+        pass
+
+    async def render_stream(self, msg: OutboundMessage) -> None:
+        self.rendered.append(msg.content)
+
+
+async def test_stream_updates_are_throttled_to_latest_text() -> None:
+    channel = PreviewChannel()
+    for text in ("a", "ab", "abc"):
+        await channel.update_stream(OutboundMessage(
+            channel="preview", chat_id="1", content=text, metadata={"stream_id": "s"},
+        ))
+    await asyncio.sleep(0.01)
+    await channel.update_stream(OutboundMessage(
+        channel="preview", chat_id="1", content="abcd", metadata={"stream_id": "s"},
+    ))
+    await channel.end_stream("s")
+    assert channel.rendered == ["abc"]
@@ -0,0 +1,45 @@
+from nanobot.agent.context import with_tool_digests
+from nanobot.agent.loop import _tool_digest
+from nanobot.providers.base import LLMResponse, ToolCallRequest
+
+
+def test_digest_keeps_key_args_and_cuts_long_values() -> None:
+    digest = _tool_digest([
+        {"role": "assistant", "content": None, "tool_calls": [
+            {"id": "t1", "type": "function", "function": {
+                "name": "write_file", "arguments": '{"path": "notes.md", "content": "' + "x" * 500 + '"}',
+            }},
+        ]},
+        {"role": "tool", "tool_call_id": "t1", "name": "write_file", "content": "Wrote " + "y" * 400},
+    ])
+    assert digest[0]["name"] == "write_file"
+    assert digest[0]["args"] == "path='notes.md', content=<500 chars>"
+    assert digest[0]["result"].endswith(" …") and len(digest[0]["result"]) < 210
+
+
+def test_digests_are_rendered_newest_first_within_budget() -> None:
+    tools = [{"name": "web_fetch", "args": "url='https://a.example'", "result": "A page"}]
+    history = [
+        {"role": "user", "content": "q1"}, {"role": "assistant", "content": "a1", "tools": tools},
+        {"role": "user", "content": "q2"}, {"role": "assistant", "content": "a2", "tools": tools},
+    ]
+    rendered = with_tool_digests(history, max_chars=100)
+    assert rendered[1] == {"role": "assistant", "content": "a1"}
+    assert "- web_fetch(url='https://a.example') → A page" in rendered[3]["content"]
+
+
+async def test_follow_up_turn_sees_earlier_tool_work(tmp_path, make_loop) -> None:
+    plan = tmp_path / "plan.md"
+    plan.write_text("Step 1: ship it")
+    # Reads the file on the first turn, answers directly afterwards
+    loop = make_loop([
+        LLMResponse(content=None, tool_calls=[ToolCallRequest(id="t1", name="read_file", arguments={"path": str(plan)})]),
+        "done",
+    ], stream=False)
+    await loop.process_direct("what's in plan.md?", session_key="a:1", internal=True)
+    await loop.process_direct("and step 1 again?", session_key="a:1", internal=True)
+
+    reply = loop.provider.prompts[-1][-2]
+    assert reply["role"] == "assistant"
+    assert f"- read_file(path='{plan}') → Step 1: ship it" in reply["content"]
+    assert "tools" not in reply
@@ -0,0 +1,69 @@
+import asyncio
+import json
+
+from nanobot.agent.tools.filesystem import ListDirTool, ReadFileTool, WriteFileTool
+from nanobot.agent.tools.registry import ToolRegistry
+from nanobot.agent.tools.web import WebFetchTool
+
+
+def make_registry(tmp_path) -> ToolRegistry:
+    tools = ToolRegistry()
+    for tool in (ReadFileTool(tmp_path), WriteFileTool(tmp_path), ListDirTool(tmp_path)):
+        tools.register(tool)
+    tools.start_turn()
+    return tools
+
+
+async def test_repeated_read_is_memoized_until_write(tmp_path) -> None:
+    (tmp_path / "notes.md").write_text("v1")
+    tools = make_registry(tmp_path)
+
+    assert await tools.execute("read_file", {"path": "notes.md"}) == "v1"
+    assert "Same result" in await tools.execute("read_file", {"path": "notes.md"})
+    listing = await tools.execute("list_dir", {"path": "."})
+    assert "notes.md" in listing
+
+    await tools.execute("write_file", {"path": "notes.md", "content": "v2"})
+
+    assert await tools.execute("read_file", {"path": "notes.md"}) == "v2"
+    assert "notes.md" in await tools.execute("list_dir", {"path": "."})
+    assert tools.stats["memo_hits"] == 1
+
+
+async def test_memo_is_scoped_to_the_turn(tmp_path) -> None:
+    (tmp_path / "a.txt").write_text("a")
+    tools = make_registry(tmp_path)
+    await tools.execute("read_file", {"path": "a.txt"})
+
+    async def other_turn() -> str:
+        tools.start_turn()
+        return await tools.execute("read_file", {"path": "a.txt"})
+
+    assert await asyncio.create_task(other_turn()) == "a"
+
+
+async def test_identical_failing_call_is_not_repeated_forever(tmp_path) -> None:
+    tools = make_registry(tmp_path)
+    missing = {"path": "missing.txt"}
+
+    first = await tools.execute("read_file", missing)
+    assert await tools.execute("read_file", missing) == first
+    blocked = await tools.execute("read_file", missing)
+    assert blocked.startswith("Error: Already tried read_file")
+    assert tools.stats["repeats_blocked"] == 1
+
+    # Creating the file makes the call worth trying again
+    await tools.execute("write_file", {"path": "missing.txt", "content": "here"})
+    assert await tools.execute("read_file", missing) == "here"
+
+
+async def test_failing_web_fetch_trips_the_breaker() -> None:
+    tools = ToolRegistry()
+    tools.register(WebFetchTool())
+    tools.start_turn()
+    bad = {"url": "ftp://files.example/report.pdf"}
+
+    first = await tools.execute("web_fetch", bad)
+    assert json.loads(first)["error"]
+    assert await tools.execute("web_fetch", bad) == first
+    assert (await tools.execute("web_fetch", bad)).startswith("Error: Already tried web_fetch")
@@ -0,0 +1,42 @@
+import re
+
+from nanobot.agent.tools.results import ResultStore, ToolResultTool
+
+
+def stored_handle(preview: str) -> str:
+    return re.search(r'handle "(res_[0-9a-f]+)"', preview).group(1)
+
+
+async def test_oversized_result_is_previewed_and_readable() -> None:
+    store = ResultStore(threshold_chars=100, head_chars=20, tail_chars=10)
+    tool = ToolResultTool(store)
+    store.set_scope("telegram:1")
+    text = "\n".join(f"line {i} {'x' * 20}" for i in range(50))
+
+    assert store.offload("read_file", "short") == "short"
+    preview = store.offload("read_file", text)
+    assert preview.startswith(text[:20]) and preview.endswith(text[-10:])
+    handle = stored_handle(preview)
+
+    page = await tool.execute(handle=handle, offset=0, length=30)
+    assert page.endswith(text[:30]) and "continue with offset=30" in page
+    assert await tool.execute(handle=handle, pattern=r"line 4\d ") == "\n".join(
+        f"{i + 1}: line {i} {'x' * 20}" for i in range(40, 50)
+    )
+
+    # Paged slices are not offloaded again
+    assert store.offload("tool_result", text) == text
+
+
+async def test_handles_are_scoped_and_dropped_with_their_turn() -> None:
+    store = ResultStore(threshold_chars=10)
+    tool = ToolResultTool(store)
+    store.set_scope("a")
+    handle = stored_handle(store.offload("web_fetch", "y" * 100))
+
+    store.set_scope("b")
+    assert (await tool.execute(handle=handle)).startswith("Error:")
+
+    store.set_scope("a")
+    store.drop_scope("a")
+    assert len(store) == 0
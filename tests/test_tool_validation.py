@@ -1,7 +1,9 @@
+import asyncio
 from typing import Any
 
 from nanobot.agent.tools.base import Tool
 from nanobot.agent.tools.registry import ToolRegistry
+from nanobot.providers.base import ToolCallRequest
 
 
 class SampleTool(Tool):
@@ -86,3 +88,52 @@ async def test_registry_returns_validation_error() -> None:
     reg.register(SampleTool())
     result = await reg.execute("sample", {"query": "hi"})
     assert "Invalid parameters" in result
+
+
+class SleepTool(Tool):
+    def __init__(self, name: str, safe: bool, log: list[str]):
+        self._name = name
+        self.concurrency_safe = safe
+        self.log = log
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @property
+    def description(self) -> str:
+        return "sleeps"
+
+    @property
+    def parameters(self) -> dict[str, Any]:
+        return {"type": "object", "properties": {"delay": {"type": "number"}}}
+
+    async def execute(self, delay: float = 0, **kwargs: Any) -> str:
+        await asyncio.sleep(delay)
+        self.log.append(f"{self._name}:{delay}")
+        return f"{self._name} done"
+
+
+def test_plan_batches_groups_consecutive_safe_calls() -> None:
+    reg = ToolRegistry()
+    reg.register(SleepTool("read", True, []))
+    reg.register(SleepTool("write", False, []))
+    calls = [ToolCallRequest(id=str(i), name=n, arguments={}) for i, n in enumerate(
+        ["read", "read", "write", "read", "write", "write"]
+    )]
+    batches = reg.plan_batches(calls)
+    assert [[c.id for c in b] for b in batches] == [["0", "1"], ["2"], ["3"], ["4"], ["5"]]
+
+
+async def test_execute_batch_runs_concurrently_and_keeps_order() -> None:
+    log: list[str] = []
+    reg = ToolRegistry()
+    reg.register(SleepTool("read", True, log))
+    calls = [
+        ToolCallRequest(id="a", name="read", arguments={"delay": 0.2}),
+        ToolCallRequest(id="b", name="read", arguments={"delay": 0.0}),
+    ]
+    results = await reg.execute_batch(calls)
+    assert results == ["read done", "read done"]
+    # The fast call finished first, so they ran concurrently
+    assert log == ["read:0.0", "read:0.2"]
@@ -0,0 +1,54 @@
+from typing import Any
+
+from nanobot.billing.usage import StdoutUsageTransport, UsageReporter, UsageTransport
+
+
+class FlakyTransport(UsageTransport):
+    def __init__(self):
+        self.fail = False
+        self.batches: list[list[dict[str, Any]]] = []
+
+    async def send(self, records: list[dict[str, Any]]) -> None:
+        if self.fail:
+            raise ConnectionError("platform down")
+        self.batches.append(records)
+
+
+async def test_size_threshold_triggers_batch_flush(tmp_path) -> None:
+    transport = FlakyTransport()
+    reporter = UsageReporter(transport, flush_interval_s=60, batch_size=3)
+    for _ in range(3):
+        reporter.record({"prompt_tokens": 10, "completion_tokens": 2}, "m")
+    await reporter.close()
+    assert [len(b) for b in transport.batches] == [3]
+
+
+async def test_failed_batches_are_spooled_and_resent(tmp_path) -> None:
+    spool = tmp_path / "spool.jsonl"
+    transport = FlakyTransport()
+    transport.fail = True
+    reporter = UsageReporter(transport, spool_path=spool, flush_interval_s=60)
+    reporter.record({"prompt_tokens": 5, "completion_tokens": 1}, "m", "subagent")
+    await reporter.close()
+    assert spool.exists()
+
+    # A new process picks the spooled records up
+    transport.fail = False
+    reporter = UsageReporter(transport, spool_path=spool, flush_interval_s=60)
+    reporter.record({"prompt_tokens": 7, "completion_tokens": 3}, "m")
+    await reporter.close()
+    assert [r["prompt_tokens"] for r in transport.batches[0]] == [5, 7]
+    assert not spool.exists()
+
+
+async def test_stdout_transport_collapses_batch_per_model(capsys) -> None:
+    await StdoutUsageTransport().send([
+        {"prompt_tokens": 10, "completion_tokens": 1, "model": "a"},
+        {"prompt_tokens": 20, "completion_tokens": 2, "model": "a"},
+        {"prompt_tokens": 5, "completion_tokens": 5, "model": "b"},
+    ])
+    lines = capsys.readouterr().out.splitlines()
+    assert lines == [
+        '[USAGE] {"prompt_tokens": 30, "completion_tokens": 3, "model": "a"}',
+        '[USAGE] {"prompt_tokens": 5, "completion_tokens": 5, "model": "b"}',
+    ]
@@ -0,0 +1,73 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from nanobot.agent.tools.web import (
+    WebFetchTool,
+    _BlockedHostError,
+    _check_public_host,
+    _ResponseTooLargeError,
+    extract_urls,
+)
+
+
+class CountingFetchTool(WebFetchTool):
+    """WebFetchTool with a fake network: pages are their URL, 'big' pages exceed any cap."""
+
+    def __init__(self):
+        super().__init__()
+        self.fetched: list[str] = []
+
+    async def _fetch(self, url, extract_mode, max_chars, max_bytes=None, public_only=False):
+        self.fetched.append(url)
+        await asyncio.sleep(0.01)
+        if "big" in url and max_bytes:
+            raise _ResponseTooLargeError(url)
+        return json.dumps({"url": url, "text": f"page {url}"})
+
+
+def test_extract_urls() -> None:
+    text = "Compare https://a.example/x, (https://b.example/y) and https://a.example/x again. ftp://c.example"
+    assert extract_urls(text) == ["https://a.example/x", "https://b.example/y"]
+    assert extract_urls(text, limit=1) == ["https://a.example/x"]
+
+
+async def test_prefetched_url_is_served_once() -> None:
+    tool = CountingFetchTool()
+    tool.start_prefetch(["https://a.example/x", "https://b.example/y"], max_bytes=1000)
+
+    first = await tool.execute(url="https://a.example/x")
+    again = await tool.execute(url="https://a.example/x")
+    tool.end_prefetch()
+
+    assert json.loads(first)["text"] == json.loads(again)["text"] == "page https://a.example/x"
+    # Prefetch of both URLs, then one real fetch for the repeat
+    assert tool.fetched.count("https://a.example/x") == 2
+    assert tool.prefetch_stats == {"started": 2, "hits": 1, "wasted": 1, "oversized": 0, "blocked": 0}
+
+
+async def test_oversized_prefetch_falls_back_to_normal_fetch() -> None:
+    tool = CountingFetchTool()
+    tool.start_prefetch(["https://big.example/"], max_bytes=1000)
+
+    result = await tool.execute(url="https://big.example/")
+    tool.end_prefetch()
+
+    assert json.loads(result)["text"] == "page https://big.example/"
+    assert tool.prefetch_stats["oversized"] == 1
+    assert tool.prefetch_stats["hits"] == 0
+
+
+async def test_prefetch_skips_local_and_private_hosts() -> None:
+    for url in ["http://127.0.0.1:18790/credits", "http://10.0.0.1/", "http://[::1]/", "http://169.254.169.254/"]:
+        with pytest.raises(_BlockedHostError):
+            await _check_public_host(httpx.Request("GET", url))
+    await _check_public_host(httpx.Request("GET", "http://93.184.216.34/"))
+
+    tool = WebFetchTool()
+    tool.start_prefetch(["http://127.0.0.1:18790/credits"], max_bytes=1000)
+    assert await tool._take_prefetched("http://127.0.0.1:18790/credits") is None
+    tool.end_prefetch()
+    assert tool.prefetch_stats["blocked"] == 1